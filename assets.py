@@ -0,0 +1,206 @@
+import hashlib
+import os
+import struct
+import sys
+
+import pygame
+
+from atomicfile import write_atomic
+
+FONT_PATH = "dist/resources/Snake Chan/Snake Chan.ttf"
+
+# Cached surface file: magic, width, height, pixel format, then raw pixels
+CACHE_HEADER = struct.Struct("<4sHH4s")
+CACHE_MAGIC = b"SNKS"
+
+
+def resource_path(relative_path):
+    """Get the absolute path to the resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "snakePyGame", "surfaces")
+
+
+def get_sprite(sheet, x, y, width, height):
+    """Extract a sprite from a sprite sheet"""
+    image = pygame.Surface((width, height), pygame.SRCALPHA)
+    image.blit(sheet, (0, 0), (x, y, width, height))
+    return image
+
+
+class SurfaceCache:
+    """On-disk cache of prepared (scaled, sliced) surfaces as raw pixels.
+
+    Entries are keyed by the source file's path and mtime plus the target
+    size and a variant name, so editing a resource invalidates its entries.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_cache_dir()
+
+    def entry_path(self, source, size, variant):
+        stat = os.stat(source)
+        key = f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{size[0]}x{size[1]}|{variant}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".surf")
+
+    def load(self, path):
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            magic, width, height, pixel_format = CACHE_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != CACHE_MAGIC:
+            return None
+        pixel_format = pixel_format.decode("ascii").strip()
+        try:
+            return pygame.image.frombytes(data[CACHE_HEADER.size:], (width, height), pixel_format)
+        except ValueError:
+            return None
+
+    def store(self, path, surface):
+        pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+        header = CACHE_HEADER.pack(CACHE_MAGIC, surface.get_width(), surface.get_height(),
+                                   pixel_format.ljust(4).encode("ascii"))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_atomic(path, header + pygame.image.tobytes(surface, pixel_format))
+        except OSError:
+            pass  # A cache we cannot write is just a slower start
+
+    def get(self, source, size, variant, build):
+        """Return the cached surface for (source, size, variant), building and storing it on a miss."""
+        path = self.entry_path(source, size, variant)
+        surface = self.load(path)
+        if surface is None:
+            surface = build()
+            self.store(path, surface)
+        return surface
+
+
+class Assets:
+    """Game images, fonts and sounds, each loaded on first use.
+
+    Attribute access triggers the matching ``_load_<name>`` method once; the
+    result is stored on the instance so later lookups are plain attribute
+    reads. Images are converted to the display's pixel format, so the
+    display mode must be set before the first image is used.
+    """
+
+    def __init__(self, size, snake_block, cache=None):
+        self.size = size
+        self.snake_block = snake_block
+        self.cache = cache if cache is not None else SurfaceCache()
+        self.music_loaded = False
+
+    def __getattr__(self, name):
+        loader = getattr(type(self), "_load_" + name, None)
+        if loader is None:
+            raise AttributeError(name)
+        value = loader(self)
+        setattr(self, name, value)
+        return value
+
+    def prepared_image(self, relative_path, size=None, variant="scaled", build=None):
+        """Load an image, scaled to size (or transformed by build) through the disk cache."""
+        path = resource_path(relative_path)
+        if size is None and build is None:
+            return pygame.image.load(path)
+        if build is None:
+            def build():
+                return pygame.transform.scale(pygame.image.load(path), size)
+        return self.cache.get(path, size or (0, 0), variant, build)
+
+    # Fonts
+    def _load_font_style(self):
+        return pygame.font.Font(resource_path(FONT_PATH), 40)
+
+    def _load_score_font(self):
+        return pygame.font.Font(resource_path(FONT_PATH), 35)
+
+    def _load_menu_font(self):
+        return pygame.font.Font(resource_path(FONT_PATH), 40)
+
+    def _load_profile_font(self):
+        return pygame.font.SysFont("monospace", 15)
+
+    # Backgrounds
+    def _load_menu_background(self):
+        return self.prepared_image("dist/resources/menu_background.jpg", self.size).convert()
+
+    def _load_game_background(self):
+        return self.prepared_image("dist/resources/background_snake.png").convert()
+
+    def _load_endgame_background(self):
+        return self.prepared_image("dist/resources/endgame_background.png", self.size).convert()
+
+    # Fruit images
+    def _load_apple(self):
+        return self.prepared_image("dist/resources/apple.png").convert_alpha()
+
+    def _load_apple_scaled(self):
+        block = self.snake_block
+        return self.prepared_image("dist/resources/apple.png", (block, block)).convert_alpha()
+
+    def _load_watermelon(self):
+        block = self.snake_block
+        return self.prepared_image("dist/resources/watermelon.png", (block, block)).convert_alpha()
+
+    def _load_fruit_images(self):
+        return {"apple": self.apple_scaled, "watermelon": self.watermelon}
+
+    # Snake skin images, sliced from the sprite sheet
+    def sprite(self, x, y, angle=0):
+        def build():
+            image = get_sprite(pygame.image.load(resource_path("dist/resources/sprite_sheet.png")), x, y, 20, 20)
+            return pygame.transform.rotate(image, angle) if angle else image
+        return self.prepared_image("dist/resources/sprite_sheet.png", (20, 20), f"sprite {x} {y} {angle}",
+                                   build).convert_alpha()
+
+    def _load_tail_up(self):
+        return self.sprite(40, 0, 90)
+
+    def _load_body_vertical(self):
+        return self.sprite(20, 0)
+
+    def _load_body_right_top(self):
+        return self.sprite(0, 0)
+
+    def _load_head_down_tongue_hidden(self):
+        return self.sprite(0, 20, 90)
+
+    def _load_head_down_tongue_mid(self):
+        return self.sprite(20, 20, 90)
+
+    def _load_head_down_tongue_out(self):
+        return self.sprite(40, 20, 90)
+
+    def _load_body_right_bottom(self):
+        return pygame.transform.rotate(self.body_right_top, 270)
+
+    def _load_body_left_bottom(self):
+        return pygame.transform.rotate(self.body_right_bottom, 270)
+
+    def _load_body_left_top(self):
+        return pygame.transform.rotate(self.body_right_bottom, 180)
+
+    def _load_body_horizontal(self):
+        return pygame.transform.rotate(self.body_vertical, 90)
+
+    # Sounds
+    def _load_eat_sound(self):
+        return pygame.mixer.Sound(resource_path("dist/resources/eat_sound.wav"))
+
+    def load_music(self):
+        """Load the background music track into the mixer, once."""
+        if not self.music_loaded:
+            pygame.mixer.music.load(resource_path("dist/resources/background_music.mp3"))
+            self.music_loaded = True
@@ -0,0 +1,23 @@
+"""Crash-safe file replacement shared by the score store, snapshots and the surface cache."""
+import os
+
+
+def write_atomic(path, data):
+    """Write data to path so a crash mid-write leaves any previous file intact.
+
+    The data goes to a temporary file next to path, is fsynced, then
+    os.replace()d into place. The temporary file is removed if anything fails.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
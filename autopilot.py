@@ -0,0 +1,190 @@
+"""Built-in autopilot: plays SnakeGame unattended, for demos and soak tests.
+
+The autopilot follows a Hamiltonian cycle through the board and takes
+shortcuts towards the next fruit. As long as the head never overtakes the
+tail in cycle order, the body always lies on the stretch of cycle behind
+the head and the cells ahead are free, so following the cycle can never
+trap the snake. Shortcuts are chosen with a BFS distance field from the
+target fruit that is kept until the fruits change, instead of searching
+again every tick. Once the snake covers SHORTCUT_LIMIT of the board it
+only follows the cycle.
+"""
+import argparse
+import sys
+import time
+
+from snake_engine import CELL_NUMBER, DIRECTIONS, FRUIT_TYPES, MAX_CELL_NUMBER, OPPOSITE, SnakeGame, board_size
+
+# Stop taking shortcuts once the snake covers this share of the board
+SHORTCUT_LIMIT = 0.5
+# Free cells a shortcut must leave between the head and the tail, on top of pending growth
+SAFETY_MARGIN = 4
+# Largest growth one fruit can give
+MAX_FRUIT_POINTS = max(points for points, _ in FRUIT_TYPES.values())
+
+UNREACHABLE = 1 << 30
+
+
+def hamiltonian_cycle(cell_number):
+    """Cells (row-major indices) of a cycle through every cell of an even-sized board.
+
+    Rows are swept as a serpentine over columns 1.., and column 0 is the way
+    back up to the start.
+    """
+    if cell_number % 2 or cell_number < 2:
+        raise ValueError("a Hamiltonian cycle needs an even board size")
+    cycle = []
+    for y in range(cell_number):
+        xs = range(1, cell_number) if y % 2 == 0 else range(cell_number - 1, 0, -1)
+        cycle.extend(y * cell_number + x for x in xs)
+    cycle.extend(y * cell_number for y in range(cell_number - 1, -1, -1))
+    return cycle
+
+
+def neighbour_table(cell_number):
+    """For every cell, its in-board neighbours as (direction, cell) pairs."""
+    table = []
+    for cell in range(cell_number * cell_number):
+        y, x = divmod(cell, cell_number)
+        table.append(tuple((direction, (y + dy) * cell_number + x + dx)
+                           for direction, (dx, dy) in DIRECTIONS.items()
+                           if 0 <= x + dx < cell_number and 0 <= y + dy < cell_number))
+    return table
+
+
+class Autopilot:
+    """Chooses the snake's next direction; ``drive`` queues it on the game.
+
+    The cycle, its inverse and the neighbour table are built once per board
+    size, so a decision is a handful of lookups. The distance field is
+    recomputed only when the target fruit changes or stops getting closer.
+    """
+
+    def __init__(self, cell_number=CELL_NUMBER, shortcut_limit=SHORTCUT_LIMIT, safety_margin=SAFETY_MARGIN):
+        self.cell_number = cell_number
+        self.size = cell_number * cell_number
+        self.cycle = hamiltonian_cycle(cell_number)
+        self.order = [0] * self.size
+        for index, cell in enumerate(self.cycle):
+            self.order[cell] = index
+        self.neighbours = neighbour_table(cell_number)
+        self.shortcut_limit = shortcut_limit
+        self.safety_margin = safety_margin
+        self.reset()
+
+    def reset(self):
+        """Forget the cached field, e.g. when a new game starts."""
+        self.target = None
+        self.field = None
+        self.replans = 0
+
+    def cycle_distance(self, start, end):
+        """Steps from start to end going forward along the cycle."""
+        return (self.order[end] - self.order[start]) % self.size
+
+    def distance_field(self, target, occupied):
+        """BFS distances from target to every cell, going around the body."""
+        field = [UNREACHABLE] * self.size
+        field[target] = 0
+        neighbours = self.neighbours
+        frontier = [target]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                for _, neighbour in neighbours[cell]:
+                    if field[neighbour] == UNREACHABLE and not occupied[neighbour]:
+                        field[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        self.replans += 1
+        return field
+
+    def next_direction(self, game):
+        """The direction to move in this tick."""
+        cell_number = self.cell_number
+        head_x, head_y = game.snake_list[-1]
+        tail_x, tail_y = game.snake_list[0]
+        head = head_y * cell_number + head_x
+        tail = tail_y * cell_number + tail_x
+        growing = game.snake_length - len(game.snake_list)
+        tail_moves = len(game.snake_list) > 1 and not growing
+        occupied = game.occupied
+        fruit_points = {fruit.y * cell_number + fruit.x: fruit.points for fruit in game.fruits if fruit.x is not None}
+
+        # Aim for the fruit the head reaches first going along the cycle
+        target = min(fruit_points, key=lambda cell: self.cycle_distance(head, cell), default=None)
+        if target != self.target:
+            self.target = target
+            self.field = None if target is None else self.distance_field(target, occupied)
+        target_distance = self.cycle_distance(head, target) if target is not None else self.size
+        tail_distance = self.cycle_distance(head, tail) if len(game.snake_list) > 1 else self.size
+        shortcuts = len(game.snake_list) < self.shortcut_limit * self.size
+
+        best = best_key = fallback = None
+        reverse = OPPOSITE[game.direction]
+        for direction, cell in self.neighbours[head]:
+            if direction == reverse or (occupied[cell] and not (cell == tail and tail_moves)):
+                continue
+            fallback = fallback or direction
+            ahead = self.cycle_distance(head, cell)
+            if ahead == 1:
+                # The next cell on the cycle is always safe
+                key = (self.field[cell] if self.field else UNREACHABLE, -ahead)
+            elif shortcuts and ahead <= target_distance and (
+                    ahead + growing + fruit_points.get(cell, 0) + MAX_FRUIT_POINTS + self.safety_margin
+                    < tail_distance):
+                key = (self.field[cell] if self.field else UNREACHABLE, -ahead)
+            else:
+                continue
+            if best_key is None or key < best_key:
+                best, best_key = direction, key
+
+        if best is not None and self.field and best_key[0] >= self.field[head] != UNREACHABLE:
+            # The body has moved into the way since the field was built: rebuild it next tick
+            self.target = None
+        return best or fallback or game.direction
+
+    def drive(self, game):
+        """Queue this tick's move on the game's direction queue."""
+        game.queue_direction(self.next_direction(game))
+
+
+def play(seed=None, cell_number=CELL_NUMBER, max_ticks=None, autopilot=None):
+    """Play one game headless under the autopilot and return it."""
+    game = SnakeGame(cell_number, seed)
+    autopilot = autopilot or Autopilot(cell_number)
+    autopilot.reset()
+    max_ticks = max_ticks or 50 * cell_number ** 3
+    while game.alive and game.ticks < max_ticks:
+        autopilot.drive(game)
+        game.step()
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the autopilot headless and report its games")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; the rest follow on")
+    parser.add_argument("--cells", type=board_size, default=CELL_NUMBER,
+                        help=f"board size in cells, {CELL_NUMBER} to {MAX_CELL_NUMBER}")
+    args = parser.parse_args(argv)
+    if args.cells % 2:
+        parser.error(f"the autopilot needs an even board size, not --cells {args.cells}")
+
+    autopilot = Autopilot(args.cells)
+    total_ticks = 0
+    start = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.games):
+        game = play(seed, args.cells, autopilot=autopilot)
+        total_ticks += game.ticks
+        print(f"seed {seed}: score {game.score}, {game.ticks} ticks, "
+              f"{game.cause_of_death or 'timeout'}, {autopilot.replans} field rebuilds")
+    elapsed = time.perf_counter() - start
+    print(f"{total_ticks} ticks in {elapsed:.2f} s ({total_ticks / elapsed:.0f} ticks/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Many snake boards stepped in lockstep with NumPy, for training agents.
+
+``BatchSnakeEnv`` applies the rules of ``SnakeGame.step`` to N boards at
+once: turning, wall and self collision (the tail moves out of the way
+first), apples and watermelons, the speed boost and its expiry, and the
+board filling up. Finished boards start a new game inside the same
+``step``. Animation state (blinking, the eating tongue) has no effect on
+play and is left out, and fruit placement draws from NumPy's generator,
+so boards follow the engine's rules but not its exact random sequence.
+
+Actions are direction codes in ``ACTIONS`` order, or -1 to keep going.
+Observations are uint8 planes, shape (N, 4, cells, cells): body, head,
+apples, watermelon.
+"""
+import numpy as np
+
+from snake_engine import (CELL_NUMBER, DIRECTIONS, FPS_BASE, FRUIT_MAX_SPAWN, FRUIT_MIN_SPAWN, FRUIT_TYPES,
+                          OPPOSITE, SPEED_BOOST_DURATION, SPEED_INCREMENT)
+
+ACTIONS = tuple(DIRECTIONS)
+ACTION_DX = np.array([DIRECTIONS[action][0] for action in ACTIONS], dtype=np.int32)
+ACTION_DY = np.array([DIRECTIONS[action][1] for action in ACTIONS], dtype=np.int32)
+ACTION_OPPOSITE = np.array([ACTIONS.index(OPPOSITE[action]) for action in ACTIONS], dtype=np.int32)
+START_ACTION = ACTIONS.index("RIGHT")
+
+APPLE_POINTS = FRUIT_TYPES["apple"][0]
+WATERMELON_POINTS, WATERMELON_BOOST = FRUIT_TYPES["watermelon"]
+APPLE_SLOTS = 2
+
+# Causes of death, as stored in ``causes``
+ALIVE, WALL, SELF, BOARD_FULL = 0, 1, 2, 3
+CAUSES = (None, "wall", "self", "board_full")
+
+# Observation planes
+BODY_PLANE, HEAD_PLANE, APPLE_PLANE, WATERMELON_PLANE = range(4)
+
+
+class BatchSnakeEnv:
+    """N snake boards as parallel arrays, all advanced by one vectorized ``step``.
+
+    Each body is a ring buffer of cell indices (``body[board, head_slot]``
+    is the head, the tail is ``length - 1`` slots behind it) alongside an
+    occupancy plane, so moving costs the same at any length. Fruit cells
+    are -1 when absent.
+    """
+
+    def __init__(self, num_boards, cell_number=CELL_NUMBER, seed=None):
+        self.num_boards = num_boards
+        self.cell_number = cell_number
+        self.cells = cell_number * cell_number
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.arange(num_boards)
+
+        n, cells = num_boards, self.cells
+        self.occupied = np.zeros((n, cells), dtype=bool)
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head_slot = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)  # Cells the body covers now
+        self.target_length = np.zeros(n, dtype=np.int32)  # Length it is growing to (SnakeGame.snake_length)
+        self.direction = np.zeros(n, dtype=np.int32)
+        self.moving = np.zeros(n, dtype=bool)  # The snake stands still until the first turn
+        self.apples = np.zeros((n, APPLE_SLOTS), dtype=np.int32)
+        self.watermelon = np.zeros(n, dtype=np.int32)
+        self.pending_apples = np.zeros(n, dtype=np.int32)
+        self.apples_eaten = np.zeros(n, dtype=np.int32)
+        self.next_watermelon_spawn = np.zeros(n, dtype=np.int32)
+        self.fps = np.zeros(n, dtype=np.int32)
+        self.original_fps = np.zeros(n, dtype=np.int32)
+        self.boost_active = np.zeros(n, dtype=bool)
+        self.boost_start = np.zeros(n, dtype=np.float64)
+        self.time_ms = np.zeros(n, dtype=np.float64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        # Per-step outputs: score and cause of death of boards that just finished
+        self.causes = np.zeros(n, dtype=np.int8)
+        self.final_scores = np.zeros(n, dtype=np.int32)
+        self.observations = np.zeros((n, 4, cell_number, cell_number), dtype=np.uint8)
+        self._marks = (np.zeros(0, dtype=np.intp),) * 4  # Head and fruit cells set in the observations
+
+    @property
+    def scores(self):
+        return self.target_length - 1
+
+    @property
+    def heads(self):
+        return self.body[self.boards, self.head_slot]
+
+    def reset(self):
+        """Start a new game on every board; returns the observations."""
+        self._reset_boards(self.boards)
+        return self.observe()
+
+    def _reset_boards(self, boards):
+        center = (self.cell_number // 2) * self.cell_number + self.cell_number // 2
+        self.occupied[boards] = False
+        self.occupied[boards, center] = True
+        self.body[boards, 0] = center
+        self.head_slot[boards] = 0
+        self.length[boards] = 1
+        self.target_length[boards] = 1
+        self.direction[boards] = START_ACTION
+        self.moving[boards] = False
+        self.apples_eaten[boards] = 0
+        self.next_watermelon_spawn[boards] = self.rng.integers(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN + 1, len(boards))
+        self.apples[boards] = -1
+        self.watermelon[boards] = -1
+        self.pending_apples[boards] = 0
+        for slot in range(APPLE_SLOTS):
+            self.apples[boards, slot] = self._sample_free(boards)
+        self.fps[boards] = FPS_BASE
+        self.original_fps[boards] = FPS_BASE
+        self.boost_active[boards] = False
+        self.boost_start[boards] = 0.0
+        self.time_ms[boards] = 0.0
+        self.ticks[boards] = 0
+
+    def _sample_free(self, boards):
+        """A uniformly random cell covered by neither body nor fruit on each board, -1 if there is none."""
+        if not len(boards):
+            return np.zeros(0, dtype=np.int32)
+        free = ~self.occupied[boards]
+        rows = np.arange(len(boards))
+        for fruit_cells in (*self.apples[boards].T, self.watermelon[boards]):
+            present = fruit_cells >= 0
+            free[rows[present], fruit_cells[present]] = False
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        cells = keys.argmax(axis=1).astype(np.int32)
+        cells[keys[rows, cells] < 0] = -1
+        return cells
+
+    def step(self, actions):
+        """Advance every board one tick; returns (observations, rewards, dones).
+
+        ``rewards`` are the points eaten this tick. Boards that are done
+        have already been reset; ``causes`` and ``final_scores`` tell how
+        their game ended.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        boards, size = self.boards, self.cell_number
+        self.ticks += 1
+
+        # Turn, ignoring reversals
+        turn = (actions >= 0) & (actions != ACTION_OPPOSITE[self.direction])
+        self.direction = np.where(turn, actions, self.direction)
+        self.moving |= turn
+
+        # Move the head, dying on the board edge
+        head = self.body[boards, self.head_slot]
+        head_y, head_x = np.divmod(head, size)
+        head_x = head_x + ACTION_DX[self.direction] * self.moving
+        head_y = head_y + ACTION_DY[self.direction] * self.moving
+        wall = (head_x < 0) | (head_x >= size) | (head_y < 0) | (head_y >= size)
+        new_head = np.where(wall, head, head_y * size + head_x)
+
+        # Free the tail before checking self-collision, unless the snake is growing
+        pop = ~wall & (self.length >= self.target_length)
+        tail_slot = (self.head_slot - self.length + 1) % self.cells
+        self.occupied[boards[pop], self.body[boards[pop], tail_slot[pop]]] = False
+        self.length -= pop
+
+        hit_self = ~wall & self.occupied[boards, new_head]
+        alive = ~(wall | hit_self)
+        live = boards[alive]
+        self.head_slot[live] = (self.head_slot[live] + 1) % self.cells
+        self.body[live, self.head_slot[live]] = new_head[live]
+        self.occupied[live, new_head[live]] = True
+        self.length += alive
+
+        # Speed boost expiry, on the clock before this tick is added
+        expired = alive & self.boost_active & (self.time_ms - self.boost_start > SPEED_BOOST_DURATION)
+        self.boost_active &= ~expired
+        self.fps = np.where(expired, self.original_fps, self.fps)
+
+        # Eating
+        apple_hit = alive[:, None] & (self.apples == new_head[:, None])
+        ate_apple = apple_hit.any(axis=1)
+        ate_watermelon = alive & (self.watermelon == new_head)
+        rewards = ate_apple * APPLE_POINTS + ate_watermelon * WATERMELON_POINTS
+        self.target_length += rewards
+
+        self.boost_active |= ate_watermelon
+        self.original_fps = np.where(ate_watermelon, self.fps, self.original_fps)
+        self.boost_start = np.where(ate_watermelon, self.time_ms, self.boost_start)
+        self.fps += ate_watermelon * WATERMELON_BOOST + (ate_apple | ate_watermelon) * SPEED_INCREMENT
+        self.watermelon[ate_watermelon] = -1
+
+        # An eaten apple moves to a free cell, or waits for one when the board is full
+        eaters = boards[ate_apple]
+        if len(eaters):
+            self.apples_eaten[eaters] += 1
+            slots = apple_hit[eaters].argmax(axis=1)
+            self.apples[eaters, slots] = -1
+            cells = self._sample_free(eaters)
+            self.apples[eaters, slots] = cells
+            self.pending_apples[eaters] += cells < 0
+
+            # Watermelon spawn
+            due = eaters[(self.apples_eaten[eaters] >= self.next_watermelon_spawn[eaters])
+                         & (self.watermelon[eaters] < 0)]
+            cells = self._sample_free(due)
+            placed = due[cells >= 0]
+            self.watermelon[placed] = cells[cells >= 0]
+            self.next_watermelon_spawn[placed] = (self.apples_eaten[placed]
+                                                  + self.rng.integers(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN + 1,
+                                                                      len(placed)))
+
+        # One waiting apple per tick comes back once a cell is free
+        waiting = boards[alive & (self.pending_apples > 0)]
+        if len(waiting):
+            cells = self._sample_free(waiting)
+            placed = waiting[cells >= 0]
+            slots = (self.apples[placed] < 0).argmax(axis=1)
+            self.apples[placed, slots] = cells[cells >= 0]
+            self.pending_apples[placed] -= 1
+
+        full = alive & (self.length == self.cells)
+        self.time_ms += np.where(alive & ~full, 1000 / self.fps, 0.0)
+
+        self.causes[:] = np.select([wall, hit_self, full], [WALL, SELF, BOARD_FULL], ALIVE)
+        dones = self.causes != ALIVE
+        finished = boards[dones]
+        self.final_scores[finished] = self.target_length[finished] - 1
+        if len(finished):
+            self._reset_boards(finished)
+        return self.observe(), rewards, dones
+
+    def observe(self):
+        """Fill and return the observation planes (the same array every call).
+
+        The body plane is copied whole; the sparse head and fruit planes
+        only have last call's marks cleared instead of the whole array.
+        """
+        obs = self.observations
+        size = self.cell_number
+        obs[:, BODY_PLANE] = self.occupied.view(np.uint8).reshape(-1, size, size)
+        obs[self._marks] = 0
+
+        head_y, head_x = np.divmod(self.heads, size)
+        marks = [(self.boards, np.full(self.num_boards, HEAD_PLANE), head_y, head_x)]
+        for plane, fruit_cells in ((APPLE_PLANE, self.apples), (WATERMELON_PLANE, self.watermelon[:, None])):
+            rows, slots = np.nonzero(fruit_cells >= 0)
+            fruit_y, fruit_x = np.divmod(fruit_cells[rows, slots], size)
+            marks.append((rows, np.full(len(rows), plane), fruit_y, fruit_x))
+        self._marks = tuple(np.concatenate(index) for index in zip(*marks))
+        obs[self._marks] = 1
+        return obs
@@ -0,0 +1,41 @@
+"""Frame time of draw_snake against snake length.
+
+Runs under SDL's dummy video/audio drivers:
+
+    python benchmarks/bench_draw_snake.py
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snake  # noqa: E402
+
+LENGTHS = (1, 10, 100, 400, 800, 1600)
+
+
+def serpentine(length, cell_number=snake.CELL_NUMBER, snake_block=snake.SNAKE_BLOCK):
+    """A snake of the given length winding row by row through the board, tail first."""
+    cells = []
+    for y in range(cell_number):
+        xs = range(cell_number) if y % 2 == 0 else range(cell_number - 1, -1, -1)
+        cells.extend([x * snake_block, y * snake_block] for x in xs)
+    return cells[:length]
+
+
+def main():
+    snake.init_display()
+    print(f"{'length':>8} {'ms/frame':>10}")
+    for length in LENGTHS:
+        snake_list = serpentine(length)
+        timer = timeit.Timer(lambda: snake.draw_snake(snake.SNAKE_BLOCK, snake_list, True, "RIGHT", False))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        print(f"{length:>8} {best * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
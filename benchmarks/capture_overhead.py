@@ -0,0 +1,89 @@
+"""Frame time with and without gameplay capture, through the real frame loop.
+
+Autopilot games run through the scene manager under SDL's dummy drivers
+at the render rate, sleeping out the rest of each frame as the game does.
+The same frames are played once without capture and once recording into
+a temporary directory. The run reports the work per frame for both, and
+how many frames were encoded or dropped. It fails if capture adds more
+than --budget-ms to the p99 frame time.
+
+    python benchmarks/capture_overhead.py --frames 1200
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import snake  # noqa: E402
+from autopilot import Autopilot  # noqa: E402
+from capture import CAPTURE_BUFFERS, CAPTURE_WORKERS, FrameCapture  # noqa: E402
+from highscores import ScoreStore  # noqa: E402
+
+FRAMES = 1200
+SEED = 7
+
+
+def run_frames(frames, seed):
+    """Play paced autopilot frames; returns each frame's run_frame time in ms."""
+    manager = snake.SceneManager()
+    manager.new_game(seed)
+    frame_time = 1000 / snake.RENDER_FPS
+    times = np.zeros(frames)
+    deadline = time.perf_counter()
+    for frame in range(frames):
+        if manager.current is not manager.scenes["playing"]:
+            manager.new_game(seed + frame)
+        start = time.perf_counter()
+        manager.run_frame([], frame_time)
+        times[frame] = (time.perf_counter() - start) * 1000
+        deadline += frame_time / 1000
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--workers", type=int, default=CAPTURE_WORKERS, help="encoder threads")
+    parser.add_argument("--buffers", type=int, default=CAPTURE_BUFFERS, help="pooled frame buffers")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="allowed p99 frame time added by capture")
+    parser.add_argument("--keep", metavar="DIR", help="record into DIR and keep the frames")
+    args = parser.parse_args(argv)
+
+    directory = args.keep or tempfile.mkdtemp()
+    snake.SCORES = ScoreStore(os.path.join(directory, "scores.json"))
+    snake.init_display()
+    snake.AUTOPILOT = Autopilot(snake.BOARD_CELLS)
+    try:
+        plain = run_frames(args.frames, SEED)
+        snake.CAPTURE = FrameCapture(os.path.join(directory, "frames"), snake.WINDOW.get_size(),
+                                     args.workers, args.buffers)
+        captured = run_frames(args.frames, SEED)
+        snake.CAPTURE.close()
+    finally:
+        pygame.quit()
+        if not args.keep:
+            shutil.rmtree(directory)
+
+    print("             p50     p99     max (ms per frame)")
+    for name, times in (("no capture", plain), ("capture", captured)):
+        print(f"{name:<10} {np.percentile(times, 50):6.2f}  {np.percentile(times, 99):6.2f}  {times.max():6.2f}")
+    print(snake.CAPTURE.report()[0])
+    added = np.percentile(captured, 99) - np.percentile(plain, 99)
+    ok = added <= args.budget_ms
+    print(f"p99 added by capture: {added:+.2f} ms (budget {args.budget_ms:.2f})  {'ok' if ok else 'SLOW'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""State feed under load: one publishing game, many reader processes.
+
+The main process plays autopilot games headless as fast as it can and
+publishes every tick to a StateFeed, timing ``publish``. Reader
+processes attach to the feed and read it in a loop, checking that every
+consistent read agrees with itself:
+
+- the grid covers exactly the record's length of cells
+- the record's head is on the body
+
+The main process also compares the feed's grid with the game's own
+occupancy after every tick. The run fails if any check failed.
+
+    python benchmarks/feed_readers.py --readers 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autopilot import Autopilot  # noqa: E402
+from snake_engine import SnakeGame  # noqa: E402
+from statefeed import FeedReader, StateFeed  # noqa: E402
+
+READERS = 4
+SECONDS = 5.0
+CELLS = 20
+
+
+def read_loop(name, stop, results):
+    """Reader process: read until stopped; reports (reads, retries, mismatches, ticks seen, ticks missed)."""
+    reader = FeedReader(name)
+    reads = retries = mismatches = seen = missed = 0
+    seq = reader.seq
+    while not stop.is_set():
+        while True:
+            version = reader.begin()
+            record = reader.latest()
+            if record is None:
+                break
+            covered = int(reader.grid.sum())
+            head = reader.grid[record["head_y"], record["head_x"]]
+            length = int(record["length"])
+            if reader.consistent(version):
+                break
+            retries += 1
+        if record is None:
+            continue
+        reads += 1
+        mismatches += covered != length or not head
+        records, skipped = reader.since(seq)
+        if len(records):
+            seq = int(records["seq"][-1])
+        seen += len(records)
+        missed += skipped
+    record = None
+    reader.close()
+    results.put((reads, retries, mismatches, seen, missed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=READERS)
+    parser.add_argument("--seconds", type=float, default=SECONDS)
+    parser.add_argument("--cells", type=int, default=CELLS, help="board size in cells")
+    args = parser.parse_args(argv)
+
+    feed = StateFeed(args.cells)
+    game = SnakeGame(args.cells, seed=0)
+    autopilot = Autopilot(args.cells)
+    feed.publish(game)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    readers = [multiprocessing.Process(target=read_loop, args=(feed.name, stop, results))
+               for _ in range(args.readers)]
+    for process in readers:
+        process.start()
+
+    publish_ms = []
+    grid_errors = games = 0
+    deadline = time.perf_counter() + args.seconds
+    try:
+        while time.perf_counter() < deadline:
+            if not game.alive:
+                games += 1
+                game.reset(games)
+                autopilot.reset()
+                feed.publish(game)
+            autopilot.drive(game)
+            game.step()
+            start = time.perf_counter()
+            feed.publish(game)
+            publish_ms.append((time.perf_counter() - start) * 1000)
+            grid_errors += feed.grid != game.occupied
+        stop.set()
+        stats = [results.get() for _ in readers]
+        for process in readers:
+            process.join()
+    finally:
+        feed.close()
+
+    publish_ms = np.array(publish_ms)
+    reads, retries, mismatches, seen, missed = np.sum(stats, axis=0) if stats else (0,) * 5
+    print(f"{len(publish_ms)} ticks over {games + 1} games; publish p50 {np.percentile(publish_ms, 50) * 1000:.1f} us, "
+          f"p99 {np.percentile(publish_ms, 99) * 1000:.1f} us")
+    print(f"{args.readers} readers: {reads} consistent reads, {retries} retried, {mismatches} inconsistent; "
+          f"{seen} ticks read from the ring, {missed} overwritten before being read")
+    print(f"grid out of sync with the game on {grid_errors} ticks")
+    ok = not mismatches and not grid_errors
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Input latency at every speed level, measured through the real frame loop.
+
+A background thread presses arrow keys at random moments, as a player
+would, while the scene manager runs its normal loop with the real
+FrameScheduler under SDL's dummy drivers. The game is held at each speed
+level in turn, and the run reports, per level:
+
+- input to the tick that applies the turn
+- input to the frame that presents it
+- how long events sat in SDL's queue before they were stamped
+
+Presses come 1.2 to 3 ticks apart. A turn queued behind another waits one
+extra tick per turn ahead of it, which is the game rule, not input lag.
+An unqueued turn waits at most one tick interval for its tick and one
+more frame to be shown. A level therefore fails when its p99
+input-to-present latency exceeds ``1000 / fps + 2000 / RENDER_FPS`` ms.
+
+    python benchmarks/input_latency.py --levels 10 20 30 --turns 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import snake  # noqa: E402
+from highscores import ScoreStore  # noqa: E402
+from profiler import InputLatency, LatencyHistogram  # noqa: E402
+
+LEVELS = (10, 15, 20, 30, 40, 60)
+TURNS = 60
+SEED = 99
+# Cycling through turns this way keeps every press perpendicular to the last one
+TURN_CYCLE = ("UP", "LEFT", "DOWN", "RIGHT")
+DIRECTION_KEYS = {direction: key for key, direction in snake.KEY_DIRECTIONS.items()}
+
+
+def press_keys(stop, fps, rng):
+    """Post a turn every 1.2 to 3 ticks until stopped; events carry the time they were posted."""
+    presses = 0
+    while not stop.is_set():
+        time.sleep(rng.uniform(1.2, 3.0) / fps)
+        direction = TURN_CYCLE[presses % len(TURN_CYCLE)]
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=DIRECTION_KEYS[direction],
+                                             posted=time.perf_counter()))
+        presses += 1
+
+
+def run_level(manager, fps, turns, rng):
+    """Play at a fixed fps until `turns` turns have been applied; returns (latency, queue delay histogram)."""
+    latency = snake.INPUT_LATENCY = InputLatency()
+    queue_delays = LatencyHistogram()
+    scene = manager.scenes["playing"]
+    stop = threading.Event()
+    thread = threading.Thread(target=press_keys, args=(stop, fps, rng), daemon=True)
+    games = 0
+    events = []
+    thread.start()
+    try:
+        while fps not in latency.to_present or latency.to_present[fps].total < turns:
+            if manager.current is not scene:
+                manager.new_game(SEED + games)
+                games += 1
+            scene.game.fps = fps
+            for event in events:
+                if hasattr(event, "posted") and hasattr(event, "received"):
+                    queue_delays.add((event.received - event.posted) * 1000)
+            manager.run_frame(events, manager.scheduler.frame_time)
+            events = manager.scheduler.next_events(manager.current)
+    finally:
+        stop.set()
+        thread.join()
+    return latency, queue_delays
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=LEVELS, help="speed levels (game fps) to test")
+    parser.add_argument("--turns", type=int, default=TURNS, help="applied turns to measure per level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="CSV", help="write the latency histograms to CSV")
+    args = parser.parse_args(argv)
+
+    snake.SCORES = ScoreStore(os.path.join(tempfile.mkdtemp(), "scores.json"))
+    snake.init_display()
+    manager = snake.SceneManager()
+    rng = random.Random(args.seed)
+    combined = InputLatency()
+    failures = 0
+    print("  fps  turns   tick p50    p99   present p50    p99  bound   queue p99 (ms)")
+    for fps in args.levels:
+        latency, queue_delays = run_level(manager, fps, args.turns, rng)
+        tick, present = latency.to_tick[fps], latency.to_present[fps]
+        bound = 1000 / fps + 2000 / snake.RENDER_FPS
+        ok = present.percentile(99) <= bound
+        failures += not ok
+        print(f"{fps:>5} {present.total:>6}   {tick.percentile(50):8.1f} {tick.percentile(99):6.1f}   "
+              f"{present.percentile(50):11.1f} {present.percentile(99):6.1f} {bound:6.1f}   "
+              f"{queue_delays.percentile(99):9.1f}  {'ok' if ok else 'SLOW'}")
+        combined.to_tick.update(latency.to_tick)
+        combined.to_present.update(latency.to_present)
+    if args.output:
+        combined.write_csv(args.output)
+    pygame.quit()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
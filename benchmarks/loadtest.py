@@ -0,0 +1,167 @@
+"""Load test for the multiplayer server: many simulated clients over localhost.
+
+Starts ``multiplayer.py --stats`` in a subprocess, or uses a running
+server given with --connect. It then connects --clients bots that turn at
+random and reports what they received:
+
+- how many stayed connected
+- the tick rate the server kept up
+- the longest gaps between deltas
+- the bandwidth per client
+
+Exits non-zero if a client was dropped or the server fell below
+--min-rate of its tick rate.
+
+    python benchmarks/loadtest.py --clients 150 --duration 20
+    python benchmarks/loadtest.py --clients 150 --decode   # bots also keep a full BoardMirror
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from multiplayer import (ARENA_CELLS, DELTA, FRAME, TICK_RATE, WELCOME, BoardMirror,  # noqa: E402
+                         read_varint)
+
+TURN_CHANCE = 0.05  # Chance a bot turns after each delta
+CONNECT_TIMEOUT = 10.0
+
+
+class BotStats:
+    def __init__(self):
+        self.welcomed = False
+        self.closed = False
+        self.messages = 0
+        self.bytes = 0
+        self.first_tick = self.last_tick = None
+        self.first_time = self.last_time = None
+        self.gaps = []
+
+
+async def bot(host, port, stats, rng, decode):
+    """Play at random until cancelled, recording every message received."""
+    reader, writer = await asyncio.open_connection(host, port)
+    mirror = BoardMirror() if decode else None
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            (length,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+            payload = await reader.readexactly(length)
+            now = loop.time()
+            stats.messages += 1
+            stats.bytes += FRAME.size + length
+            if mirror:
+                mirror.apply(payload)
+            if payload[0] == WELCOME:
+                stats.welcomed = True
+            elif payload[0] == DELTA:
+                tick = read_varint(payload, 1)[0]
+                if stats.first_tick is None:
+                    stats.first_tick, stats.first_time = tick, now
+                else:
+                    stats.gaps.append(now - stats.last_time)
+                stats.last_tick, stats.last_time = tick, now
+                if rng.random() < TURN_CHANCE:
+                    writer.write(bytes((rng.randrange(4),)))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        stats.closed = True
+    finally:
+        writer.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(host, port, timeout=CONNECT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), 1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+async def run(host, port, clients, duration, decode, seed):
+    rng = random.Random(seed)
+    all_stats = [BotStats() for _ in range(clients)]
+    tasks = []
+    for stats in all_stats:
+        tasks.append(asyncio.create_task(bot(host, port, stats, random.Random(rng.random()), decode)))
+        await asyncio.sleep(0)
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    errors = [result for result in results
+              if isinstance(result, BaseException) and not isinstance(result, asyncio.CancelledError)]
+    return all_stats, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=150)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run the bots for")
+    parser.add_argument("--cells", type=int, default=ARENA_CELLS, help="board size of the spawned server")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="tick rate of the spawned server")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="test a running server instead of spawning one")
+    parser.add_argument("--decode", action="store_true", help="bots apply every message to a BoardMirror")
+    parser.add_argument("--min-rate", type=float, default=0.9,
+                        help="fail below this share of the tick rate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "multiplayer.py"), "--host", host,
+                                   "--port", str(port), "--cells", str(args.cells),
+                                   "--tick-rate", str(args.tick_rate), "--seed", str(args.seed), "--stats"])
+    try:
+        wait_for_server(host, port)
+        all_stats, errors = asyncio.run(run(host, port, args.clients, args.duration, args.decode, args.seed))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    welcomed = [stats for stats in all_stats if stats.welcomed]
+    closed = sum(stats.closed for stats in all_stats)
+    rates = [(stats.last_tick - stats.first_tick) / (stats.last_time - stats.first_time)
+             for stats in welcomed if stats.last_time and stats.last_time > stats.first_time]
+    gaps = np.concatenate([stats.gaps for stats in welcomed if stats.gaps] or [np.zeros(1)]) * 1000
+    bandwidth = [stats.bytes / (stats.last_time - stats.first_time)
+                 for stats in welcomed if stats.last_time and stats.last_time > stats.first_time]
+    tick_rate = min(rates) if rates else 0.0
+    print(f"{len(welcomed)}/{args.clients} clients joined, {closed} dropped, {len(errors)} failed to connect")
+    print(f"server ticks seen: min {tick_rate:.1f}/s, mean {np.mean(rates or [0]):.1f}/s "
+          f"(target {args.tick_rate}/s)")
+    print(f"gap between deltas: p50 {np.percentile(gaps, 50):.1f} ms, p99 {np.percentile(gaps, 99):.1f} ms, "
+          f"max {gaps.max():.1f} ms")
+    print(f"per client: {np.mean(bandwidth or [0]) / 1024:.1f} KiB/s, "
+          f"{np.mean([stats.messages for stats in welcomed] or [0]) / args.duration:.1f} messages/s")
+
+    ok = len(welcomed) == args.clients and not closed and not errors and tick_rate >= args.min_rate * args.tick_rate
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
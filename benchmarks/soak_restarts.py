@@ -0,0 +1,84 @@
+"""Play-again soak test: restart the game many times headless and check memory stays flat.
+
+Each cycle starts a game through the scene manager, steers the snake into
+the wall and presses SPACE on the game-over screen. Exits non-zero if the
+resident set grows by more than the allowed budget after warm-up.
+
+    python benchmarks/soak_restarts.py --restarts 10000
+"""
+import argparse
+import gc
+import os
+import resource
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import snake  # noqa: E402
+from highscores import ScoreStore  # noqa: E402
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def key(key_code):
+    return pygame.event.Event(pygame.KEYDOWN, key=key_code)
+
+
+def play_once(manager):
+    """Run one game from the restart key press to the game-over screen, one tick per frame."""
+    game = manager.scenes["playing"].game
+    manager.run_frame([key(pygame.K_SPACE)])
+    manager.run_frame([key(pygame.K_UP)], 1000 / game.fps)
+    while manager.current is not manager.scenes["game_over"]:
+        manager.run_frame([], 1000 / game.fps)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restarts", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--budget-mb", type=float, default=8.0, help="allowed RSS growth after warm-up")
+    args = parser.parse_args(argv)
+
+    snake.DIRTY_RECTS = True
+    snake.init_display()
+    with tempfile.TemporaryDirectory() as directory:
+        snake.SCORES = ScoreStore(path=os.path.join(directory, "highscores.dat"))
+        manager = snake.SceneManager()
+
+        for _ in range(args.warmup):
+            play_once(manager)
+        gc.collect()
+        baseline = rss_bytes()
+
+        start = time.perf_counter()
+        for restart in range(1, args.restarts + 1):
+            play_once(manager)
+            if restart % 1000 == 0:
+                print(f"{restart:>7} restarts  rss {rss_bytes() / 2 ** 20:8.1f} MB")
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        growth = rss_bytes() - baseline
+        snake.SCORES.flush()
+
+    print(f"{args.restarts} restarts in {elapsed:.1f} s, RSS growth {growth / 2 ** 20:.2f} MB "
+          f"(budget {args.budget_mb} MB)")
+    return 0 if growth <= args.budget_mb * 2 ** 20 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
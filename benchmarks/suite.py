@@ -0,0 +1,317 @@
+"""Benchmark suite for the render and logic hot paths, with baseline comparison.
+
+Micro-benchmarks time draw_snake, display_score, message, the cached
+menu and game-over screens, Fruit.reset_position, the particle pool,
+the autopilot, the batch environment, the scrolling renderer, game
+snapshots and the shared memory state feed at a range of sizes. The
+macro benchmark plays seeded autopilot games through the scene manager
+with full rendering. Everything runs under SDL's dummy video/audio
+drivers:
+
+    python benchmarks/suite.py                     # run, compare to baseline.json
+    python benchmarks/suite.py --output out.json   # also write the results
+    python benchmarks/suite.py --save-baseline     # make this run the new baseline
+    python benchmarks/suite.py --filter particles  # only matching benchmarks
+
+Results are milliseconds per operation (best of several repeats). A
+benchmark more than --tolerance slower than its baseline is a regression
+and makes the run exit non-zero. Baselines are machine specific: record
+one on the machine you compare on.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+import snake  # noqa: E402
+import snapshot  # noqa: E402
+from autopilot import Autopilot, play as play_autopilot  # noqa: E402
+from batch_env import BatchSnakeEnv  # noqa: E402
+from bench_draw_snake import serpentine  # noqa: E402
+from highscores import ScoreStore  # noqa: E402
+from particles import PARTICLE_LIFESPAN, ParticlePool  # noqa: E402
+from statefeed import StateFeed  # noqa: E402
+from snake_engine import CELL_NUMBER, DIRECTIONS, FreeCells, Fruit, SnakeGame  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 0.25
+REPEAT = 7
+
+SNAKE_LENGTHS = (1, 10, 100, 400, 800, 1600)
+PARTICLE_COUNTS = (100, 1000, 10000)
+BOARD_FILLS = (0.0, 0.5, 0.9, 0.99)
+MACRO_SEED = 1234
+MACRO_TICKS = 2000
+AUTOPILOT_TICKS = 50000
+BATCH_SIZES = (1, 100, 1000)
+CAMERA_CASES = ((100, 1), (1000, 1), (1000, 10000), (1000, 500000), (2000, 1))
+SNAPSHOT_CASES = ((40, 1), (40, 800), (40, 1600), (1000, 10000))
+FEED_BOARDS = (40, 1000)
+
+
+def time_per_call(function, repeat=REPEAT):
+    """Best time of one call, in milliseconds."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+# Micro-benchmarks: each yields (name, ms per operation)
+
+def bench_draw_snake():
+    for length in SNAKE_LENGTHS:
+        snake_list = serpentine(length)
+        yield f"draw_snake[length={length}]", time_per_call(
+            lambda: snake.draw_snake(snake.SNAKE_BLOCK, snake_list, True, "RIGHT", False))
+
+
+def bench_display_score():
+    yield "display_score", time_per_call(lambda: snake.display_score(42))
+    yield "display_score[boost]", time_per_call(lambda: snake.display_score(42, True))
+
+
+def bench_message():
+    yield "message", time_per_call(lambda: snake.message("You Lost! Press Q or ESCAPE to Quit", snake.RED, -30))
+
+
+def bench_static_screens():
+    """Menu and game-over redraws from their cached surfaces, and the compositing a change costs."""
+    manager = snake.SceneManager()
+    for name in ("menu", "game_over"):
+        scene = manager.scenes[name]
+
+        def redraw(scene=scene):
+            scene.needs_redraw = True
+            scene.draw()
+
+        def compose(scene=scene):
+            scene.surface_key = None
+            redraw(scene)
+        yield f"static_screen[{name}]", time_per_call(redraw)
+        yield f"static_screen[{name},compose]", time_per_call(compose)
+
+
+def bench_fruit_reset():
+    size = CELL_NUMBER * CELL_NUMBER
+    rng = random.Random(0)
+    for fill in BOARD_FILLS:
+        free_cells = FreeCells(size)
+        for cell in rng.sample(range(size), int(size * fill)):
+            free_cells.discard(cell)
+        fruit = Fruit(CELL_NUMBER, free_cells, rng=rng)
+
+        def respawn():
+            # Give the fruit's cell back so the board stays at the same fill
+            free_cells.add(fruit.y * CELL_NUMBER + fruit.x)
+            fruit.reset_position()
+        yield f"fruit_reset_position[fill={fill:.0%}]", time_per_call(respawn)
+
+
+def bench_particles():
+    for count in PARTICLE_COUNTS:
+        pool = ParticlePool(rng=np.random.default_rng(0))
+        pool.spawn(snake.WIDTH / 2, snake.HEIGHT / 2, snake.RED, count)
+
+        def update():
+            # Keep every particle alive so each run updates the same count
+            pool.lifespan[:count] = PARTICLE_LIFESPAN
+            pool.update()
+        yield f"particles_update[count={count}]", time_per_call(update)
+        yield f"particles_draw[count={count}]", time_per_call(lambda: pool.draw(snake.WINDOW))
+
+
+# Macro-benchmark
+
+def bench_full_game():
+    """Play MACRO_TICKS seeded autopilot ticks through the scene manager, restarting on death."""
+    pilot = Autopilot()
+    manager = snake.SceneManager()
+    scene = manager.scenes["playing"]
+    manager.new_game(MACRO_SEED)
+    games = 1
+    frame_times = []
+    while len(frame_times) < MACRO_TICKS:
+        if manager.current is not scene:
+            manager.new_game(MACRO_SEED + games)
+            games += 1
+        pilot.drive(scene.game)
+        start = time.perf_counter()
+        manager.run_frame([], 1000 / scene.game.fps)
+        frame_times.append((time.perf_counter() - start) * 1000)
+    frame_times.sort()
+    yield "full_game[mean]", sum(frame_times) / len(frame_times)
+    yield "full_game[p95]", frame_times[int(len(frame_times) * 0.95)]
+
+
+def bench_autopilot():
+    """Headless autopilot games: decision plus simulation cost per tick."""
+    start = time.perf_counter()
+    game = play_autopilot(MACRO_SEED, max_ticks=AUTOPILOT_TICKS)
+    yield "autopilot_tick", (time.perf_counter() - start) * 1000 / game.ticks
+
+
+def bench_batch_env():
+    """One vectorized step of many boards with random actions, per board."""
+    for boards in BATCH_SIZES:
+        env = BatchSnakeEnv(boards, seed=0)
+        env.reset()
+        actions = itertools.cycle(np.random.default_rng(0).integers(-1, 4, (16, boards)))
+        yield f"batch_env_step[boards={boards}]", time_per_call(lambda: env.step(next(actions))) / boards
+
+
+def long_snake_game(cell_number, length):
+    """A game on a cell_number board whose snake winds row by row for length cells."""
+    game = SnakeGame(cell_number, seed=0)
+    for x, y in game.snake_list:
+        game.occupied[y * cell_number + x] = 0
+        game.free_cells.add(y * cell_number + x)
+    cells = [tuple(cell) for cell in serpentine(length, cell_number, 1)]
+    for tick, (x, y) in enumerate(cells):
+        game.occupied[y * cell_number + x] = 1
+        game.entered[y * cell_number + x] = tick
+        game.free_cells.discard(y * cell_number + x)
+    game.snake_list = deque(cells)
+    game.snake_length = length
+    game.ticks = length - 1
+    if length > 1:
+        (x1, y1), (x2, y2) = cells[-2:]
+        game.velocity = (x2 - x1, y2 - y1)
+        game.direction = next(name for name, delta in DIRECTIONS.items() if delta == game.velocity)
+    return game
+
+
+def bench_camera_draw():
+    """Scrolling renderer on huge boards: the cost should track the view, not the board or snake."""
+    particles = ParticlePool()
+    for cell_number, length in CAMERA_CASES:
+        game = long_snake_game(cell_number, length)
+        camera = snake.CameraRenderer(cell_number)
+        yield (f"camera_draw[board={cell_number},length={length}]",
+               time_per_call(lambda: camera.draw(game, particles, 0.5)))
+
+
+def bench_snapshot():
+    """Packing and unpacking a game snapshot, up to a snake covering the whole default board."""
+    for cell_number, length in SNAPSHOT_CASES:
+        game = long_snake_game(cell_number, length)
+        data = snapshot.pack(game)
+        yield f"snapshot_pack[board={cell_number},length={length}]", time_per_call(lambda: snapshot.pack(game))
+        yield f"snapshot_unpack[board={cell_number},length={length}]", time_per_call(lambda: snapshot.unpack(data))
+
+
+def bench_feed_publish():
+    """Publishing a tick to the shared memory state feed; should not grow with the board."""
+    for cell_number in FEED_BOARDS:
+        game = long_snake_game(cell_number, 100)
+        feed = StateFeed(cell_number)
+        feed.publish(game)
+
+        def publish():
+            feed.tick = game.ticks - 1  # As if the game just stepped, so only the changed cells are written
+            feed.publish(game)
+        yield f"feed_publish[board={cell_number}]", time_per_call(publish)
+        feed.close()
+
+
+BENCHMARKS = (bench_draw_snake, bench_display_score, bench_message, bench_static_screens, bench_fruit_reset,
+              bench_particles, bench_autopilot, bench_batch_env, bench_camera_draw, bench_snapshot,
+              bench_feed_publish, bench_full_game)
+
+
+def run(name_filter=None):
+    results = {}
+    for benchmark in BENCHMARKS:
+        if name_filter and name_filter not in benchmark.__name__:
+            continue
+        for name, ms in benchmark():
+            results[name] = ms
+            print(f"{name:<40} {ms:>10.4f} ms")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against the baseline; return the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, ms in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<40} {'-':>10} {ms:>10.4f} {'new':>8}")
+            continue
+        change = ms / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before:>10.4f} {ms:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--filter", help="only run benchmark groups whose name contains this text")
+    args = parser.parse_args(argv)
+
+    snake.init_display()
+    snake.RECORD_DIR = None
+    with tempfile.TemporaryDirectory() as directory:
+        # Scores from the macro benchmark must not reach the player's score file
+        snake.SCORES = ScoreStore(path=os.path.join(directory, "highscores.dat"))
+        results = run(args.filter)
+        snake.SCORES.flush()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nbaseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    regressions = compare(report["results"], baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Gameplay capture for QA: presented frames to a PNG sequence without stalling the frame loop.
+
+``FrameCapture.capture`` blits the window into one of a few pooled
+surfaces and returns; encoder threads turn the copy into a PNG. zlib
+releases the GIL while it compresses, so encoding overlaps the game
+loop (``pygame.image.save`` holds the GIL for the whole encode and would
+stall it). On Linux the encoders run at idle priority, so on a busy CPU
+they only use the time the loop sleeps away. When every pooled surface
+is still waiting to be encoded the frame is dropped and counted rather
+than blocking.
+
+Alongside the images, ``frames.csv`` lists every presented frame with
+the game tick it showed and when it was presented; dropped frames have
+no file.
+"""
+import csv
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+CAPTURE_WORKERS = 2
+CAPTURE_BUFFERS = 4  # Frames copied but not yet encoded; one more is dropped
+PNG_LEVEL = 1  # zlib level: fast beats small for a recording
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_UP_FILTER = 2  # Each row stored as its difference from the row above
+INDEX_NAME = "frames.csv"
+
+
+def idle_priority():
+    """Encoder thread initializer: only run when the game loop leaves the CPU idle, where the OS allows it."""
+    if sys.platform.startswith("linux"):
+        try:
+            os.sched_setscheduler(threading.get_native_id(), os.SCHED_IDLE, os.sched_param(0))
+        except OSError:
+            pass
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+
+
+def write_png(path, pixels, level=PNG_LEVEL):
+    """Write an (height, width, 3) uint8 RGB array as a PNG file."""
+    height, width, _ = pixels.shape
+    rows = np.empty((height, 1 + width * 3), dtype=np.uint8)
+    rows[:, 0] = PNG_UP_FILTER
+    flat = pixels.reshape(height, width * 3)
+    rows[0, 1:] = flat[0]
+    np.subtract(flat[1:], flat[:-1], out=rows[1:, 1:])
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB, no interlacing
+    with open(path, "wb") as file:
+        file.write(PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(rows, level))
+                   + png_chunk(b"IEND", b""))
+
+
+def surface_pixels(surface):
+    """Copy a 32-bit surface's pixels into a new (height, width, 3) RGB array."""
+    width, height = surface.get_size()
+    raw = np.frombuffer(surface.get_view("1"), dtype=np.uint8).reshape(height, surface.get_pitch())
+    raw = raw[:, :width * 4].reshape(height, width, 4)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, shift in enumerate(surface.get_shifts()[:3]):
+        pixels[:, :, channel] = raw[:, :, shift // 8 if sys.byteorder == "little" else 3 - shift // 8]
+    return pixels
+
+
+class FrameCapture:
+    """Records presented frames into directory as numbered PNGs plus a frame index.
+
+    ``written``, ``dropped`` and ``errors`` count what happened to the
+    frames handed to ``capture``; ``close`` waits for the encoders.
+    """
+
+    def __init__(self, directory, size, workers=CAPTURE_WORKERS, buffers=CAPTURE_BUFFERS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pool = queue.SimpleQueue()
+        for _ in range(buffers):
+            self.pool.put(pygame.Surface(size, 0, 32))
+        self.encoders = ThreadPoolExecutor(workers, "capture", initializer=idle_priority)
+        self.index_file = open(os.path.join(directory, INDEX_NAME), "w", newline="")
+        self.index = csv.writer(self.index_file)
+        self.index.writerow(("frame", "tick", "time_ms", "file"))
+        self.frames = 0
+        self.dropped = 0
+        self.errors = []  # Appended to from the encoder threads
+        self.start = time.perf_counter()
+
+    @property
+    def written(self):
+        return self.frames - self.dropped - len(self.errors)
+
+    def capture(self, surface, tick):
+        """Queue a copy of surface for encoding; returns False if the frame had to be dropped."""
+        frame = self.frames
+        self.frames += 1
+        time_ms = f"{(time.perf_counter() - self.start) * 1000:.3f}"
+        try:
+            buffer = self.pool.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            self.index.writerow((frame, tick, time_ms, ""))
+            return False
+        buffer.blit(surface, (0, 0))
+        name = f"{frame:06d}.png"
+        self.index.writerow((frame, tick, time_ms, name))
+        self.encoders.submit(self.encode, buffer, os.path.join(self.directory, name))
+        return True
+
+    def encode(self, buffer, path):
+        # The pooled surface goes back as soon as its pixels are copied out, before compressing
+        try:
+            pixels = surface_pixels(buffer)
+        finally:
+            self.pool.put(buffer)
+        try:
+            write_png(path, pixels)
+        except OSError as error:
+            self.errors.append(f"{path}: {error}")
+
+    def close(self):
+        self.encoders.shutdown(wait=True)
+        self.index_file.close()
+
+    def report(self):
+        line = f"captured {self.written} of {self.frames} frames to {self.directory}, {self.dropped} dropped"
+        return [line] + self.errors[:5]
@@ -0,0 +1,215 @@
+import atexit
+import os
+import struct
+import sys
+import threading
+import time
+
+from atomicfile import write_atomic
+
+# File layout (little endian):
+#   header  b"SNKH", version (B), player count (H)
+#   player  name length (B), UTF-8 name, entry count (H), entries
+#   entry   score (I), unix timestamp (I)
+MAGIC = b"SNKH"
+VERSION = 1
+HEADER = struct.Struct("<4sBH")
+NAME_HEADER = struct.Struct("<B")
+COUNT = struct.Struct("<H")
+ENTRY = struct.Struct("<II")
+MAX_PLAYERS = 0xFFFF
+MAX_ENTRY_VALUE = 0xFFFFFFFF  # Largest score or timestamp an entry can hold
+
+DEFAULT_PLAYER = "player"
+TOP_N = 10
+
+
+def default_path():
+    """Per-user score file, so the game never writes into the working directory"""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "snakePyGame", "highscores.dat")
+
+
+def encode(boards):
+    """Pack {player: [(score, timestamp), ...]} into the binary score file format."""
+    chunks = [HEADER.pack(MAGIC, VERSION, len(boards))]
+    for player, entries in boards.items():
+        # Cut on a character boundary: half a multibyte character would make the file undecodable
+        name = player.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+        chunks.append(NAME_HEADER.pack(len(name)))
+        chunks.append(name)
+        chunks.append(COUNT.pack(len(entries)))
+        chunks.extend(ENTRY.pack(score, timestamp) for score, timestamp in entries)
+    return b"".join(chunks)
+
+
+def decode(data):
+    """Unpack the binary score file format; raises ValueError on malformed data."""
+    try:
+        magic, version, players = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a high score file")
+        offset = HEADER.size
+        boards = {}
+        for _ in range(players):
+            (name_length,) = NAME_HEADER.unpack_from(data, offset)
+            offset += NAME_HEADER.size
+            player = data[offset:offset + name_length].decode("utf-8")
+            offset += name_length
+            (count,) = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            end = offset + count * ENTRY.size
+            if end > len(data):
+                raise ValueError("truncated high score file")
+            boards[player] = list(ENTRY.iter_unpack(data[offset:end]))
+            offset = end
+    except struct.error as error:
+        raise ValueError(str(error)) from error
+    return boards
+
+
+class ScoreStore:
+    """High scores held in memory with write-behind persistence.
+
+    Reads never touch the disk after the first load. ``submit`` updates the
+    in-memory leaderboard and wakes a background writer, which saves a
+    snapshot to a temporary file and atomically renames it into place.
+    """
+
+    def __init__(self, path=None, top_n=TOP_N, legacy_path=None):
+        self.path = path or default_path()
+        self.top_n = top_n
+        self.legacy_path = legacy_path
+        self.boards = None
+        self._high_score = 0
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._writer = None
+        self._write_failed = False  # Whether the last write left the file out of date
+        self._read_only = False  # Set when an unreadable score file could not be moved aside
+
+    def _load(self):
+        boards = {}
+        try:
+            with open(self.path, "rb") as file:
+                boards = decode(file.read())
+        except FileNotFoundError:
+            boards = self._load_legacy()
+        except (OSError, ValueError) as error:
+            boards = {}
+            self._set_aside(error)
+        self.boards = {player: sorted(entries, key=lambda entry: -entry[0])[:self.top_n]
+                       for player, entries in boards.items()}
+        self._high_score = max((entries[0][0] for entries in self.boards.values() if entries), default=0)
+
+    def _set_aside(self, error):
+        """Keep an unreadable score file out of the way instead of overwriting it with a fresh board."""
+        corrupt_path = f"{self.path}.{int(time.time())}.corrupt"
+        try:
+            os.replace(self.path, corrupt_path)
+        except OSError as rename_error:
+            self._read_only = True
+            print(f"High scores in {self.path} are unreadable ({error}) and could not be moved aside "
+                  f"({rename_error}); new scores will not be saved", file=sys.stderr)
+        else:
+            print(f"High scores in {self.path} are unreadable ({error}); moved to {corrupt_path}",
+                  file=sys.stderr)
+
+    def _load_legacy(self):
+        """Import the old single-number highscore.txt, if there is one"""
+        if not self.legacy_path:
+            return {}
+        try:
+            with open(self.legacy_path, "r") as file:
+                score = int(file.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {DEFAULT_PLAYER: [(score, int(os.path.getmtime(self.legacy_path)))]}
+
+    def _ensure_loaded(self):
+        if self.boards is None:
+            with self._lock:
+                if self.boards is None:
+                    self._load()
+
+    @property
+    def high_score(self):
+        """Best score across all players."""
+        self._ensure_loaded()
+        return self._high_score
+
+    def leaderboard(self, player=None, n=None):
+        """Top entries as (score, timestamp, player), best first; one player's or everybody's."""
+        self._ensure_loaded()
+        with self._lock:
+            if player is not None:
+                rows = [(score, timestamp, player) for score, timestamp in self.boards.get(player, ())]
+            else:
+                rows = [(score, timestamp, name) for name, entries in self.boards.items()
+                        for score, timestamp in entries]
+        rows.sort(key=lambda row: (-row[0], row[1]))
+        return rows[:n or self.top_n]
+
+    def submit(self, score, player=DEFAULT_PLAYER, timestamp=None):
+        """Record a finished game; returns True if it made the player's top N.
+
+        Raises ValueError for a score or timestamp the score file cannot hold,
+        or for a new player once it holds MAX_PLAYERS.
+        """
+        self._ensure_loaded()
+        if timestamp is None:
+            timestamp = int(time.time())
+        if not (0 <= score <= MAX_ENTRY_VALUE and 0 <= timestamp <= MAX_ENTRY_VALUE):
+            raise ValueError(f"score {score} and timestamp {timestamp} must be between 0 and {MAX_ENTRY_VALUE}")
+        with self._lock:
+            if player not in self.boards and len(self.boards) >= MAX_PLAYERS:
+                raise ValueError(f"the score file is full ({MAX_PLAYERS} players)")
+            entries = self.boards.setdefault(player, [])
+            if len(entries) >= self.top_n and score <= entries[-1][0]:
+                return False
+            entries.append((score, timestamp))
+            entries.sort(key=lambda entry: -entry[0])
+            del entries[self.top_n:]
+            self._high_score = max(self._high_score, score)
+            self._idle.clear()
+            self._dirty.set()
+        self._start_writer()
+        return True
+
+    def _start_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="ScoreStoreWriter", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            try:
+                with self._lock:
+                    data = encode(self.boards)
+                self._write(data)
+                failed = self._read_only
+            except (OSError, struct.error) as error:
+                # Keep playing; the next submit retries the write
+                print(f"High scores could not be saved to {self.path} ({error})", file=sys.stderr)
+                failed = True
+            with self._lock:
+                self._write_failed = failed
+                if not self._dirty.is_set():
+                    self._idle.set()
+
+    def _write(self, data):
+        if self._read_only:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_atomic(self.path, data)
+
+    def flush(self, timeout=2.0):
+        """Block until pending writes are done; True only if they reached the disk within the timeout."""
+        return self._idle.wait(timeout) and not self._write_failed
@@ -0,0 +1,612 @@
+"""Authoritative multiplayer: several snakes on one board, served over TCP with asyncio.
+
+The server owns the game. ``Arena`` plays every snake by the engine's
+rules: movement and turning, growth, speed-ups and the watermelon boost,
+with fruits placed through ``Fruit`` and one shared free-cell index.
+Snakes also die by running into each other, and they respawn after
+RESPAWN_DELAY. Clients only send direction changes, as one byte each.
+The server sends back binary snapshots. A client gets a full WELCOME
+snapshot when it joins. After that, each server tick broadcasts one DELTA
+holding the cells written that tick and the players whose state changed,
+so bandwidth follows what moved rather than the board size. Each delta is
+encoded once and the same bytes are written to every client.
+
+    python multiplayer.py --port 5555 --cells 100
+    python snake.py --connect localhost:5555
+"""
+import argparse
+import asyncio
+import random
+import socket
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from protocol import (ALIVE, APPLE, BOOST, CODE_FRUITS, DEFAULT_PORT, DELTA, EATING, EMPTY, FRAME, FRUIT_CODES, FULL,
+                      PROTOCOL_VERSION, SNAKE, WATERMELON, WELCOME, WELCOME_HEADER)
+from replay import CODE_DIRECTIONS, DIRECTION_CODES, read_varint, write_varint
+from snake_engine import (CELL_NUMBER, DIRECTIONS, EATING_DURATION, FPS_BASE, FRUIT_MAX_SPAWN, FRUIT_MIN_SPAWN,
+                          MAX_CELL_NUMBER, MAX_QUEUED_TURNS, OPPOSITE, SPEED_BOOST_DURATION, SPEED_INCREMENT, FreeCells,
+                          Fruit, board_size)
+
+ARENA_CELLS = 100
+TICK_RATE = 60  # Server ticks per second; each snake moves on its own 1000 / fps schedule within them
+MAX_PLAYERS = 250
+RESPAWN_DELAY = 2000
+MIN_APPLES = 2  # Apples on the board: one per player, but never fewer than this
+MAX_CLIENT_BUFFER = 256 * 1024  # Unsent bytes a client may fall behind by before it is dropped
+READ_SIZE = 256
+STATS_INTERVAL = 5.0
+
+
+class ProtocolError(ValueError):
+    """Raised for malformed or unexpected server messages."""
+
+
+def frame(payload):
+    return FRAME.pack(len(payload)) + payload
+
+
+def read_frames(buffer):
+    """Cut every complete message out of the front of buffer (a bytearray) and return their payloads."""
+    payloads = []
+    offset = 0
+    while len(buffer) - offset >= FRAME.size:
+        (length,) = FRAME.unpack_from(buffer, offset)
+        end = offset + FRAME.size + length
+        if end > len(buffer):
+            break
+        payloads.append(bytes(buffer[offset + FRAME.size:end]))
+        offset = end
+    del buffer[:offset]
+    return payloads
+
+
+class ArenaSnake:
+    """One player's snake. ``body`` holds row-major cells, tail first."""
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.leaving = False
+        self.respawn_at = 0.0
+        self.body = deque()
+        self.direction_queue = deque()
+        self.reset()
+
+    def reset(self):
+        """Back to a dead, length-1 snake that stands still once it spawns."""
+        self.body.clear()
+        self.direction_queue.clear()
+        self.alive = False
+        self.length = 1  # Length the body grows to, as SnakeGame.snake_length
+        self.direction = "RIGHT"
+        self.velocity = (0, 0)
+        self.fps = FPS_BASE
+        self.original_fps = FPS_BASE
+        self.next_move = 0.0
+        self.speed_boost_active = False
+        self.speed_boost_start_time = 0.0
+        self.eating = False
+        self.eating_start_time = 0.0
+
+    @property
+    def score(self):
+        return self.length - 1
+
+    @property
+    def flags(self):
+        return (DIRECTION_CODES[self.direction] | ALIVE * self.alive | BOOST * self.speed_boost_active
+                | EATING * self.eating)
+
+
+class Arena:
+    """Every snake and fruit on one board, advanced one fixed server tick at a time.
+
+    Like SnakeGame, it keeps an occupancy bitmap and a FreeCells index, here
+    shared by all snakes. ``cells`` holds each cell's value as clients see
+    it. Each write to ``cells`` during a tick is recorded in ``dirty``, and
+    each player whose flags or length changed is recorded in ``changed``.
+    ``take_delta`` encodes and clears both. Joining, leaving and turning
+    only take effect in ``tick``. Between ticks the state always matches
+    what the last delta described, so a WELCOME can be encoded at any time.
+    """
+
+    def __init__(self, cell_number=ARENA_CELLS, seed=None, tick_rate=TICK_RATE):
+        self.cell_number = cell_number
+        self.size = cell_number * cell_number
+        self.rng = random.Random(seed)
+        self.tick_interval = 1000 / tick_rate
+        self.ticks = 0
+        self.time_ms = 0.0
+        self.cells = bytearray(self.size)
+        self.occupied = bytearray(self.size)
+        self.free_cells = FreeCells(self.size)
+        self.fruits = {}  # cell -> Fruit
+        self.snakes = {}  # slot -> ArenaSnake
+        self.apples_eaten = 0
+        self.next_watermelon_spawn = self.rng.randint(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN)
+        self.deaths = 0
+        self.dirty = set()
+        self.changed = set()
+
+    def join(self):
+        """Reserve a player slot; its snake spawns on the next tick. Returns None when the arena is full."""
+        slot = next((slot for slot in range(MAX_PLAYERS) if slot not in self.snakes), None)
+        if slot is not None:
+            snake = self.snakes[slot] = ArenaSnake(slot)
+            snake.respawn_at = self.time_ms
+        return slot
+
+    def leave(self, slot):
+        self.snakes[slot].leaving = True
+
+    def queue_direction(self, slot, direction):
+        """Queue a turn, validated against the last queued direction as in SnakeGame.queue_direction."""
+        snake = self.snakes.get(slot)
+        if not snake or not snake.alive:
+            return
+        queue = snake.direction_queue
+        last = queue[-1] if queue else snake.direction
+        moving = queue or snake.velocity != (0, 0)
+        if direction != OPPOSITE[last] and not (direction == last and moving) and len(queue) < MAX_QUEUED_TURNS:
+            queue.append(direction)
+
+    def tick(self):
+        """Advance the arena by one server tick."""
+        self.ticks += 1
+        now = self.time_ms
+        for snake in list(self.snakes.values()):
+            if snake.leaving:
+                if snake.alive:
+                    self._kill(snake)
+                del self.snakes[snake.slot]
+                self.changed.add(snake.slot)
+            elif not snake.alive and now >= snake.respawn_at:
+                self._spawn(snake)
+
+        # Every tail that moves is freed before any head moves, as in SnakeGame.step
+        movers = []
+        for snake in self.snakes.values():
+            if not snake.alive or snake.next_move > now:
+                continue
+            snake.next_move = max(snake.next_move + 1000 / snake.fps, now)
+            if snake.direction_queue:
+                new_direction = snake.direction_queue.popleft()
+                if new_direction != OPPOSITE[snake.direction]:
+                    snake.direction = new_direction
+                    snake.velocity = DIRECTIONS[new_direction]
+                    self.changed.add(snake.slot)
+            if snake.velocity == (0, 0):
+                continue  # New snakes stand still until their first turn
+
+            head_y, head_x = divmod(snake.body[-1], self.cell_number)
+            head_x += snake.velocity[0]
+            head_y += snake.velocity[1]
+            if not (0 <= head_x < self.cell_number and 0 <= head_y < self.cell_number):
+                self._kill(snake)
+                continue
+            if len(snake.body) >= snake.length:
+                tail = snake.body.popleft()
+                self.occupied[tail] = 0
+                self.free_cells.add(tail)
+                self._set(tail, EMPTY)
+            movers.append((snake, head_y * self.cell_number + head_x))
+
+        heads = {}
+        for snake, cell in movers:
+            if not snake.alive:
+                continue
+            if self.occupied[cell]:
+                # Two heads meeting head-on both die
+                other = heads.get(cell)
+                if other and other.alive:
+                    self._kill(other)
+                self._kill(snake)
+                continue
+            self.occupied[cell] = 1
+            self.free_cells.discard(cell)
+            self._set(cell, SNAKE + snake.slot)
+            snake.body.append(cell)
+            heads[cell] = snake
+
+            if snake.speed_boost_active and now - snake.speed_boost_start_time > SPEED_BOOST_DURATION:
+                snake.speed_boost_active = False
+                snake.fps = snake.original_fps
+                self.changed.add(snake.slot)
+            fruit = self.fruits.get(cell)
+            if fruit:
+                self._eat(snake, fruit, cell, now)
+            if snake.eating and now - snake.eating_start_time > EATING_DURATION:
+                snake.eating = False
+                self.changed.add(snake.slot)
+
+        # One apple per player, topped up as cells come free
+        apples = sum(fruit.fruit_type == "apple" for fruit in self.fruits.values())
+        target = max(MIN_APPLES, len(self.snakes))
+        while apples < target and self.free_cells:
+            self._add_fruit(Fruit(self.cell_number, self.free_cells, rng=self.rng))
+            apples += 1
+        self.time_ms += self.tick_interval
+
+    def _set(self, cell, value):
+        self.cells[cell] = value
+        self.dirty.add(cell)
+
+    def _add_fruit(self, fruit):
+        cell = fruit.y * self.cell_number + fruit.x
+        self.fruits[cell] = fruit
+        self._set(cell, FRUIT_CODES[fruit.fruit_type])
+
+    def _eat(self, snake, fruit, cell, now):
+        del self.fruits[cell]
+        snake.length += fruit.points
+        snake.eating = True
+        snake.eating_start_time = now
+        self.changed.add(snake.slot)
+
+        if fruit.fruit_type == "watermelon":
+            snake.speed_boost_active = True
+            snake.original_fps = snake.fps
+            snake.fps += fruit.speed_boost
+            snake.speed_boost_start_time = now
+        else:
+            self.apples_eaten += 1
+            if fruit.reset_position():
+                self._add_fruit(fruit)
+            if (self.apples_eaten >= self.next_watermelon_spawn
+                    and not any(f.fruit_type == "watermelon" for f in self.fruits.values())):
+                watermelon = Fruit(self.cell_number, self.free_cells, "watermelon", rng=self.rng)
+                if watermelon.x is not None:
+                    self._add_fruit(watermelon)
+                    self.next_watermelon_spawn = self.apples_eaten + self.rng.randint(FRUIT_MIN_SPAWN,
+                                                                                      FRUIT_MAX_SPAWN)
+        snake.fps += SPEED_INCREMENT
+
+    def _spawn(self, snake):
+        cell = self.free_cells.sample(self.rng)
+        if cell is None:
+            return  # Board full: try again next tick
+        snake.reset()
+        snake.alive = True
+        snake.next_move = self.time_ms
+        snake.body.append(cell)
+        self.occupied[cell] = 1
+        self.free_cells.discard(cell)
+        self._set(cell, SNAKE + snake.slot)
+        self.changed.add(snake.slot)
+
+    def _kill(self, snake):
+        for cell in snake.body:
+            self.occupied[cell] = 0
+            self.free_cells.add(cell)
+            self._set(cell, EMPTY)
+        snake.body.clear()
+        snake.alive = False
+        snake.respawn_at = self.time_ms + RESPAWN_DELAY
+        self.deaths += 1
+        self.changed.add(snake.slot)
+
+    def take_delta(self):
+        """Encode what changed since the last call as a DELTA payload; None if nothing did."""
+        if not self.dirty and not self.changed:
+            return None
+        out = bytearray((DELTA,))
+        write_varint(out, self.ticks)
+        write_varint(out, len(self.changed))
+        for slot in sorted(self.changed):
+            snake = self.snakes.get(slot)
+            out += bytes((slot, snake.flags if snake else 0))
+            write_varint(out, snake.length if snake else 0)
+        write_varint(out, len(self.dirty))
+        previous = 0
+        cells = self.cells
+        for cell in sorted(self.dirty):
+            write_varint(out, cell - previous)
+            out.append(cells[cell])
+            previous = cell
+        self.dirty.clear()
+        self.changed.clear()
+        return bytes(out)
+
+    def welcome(self, slot):
+        """Encode the whole arena as a WELCOME payload for the player in slot."""
+        out = bytearray(WELCOME_HEADER.pack(WELCOME, PROTOCOL_VERSION, self.cell_number, slot))
+        write_varint(out, self.ticks)
+        alive = [snake for snake in self.snakes.values() if snake.alive]
+        write_varint(out, len(alive))
+        for snake in alive:
+            out += bytes((snake.slot, snake.flags))
+            write_varint(out, snake.length)
+            write_varint(out, len(snake.body))
+            for cell in snake.body:
+                write_varint(out, cell)
+        write_varint(out, len(self.fruits))
+        for cell in self.fruits:
+            write_varint(out, cell)
+            out.append(self.cells[cell])
+        return bytes(out)
+
+
+class BoardMirror:
+    """A client's copy of the arena, kept in step by applying the server's messages.
+
+    ``bodies`` maps each living player's slot to its cells, tail first.
+    A snake cell written in a delta is always that snake's new head, so
+    bodies are kept in order by appending it and trimming the tail to the
+    player's length.
+    """
+
+    def __init__(self):
+        self.cell_number = None
+        self.slot = None
+        self.ticks = 0
+        self.cells = bytearray()
+        self.bodies = {}
+        self.players = {}  # slot -> (flags, length)
+        self.fruits = {}  # cell -> fruit value
+
+    @property
+    def ready(self):
+        return self.cell_number is not None
+
+    def apply(self, payload):
+        kind = payload[0]
+        if kind == WELCOME:
+            self._apply_welcome(payload)
+        elif kind == DELTA:
+            self._apply_delta(payload)
+        elif kind == FULL:
+            raise ProtocolError("server is full")
+        else:
+            raise ProtocolError(f"unknown message type {kind}")
+
+    def _apply_welcome(self, payload):
+        _, version, cell_number, slot = WELCOME_HEADER.unpack_from(payload)
+        if version != PROTOCOL_VERSION:
+            raise ProtocolError(f"server speaks protocol {version}, not {PROTOCOL_VERSION}")
+        self.cell_number, self.slot = cell_number, slot
+        self.cells = bytearray(cell_number * cell_number)
+        self.bodies, self.players, self.fruits = {}, {}, {}
+        self.ticks, offset = read_varint(payload, WELCOME_HEADER.size)
+
+        count, offset = read_varint(payload, offset)
+        for _ in range(count):
+            player, flags = payload[offset], payload[offset + 1]
+            length, offset = read_varint(payload, offset + 2)
+            cells, offset = read_varint(payload, offset)
+            body = self.bodies[player] = deque()
+            for _ in range(cells):
+                cell, offset = read_varint(payload, offset)
+                body.append(cell)
+                self.cells[cell] = SNAKE + player
+            self.players[player] = (flags, length)
+
+        count, offset = read_varint(payload, offset)
+        for _ in range(count):
+            cell, offset = read_varint(payload, offset)
+            self.cells[cell] = self.fruits[cell] = payload[offset]
+            offset += 1
+
+    def _apply_delta(self, payload):
+        if not self.ready:
+            raise ProtocolError("delta before welcome")
+        self.ticks, offset = read_varint(payload, 1)
+        count, offset = read_varint(payload, offset)
+        # The server frees a tail before the head eats, so trims go by the length before this tick
+        lengths = {}
+        for _ in range(count):
+            player, flags = payload[offset], payload[offset + 1]
+            length, offset = read_varint(payload, offset + 2)
+            if flags & ALIVE:
+                lengths[player] = self.players.get(player, (flags, length))[1]
+                self.players[player] = (flags, length)
+                self.bodies.setdefault(player, deque())
+            else:
+                self.players.pop(player, None)
+                self.bodies.pop(player, None)
+
+        count, offset = read_varint(payload, offset)
+        cell = 0
+        grown = []
+        cells, fruits, bodies = self.cells, self.fruits, self.bodies
+        for _ in range(count):
+            gap, offset = read_varint(payload, offset)
+            cell += gap
+            value = cells[cell] = payload[offset]
+            offset += 1
+            if value >= SNAKE:
+                body = bodies.get(value - SNAKE)
+                if body is not None:
+                    body.append(cell)
+                    grown.append(value - SNAKE)
+                fruits.pop(cell, None)
+            elif value:
+                fruits[cell] = value
+            else:
+                fruits.pop(cell, None)
+        for player in grown:
+            body = bodies[player]
+            length = lengths.get(player) or self.players[player][1]
+            while len(body) > length:
+                body.popleft()
+
+    def body(self, slot):
+        """Cells of the player's snake as (x, y), tail first; empty while it is dead."""
+        return [divmod(cell, self.cell_number)[::-1] for cell in self.bodies.get(slot, ())]
+
+    def fruit_list(self):
+        """Fruits as (fruit_type, x, y), the shape of ``SnakeGame.state["fruits"]``."""
+        return [(CODE_FRUITS[value], *divmod(cell, self.cell_number)[::-1]) for cell, value in self.fruits.items()]
+
+
+class NetClient:
+    """A non-blocking connection for a frame loop: ``poll`` applies whatever has arrived since the last frame."""
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.mirror = BoardMirror()
+        self.closed = False
+        self.error = None
+
+    def send_turn(self, direction):
+        if self.closed:
+            return
+        try:
+            self.sock.send(bytes((DIRECTION_CODES[direction],)))
+        except BlockingIOError:
+            pass  # A turn is not worth blocking the frame for
+        except OSError as error:
+            self.close(str(error))
+
+    def poll(self):
+        """Read everything available and apply it; returns the number of messages applied."""
+        while not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError as error:
+                self.close(str(error))
+                break
+            if not data:
+                self.close("server closed the connection")
+                break
+            self.buffer += data
+        payloads = read_frames(self.buffer)
+        try:
+            for payload in payloads:
+                self.mirror.apply(payload)
+        except ValueError as error:  # ProtocolError, or ReplayError from a truncated varint
+            self.close(str(error))
+        return len(payloads)
+
+    def close(self, reason=None):
+        if not self.closed:
+            self.closed = True
+            self.error = reason
+            self.sock.close()
+
+
+class ArenaServer:
+    """Runs an Arena at a fixed tick rate and streams it to every connected client."""
+
+    def __init__(self, arena, tick_rate=TICK_RATE, stats=False):
+        self.arena = arena
+        self.tick_rate = tick_rate
+        self.stats = stats
+        self.clients = {}  # slot -> StreamWriter
+        self.tick_times = []
+        self.bytes_out = 0
+        self.dropped = 0
+
+    async def handle_client(self, reader, writer):
+        slot = self.arena.join()
+        if slot is None:
+            writer.write(frame(bytes((FULL,))))
+            writer.close()
+            return
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        writer.write(frame(self.arena.welcome(slot)))
+        self.clients[slot] = writer
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                for code in data:
+                    if code in CODE_DIRECTIONS:
+                        self.arena.queue_direction(slot, CODE_DIRECTIONS[code])
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[slot]
+            self.arena.leave(slot)
+            writer.close()
+
+    def broadcast(self, payload):
+        data = frame(payload)
+        for writer in list(self.clients.values()):
+            transport = writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # Too far behind to catch up; it can reconnect for a fresh WELCOME
+                transport.abort()
+                self.dropped += 1
+                continue
+            transport.write(data)
+            self.bytes_out += len(data)
+
+    async def run_ticks(self):
+        """Tick the arena on a fixed schedule, skipping ahead instead of bursting when it falls behind."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        next_report = next_tick + STATS_INTERVAL
+        while True:
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < -interval:
+                next_tick = loop.time()
+            # Yield even when running late, so clients are still read and accepted under load
+            await asyncio.sleep(max(delay, 0))
+            start = time.perf_counter()
+            self.arena.tick()
+            payload = self.arena.take_delta()
+            if payload:
+                self.broadcast(payload)
+            if self.stats:
+                # Only kept between reports, so a server without --stats holds no history
+                self.tick_times.append(time.perf_counter() - start)
+                if loop.time() >= next_report:
+                    self.report(loop.time() - next_report + STATS_INTERVAL)
+                    next_report = loop.time() + STATS_INTERVAL
+
+    def report(self, elapsed):
+        p50, p99 = np.percentile(self.tick_times, (50, 99)) * 1000 if self.tick_times else (0.0, 0.0)
+        alive = sum(snake.alive for snake in self.arena.snakes.values())
+        print(f"{len(self.clients)} clients ({alive} alive), {len(self.tick_times) / elapsed:.1f} ticks/s, "
+              f"tick p50 {p50:.2f} ms p99 {p99:.2f} ms, {self.bytes_out / elapsed / 1024:.0f} KiB/s out, "
+              f"{self.dropped} dropped", file=sys.stderr, flush=True)
+        self.tick_times.clear()
+        self.bytes_out = 0
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"listening on {host}:{port}, {self.arena.cell_number}x{self.arena.cell_number} cells, "
+              f"{self.tick_rate} ticks/s", file=sys.stderr, flush=True)
+        async with server:
+            await self.run_ticks()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an authoritative multiplayer snake server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cells", type=board_size, default=ARENA_CELLS,
+                        help=f"board size in cells, {CELL_NUMBER} to {MAX_CELL_NUMBER}")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="server ticks per second")
+    parser.add_argument("--seed", type=int, help="seed for fruit and spawn placement")
+    parser.add_argument("--stats", action="store_true",
+                        help=f"print tick timings and bandwidth every {STATS_INTERVAL:.0f} s")
+    args = parser.parse_args(argv)
+    if args.tick_rate < 1:
+        parser.error(f"--tick-rate must be at least 1, not {args.tick_rate}")
+
+    server = ArenaServer(Arena(args.cells, args.seed, args.tick_rate), args.tick_rate, args.stats)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import numpy as np
+import pygame
+
+PARTICLE_LIFESPAN = 35  # Number of frames a particle lives
+PARTICLE_CAPACITY = 10000
+
+# Pixels covered by a radius-1 circle, relative to its centre
+DOT_OFFSETS = ((-1, -1), (-1, 0), (0, -1), (0, 0))
+
+
+class ParticlePool:
+    """Fixed-capacity particle system stored as parallel NumPy arrays.
+
+    Live particles occupy slots ``[0, count)``. Spawning writes a block at the
+    end, updating and culling run over whole arrays, and dead particles are
+    freed by moving live ones from the end into their slots (swap-and-pop).
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.lifespan = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, color, count):
+        """Add up to ``count`` particles at (x, y) with random velocities; extra ones are dropped when full."""
+        start = self.count
+        end = min(start + count, self.capacity)
+        live = slice(start, end)
+        self.x[live] = x
+        self.y[live] = y
+        self.vx[live] = self.rng.uniform(-1, 1, end - start)  # Random horizontal velocity
+        self.vy[live] = self.rng.uniform(-1, 1, end - start)  # Random vertical velocity
+        self.lifespan[live] = PARTICLE_LIFESPAN
+        self.color[live] = color
+        self.count = end
+
+    def update(self):
+        """Move every particle one frame and free the dead ones."""
+        live = slice(0, self.count)
+        self.x[live] += self.vx[live]
+        self.y[live] += self.vy[live]
+        self.lifespan[live] -= 1
+
+        dead = np.flatnonzero(self.lifespan[live] <= 0)
+        if not len(dead):
+            return
+        # Swap-and-pop in bulk: live particles past the new end fill the holes before it
+        new_count = self.count - len(dead)
+        holes = dead[dead < new_count]
+        fillers = np.flatnonzero(self.lifespan[new_count:self.count] > 0) + new_count
+        for array in (self.x, self.y, self.vx, self.vy, self.lifespan, self.color):
+            array[holes] = array[fillers]
+        self.count = new_count
+
+    def pixel_positions(self):
+        """Integer pixel positions of the live particles."""
+        live = slice(0, self.count)
+        return self.x[live].astype(np.intp), self.y[live].astype(np.intp)
+
+    def draw(self, surface, offset=(0, 0)):
+        """Plot every live particle as a 2x2 dot straight into the surface's pixels.
+
+        ``offset`` is the board pixel shown at the surface's top-left;
+        particles outside the surface are culled.
+        """
+        if not self.count:
+            return
+        width, height = surface.get_size()
+        xs, ys = self.pixel_positions()
+        if offset != (0, 0):
+            xs -= offset[0]
+            ys -= offset[1]
+        colors = self.color[:self.count]
+        pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            for dx, dy in DOT_OFFSETS:
+                px, py = xs + dx, ys + dy
+                inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[inside], py[inside]] = colors[inside]
+        finally:
+            del pixels
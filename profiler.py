@@ -0,0 +1,203 @@
+import csv
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Frame phases in the order they happen; "frame" is the whole frame, wait included
+PHASES = ("events", "logic", "particles", "draw", "hud", "overlay", "present", "capture", "wait")
+COLUMNS = PHASES + ("frame",)
+PHASE_INDEX = {phase: index for index, phase in enumerate(PHASES)}
+
+PROFILE_FRAMES = 3600  # About a minute at 60 fps
+
+# Input latency histograms: LATENCY_BIN_MS bins up to LATENCY_MAX_MS, the last bin holding anything slower
+LATENCY_BIN_MS = 0.5
+LATENCY_MAX_MS = 1000
+
+# Overlay layout
+GRAPH_FRAMES = 120
+GRAPH_HEIGHT = 60
+GRAPH_SCALE = 2  # Pixels per millisecond
+PANEL_COLOR = (0, 0, 0)
+TEXT_COLOR = (255, 255, 255)
+UNDER_BUDGET_COLOR = (0, 200, 0)
+OVER_BUDGET_COLOR = (220, 40, 40)
+BUDGET_COLOR = (255, 255, 102)
+PADDING = 6
+
+
+class FrameProfiler:
+    """Per-phase frame timings in a preallocated ring buffer.
+
+    ``mark(phase)`` charges the time since the previous mark to ``phase``;
+    a phase may be marked several times per frame and its times add up.
+    ``end_frame`` stores the frame's row and starts the next one. Rows are
+    float32 milliseconds, one column per phase plus the whole frame.
+    """
+
+    def __init__(self, capacity=PROFILE_FRAMES):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(COLUMNS)), dtype=np.float32)
+        self.count = 0  # Frames recorded so far; the newest row is (count - 1) % capacity
+        self.visible = False
+        self.current = [0.0] * len(PHASES)
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[PHASE_INDEX[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        row = self.samples[self.count % self.capacity]
+        row[:len(PHASES)] = self.current
+        row[-1] = now - self.frame_start
+        row *= 1000
+        self.count += 1
+        self.current = [0.0] * len(PHASES)
+        self.frame_start = self.last = now
+
+    def recent(self, n=None):
+        """The last n recorded rows (all of them by default), oldest first."""
+        stored = min(self.count, self.capacity)
+        n = stored if n is None else min(n, stored)
+        end = self.count % self.capacity
+        if end >= n:
+            return self.samples[end - n:end]
+        return np.concatenate((self.samples[self.capacity - (n - end):], self.samples[:end]))
+
+    def percentiles(self, q=(50, 99)):
+        """Per-column percentiles over the buffer, shape (len(q), len(COLUMNS))."""
+        if not self.count:
+            return np.zeros((len(q), len(COLUMNS)), dtype=np.float32)
+        return np.percentile(self.recent(), q, axis=0)
+
+    def write_csv(self, path):
+        """Dump the buffered frames, oldest first, with their frame numbers."""
+        rows = self.recent()
+        first = self.count - len(rows)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("frame",) + tuple(f"{column}_ms" for column in COLUMNS))
+            for number, row in enumerate(rows.tolist(), first):
+                writer.writerow([number] + [f"{value:.3f}" for value in row])
+
+    def draw(self, surface, font, budget_ms, topleft=(10, 60)):
+        """Draw the frame-time graph and p50/p99 table; returns the rect covered."""
+        p50, p99 = self.percentiles()
+        lines = [f"frame  p50 {p50[-1]:5.1f}  p99 {p99[-1]:5.1f} ms"]
+        lines += [f"{phase:<9} {p50[index]:5.2f}  {p99[index]:5.2f}" for index, phase in enumerate(PHASES)]
+        line_height = font.get_linesize()
+        width = max(GRAPH_FRAMES, max(font.size(line)[0] for line in lines)) + 2 * PADDING
+        height = GRAPH_HEIGHT + len(lines) * line_height + 3 * PADDING
+        rect = pygame.Rect(topleft, (width, height))
+        surface.fill(PANEL_COLOR, rect)
+
+        # One bar per frame, newest on the right, with the frame budget as a line
+        left, bottom = rect.left + PADDING, rect.top + PADDING + GRAPH_HEIGHT
+        frames = self.recent(GRAPH_FRAMES)[:, -1]
+        start = left + GRAPH_FRAMES - len(frames)
+        for offset, frame_ms in enumerate(frames.tolist()):
+            bar = min(int(frame_ms * GRAPH_SCALE), GRAPH_HEIGHT)
+            color = OVER_BUDGET_COLOR if frame_ms > budget_ms else UNDER_BUDGET_COLOR
+            pygame.draw.line(surface, color, (start + offset, bottom), (start + offset, bottom - bar))
+        budget_y = bottom - min(int(budget_ms * GRAPH_SCALE), GRAPH_HEIGHT)
+        pygame.draw.line(surface, BUDGET_COLOR, (left, budget_y), (left + GRAPH_FRAMES, budget_y))
+
+        y = bottom + PADDING
+        for line in lines:
+            surface.blit(font.render(line, True, TEXT_COLOR), (left, y))
+            y += line_height
+        return rect
+
+
+class LatencyHistogram:
+    """Latencies counted in fixed LATENCY_BIN_MS bins, so memory stays flat however many are added."""
+
+    def __init__(self):
+        self.counts = np.zeros(int(LATENCY_MAX_MS / LATENCY_BIN_MS) + 1, dtype=np.int64)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[min(int(ms / LATENCY_BIN_MS), len(self.counts) - 1)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def mean(self):
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def percentile(self, q):
+        """Upper edge of the bin holding the q-th percentile, in ms."""
+        if not self.total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), max(q / 100 * self.total, 1)))
+        return min((index + 1) * LATENCY_BIN_MS, self.max_ms)
+
+
+class InputLatency:
+    """Follows accepted turns from their key event to the tick that applies them and the frame that shows it.
+
+    ``queued`` takes the event's receive time, ``ticked`` matches the turns
+    a tick took off the front of the direction queue, and ``presented``
+    closes them once the frame is on screen. Histograms are kept per speed
+    level: the game's fps when the turn was applied.
+    """
+
+    def __init__(self):
+        self.pending = deque()  # Receive times of turns still in the direction queue, oldest first
+        self.applied = []  # (receive time, fps) of turns applied since the last present
+        self.to_tick = {}
+        self.to_present = {}
+
+    def queued(self, received):
+        self.pending.append(received)
+
+    def ticked(self, consumed, fps, now):
+        for _ in range(min(consumed, len(self.pending))):
+            received = self.pending.popleft()
+            self._histogram(self.to_tick, fps).add((now - received) * 1000)
+            self.applied.append((received, fps))
+
+    def presented(self, now):
+        for received, fps in self.applied:
+            self._histogram(self.to_present, fps).add((now - received) * 1000)
+        self.applied.clear()
+
+    def discard(self):
+        """Forget turns that will never be applied, e.g. when a new game starts."""
+        self.pending.clear()
+        self.applied.clear()
+
+    @staticmethod
+    def _histogram(histograms, fps):
+        if fps not in histograms:
+            histograms[fps] = LatencyHistogram()
+        return histograms[fps]
+
+    def report(self):
+        """One line per speed level: turn count and input-to-tick / input-to-present percentiles."""
+        lines = ["  fps  turns   tick p50    p99    max   present p50    p99    max (ms)"]
+        for fps in sorted(self.to_tick):
+            tick, present = self.to_tick[fps], self.to_present.get(fps, LatencyHistogram())
+            lines.append(f"{fps:>5} {tick.total:>6}   {tick.percentile(50):8.1f} {tick.percentile(99):6.1f} "
+                         f"{tick.max_ms:6.1f}   {present.percentile(50):11.1f} {present.percentile(99):6.1f} "
+                         f"{present.max_ms:6.1f}")
+        return lines
+
+    def write_csv(self, path):
+        """Dump the non-empty histogram bins, one row per speed level, metric and bin."""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("fps", "metric", "bin_start_ms", "count"))
+            for metric, histograms in (("tick", self.to_tick), ("present", self.to_present)):
+                for fps in sorted(histograms):
+                    counts = histograms[fps].counts
+                    for index in np.nonzero(counts)[0].tolist():
+                        writer.writerow((fps, metric, f"{index * LATENCY_BIN_MS:g}", int(counts[index])))
@@ -0,0 +1,29 @@
+"""Wire format shared by the multiplayer server and its clients.
+
+Kept apart from multiplayer.py so the game can read player flags and the
+default port without importing asyncio on every single-player start.
+"""
+import struct
+
+DEFAULT_PORT = 5555
+
+# Cell values as clients see them; a snake cell is SNAKE + its player slot
+EMPTY, APPLE, WATERMELON, SNAKE = 0, 1, 2, 3
+FRUIT_CODES = {"apple": APPLE, "watermelon": WATERMELON}
+CODE_FRUITS = {code: fruit_type for fruit_type, code in FRUIT_CODES.items()}
+
+# Player flags, above the direction code (as in replays) in the low two bits
+ALIVE, BOOST, EATING = 4, 8, 16
+
+# Messages, each framed by its length (uint32, little endian):
+#   WELCOME  type (B), version (B), cell number (H), your slot (B), tick;
+#            snake count, per snake: slot (B), flags (B), length, body cell count, body cells tail first;
+#            fruit count, per fruit: cell, value (B)
+#   DELTA    type (B), tick; player count, per player: slot (B), flags (B), length;
+#            change count, per change: cell minus the previous change's cell, value (B)
+#   FULL     type (B): no free slot, the server closes the connection
+# Unmarked numbers are unsigned LEB128 varints. Clients send one direction code byte per turn.
+PROTOCOL_VERSION = 1
+WELCOME, DELTA, FULL = 1, 2, 3
+FRAME = struct.Struct("<I")
+WELCOME_HEADER = struct.Struct("<BBHB")
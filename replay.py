@@ -0,0 +1,183 @@
+"""Deterministic game replays: compact recording format and headless playback.
+
+A replay is the game's seed plus every accepted turn stamped with the tick
+it was queued on. Re-simulating those inputs with ``SnakeGame`` reproduces
+the game exactly, so a claimed score can be checked in milliseconds:
+
+    python replay.py verify replays/*.snkr
+"""
+import argparse
+import struct
+import sys
+import time
+
+from snake_engine import CELL_NUMBER, FPS_BASE, MAX_CELL_NUMBER, OPPOSITE, SnakeGame
+
+# File layout (little endian):
+#   header  b"SNKR", version (B), cell number (H), seed (Q), score (I), ticks (I), input count (I)
+#   inputs  one unsigned LEB128 varint each: (ticks since previous input << 2) | direction code
+MAGIC = b"SNKR"
+# Version 2 replays were recorded with turns validated against the last queued direction
+VERSION = 2
+HEADER = struct.Struct("<4sBHQIII")
+MAX_SEED = 2 ** 64 - 1  # Seeds are stored unsigned, in 64 bits
+DIRECTION_CODES = {"LEFT": 0, "RIGHT": 1, "UP": 2, "DOWN": 3}
+CODE_DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+REPLAY_EXTENSION = ".snkr"
+# Ticks a replay may idle before its first turn: an hour at the starting speed. Not a game rule,
+# a cap on the work a forged header can ask of the verifier
+MAX_IDLE_TICKS = 3600 * FPS_BASE
+
+
+class ReplayError(ValueError):
+    """Raised for malformed replay data."""
+
+
+def write_varint(out, value):
+    """Append value to the bytearray out as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """Decode the varint at offset; returns (value, offset after it)."""
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError("truncated data")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, offset
+
+
+class Replay:
+    def __init__(self, seed, inputs, score=0, ticks=0, cell_number=CELL_NUMBER, version=VERSION):
+        self.seed = seed
+        self.inputs = inputs  # [(tick, direction), ...] in queue order
+        self.score = score
+        self.ticks = ticks
+        self.cell_number = cell_number
+        self.version = version
+
+    @classmethod
+    def from_game(cls, game):
+        """Capture a finished (or running) game that was created with ``record=True``."""
+        if game.input_log is None:
+            raise ValueError("game was not recorded; create it with SnakeGame(record=True)")
+        return cls(game.seed, list(game.input_log), game.score, game.ticks, game.cell_number)
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, self.version, self.cell_number, self.seed, self.score, self.ticks,
+                                    len(self.inputs)))
+        last_tick = 0
+        for tick, direction in self.inputs:
+            write_varint(out, ((tick - last_tick) << 2) | DIRECTION_CODES[direction])
+            last_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version, cell_number, seed, score, ticks, count = HEADER.unpack_from(data)
+        except struct.error as error:
+            raise ReplayError(str(error)) from error
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise ReplayError("not a snake replay")
+        if not CELL_NUMBER <= cell_number <= MAX_CELL_NUMBER:
+            raise ReplayError(f"board size {cell_number} is not between {CELL_NUMBER} and {MAX_CELL_NUMBER}")
+
+        # Submissions are untrusted, and verifying costs a step per tick. Follow each turn through the
+        # game's queue (one is applied a tick): once the snake moves, it hits a wall within a board's
+        # width of the last turn applied, so no input and no end of the game can come later than that.
+        inputs = []
+        offset = HEADER.size
+        tick = 0
+        applied = 0  # Tick the latest turn leaves the queue on
+        direction, moving = "RIGHT", False
+        for _ in range(count):
+            value, offset = read_varint(data, offset)
+            tick += value >> 2
+            if moving and tick > applied + cell_number:
+                raise ReplayError(f"input at tick {tick}, after the snake must have died")
+            if not moving and tick > MAX_IDLE_TICKS:
+                raise ReplayError(f"first turn at tick {tick}, past the {MAX_IDLE_TICKS} idle ticks "
+                                  "the verifier will simulate")
+            inputs.append((tick, CODE_DIRECTIONS[value & 3]))
+            applied = max(tick, applied) + 1
+            if inputs[-1][1] != OPPOSITE[direction]:
+                direction, moving = inputs[-1][1], True
+        if moving and ticks > applied + cell_number:
+            raise ReplayError(f"{ticks} ticks, more than its inputs can play")
+        if not moving and ticks > MAX_IDLE_TICKS:
+            raise ReplayError(f"{ticks} ticks without a turn, past the {MAX_IDLE_TICKS} idle ticks "
+                              "the verifier will simulate")
+        return cls(seed, inputs, score, ticks, cell_number, version)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+def play(replay, max_ticks=None):
+    """Re-simulate a replay as fast as possible and return the finished game."""
+    game = SnakeGame(replay.cell_number, replay.seed)
+    inputs = replay.inputs
+    next_input = 0
+    max_ticks = replay.ticks if max_ticks is None else max_ticks
+    # Version 1 logged every turn the old, looser queue accepted: queue those as they were
+    queue = game.queue_direction if replay.version >= 2 else game.direction_queue.append
+    while game.alive and game.ticks < max_ticks:
+        while next_input < len(inputs) and inputs[next_input][0] <= game.ticks:
+            queue(inputs[next_input][1])
+            next_input += 1
+        game.step()
+    return game
+
+
+def verify(replay):
+    """Return (ok, game): whether re-simulating the replay reproduces its score and length."""
+    game = play(replay)
+    return game.score == replay.score and game.ticks == replay.ticks, game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify snake replays by re-simulating them headless")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("replays", nargs="+", help="replay files")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.replays:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ReplayError) as error:
+            print(f"{path}: unreadable ({error})")
+            failures += 1
+            continue
+        start = time.perf_counter()
+        try:
+            ok, game = verify(replay)
+        except Exception as error:  # One bad submission must not stop the rest of the batch
+            print(f"{path}: could not be replayed ({error!r})")
+            failures += 1
+            continue
+        elapsed = time.perf_counter() - start
+        status = "ok" if ok else f"MISMATCH (replayed score {game.score}, {game.ticks} ticks)"
+        print(f"{path}: score {replay.score}, {replay.ticks} ticks, {len(replay.inputs)} inputs "
+              f"-> {status} in {elapsed * 1000:.1f} ms")
+        failures += not ok
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Headless self-play across a process pool, for tuning rules and comparing policies.
+
+Seeds are split into chunks that worker processes play through; each
+chunk comes back as a list of compact per-game rows, which are streamed
+into running statistics (and optionally a CSV file), so memory stays flat
+however many games are played. Every policy plays the same seeds, which
+makes a run with several ``--policy`` options a tournament:
+
+    python selfplay.py --games 100000 --cells 10 --policy greedy --policy random
+    python selfplay.py --games 1000 --set FRUIT_MIN_SPAWN=2 --set FRUIT_MAX_SPAWN=6
+"""
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import snake_engine
+from autopilot import Autopilot
+from snake_engine import CELL_NUMBER, DIRECTIONS, MAX_CELL_NUMBER, OPPOSITE, SnakeGame
+
+CHUNK_SIZE = 200
+# Smallest board: small boards make quick games for tuning, and the autopilot's cycle needs 2x2
+MIN_CELLS = 2
+# Rule constants that --set may override in the workers
+TUNABLE = ("FPS_BASE", "SPEED_INCREMENT", "FRUIT_MIN_SPAWN", "FRUIT_MAX_SPAWN", "SPEED_BOOST_DURATION",
+           "EATING_DURATION")
+
+
+def safe_moves(game):
+    """Directions that do not kill the snake this tick."""
+    cell_number = game.cell_number
+    head_x, head_y = game.head
+    tail = game.snake_list[0]
+    tail_moves = len(game.snake_list) >= game.snake_length and len(game.snake_list) > 1
+    moves = []
+    for direction, (dx, dy) in DIRECTIONS.items():
+        x, y = head_x + dx, head_y + dy
+        if direction == OPPOSITE[game.direction] or not (0 <= x < cell_number and 0 <= y < cell_number):
+            continue
+        if not game.occupied[y * cell_number + x] or ((x, y) == tail and tail_moves):
+            moves.append(direction)
+    return moves
+
+
+class RandomPolicy:
+    """Any move that survives the tick, picked at random from the game's seed."""
+
+    def __init__(self, cell_number):
+        self.rng = random.Random()
+
+    def reset(self, seed):
+        self.rng.seed(seed)
+
+    def next_direction(self, game):
+        moves = safe_moves(game)
+        return self.rng.choice(moves) if moves else game.direction
+
+
+class GreedyPolicy:
+    """The surviving move that gets closest to a fruit."""
+
+    def __init__(self, cell_number):
+        pass
+
+    def reset(self, seed):
+        pass
+
+    def next_direction(self, game):
+        head_x, head_y = game.head
+        targets = [(fruit.x, fruit.y) for fruit in game.fruits if fruit.x is not None]
+
+        def distance(direction):
+            dx, dy = DIRECTIONS[direction]
+            return min((abs(head_x + dx - x) + abs(head_y + dy - y) for x, y in targets), default=0)
+        return min(safe_moves(game), key=distance, default=game.direction)
+
+
+class AutopilotPolicy(Autopilot):
+    """The autopilot, with the seeded reset the other policies take."""
+
+    def reset(self, seed=None):
+        super().reset()
+
+
+POLICIES = {
+    "autopilot": AutopilotPolicy,
+    "greedy": GreedyPolicy,
+    "random": RandomPolicy,
+}
+
+# Per-process policy instances, so tables are built once per worker
+_policies = {}
+
+
+def apply_overrides(overrides):
+    """Pool initializer: set the rule constants for this worker."""
+    for name, value in overrides.items():
+        setattr(snake_engine, name, value)
+
+
+def play_chunk(task):
+    """Play seeds [start, end) with one policy; returns one row per game."""
+    policy_name, start, end, cell_number, max_ticks = task
+    key = (policy_name, cell_number)
+    if key not in _policies:
+        _policies[key] = POLICIES[policy_name](cell_number)
+    policy = _policies[key]
+
+    game = SnakeGame(cell_number, start)
+    rows = []
+    for seed in range(start, end):
+        game.reset(seed)
+        policy.reset(seed)
+        while game.alive and game.ticks < max_ticks:
+            game.queue_direction(policy.next_direction(game))
+            game.step()
+        rows.append((policy_name, seed, game.score, len(game.snake_list), game.ticks,
+                     game.cause_of_death or "timeout"))
+    return rows
+
+
+class Summary:
+    """Running statistics for one policy's games in constant memory.
+
+    Scores and lengths are bounded by the board size, so exact
+    percentiles come from per-value counts.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.scores = Counter()
+        self.causes = Counter()
+
+    def add(self, score, ticks, cause):
+        self.games += 1
+        self.ticks += ticks
+        delta = score - self.mean
+        self.mean += delta / self.games
+        self.m2 += delta * (score - self.mean)
+        self.scores[score] += 1
+        self.causes[cause] += 1
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.games - 1)) if self.games > 1 else 0.0
+
+    def percentile(self, q):
+        rank = q / 100 * (self.games - 1)
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen > rank:
+                return score
+        return 0
+
+    def report(self, name):
+        if not self.games:
+            return f"{name}: 0 games"
+        causes = ", ".join(f"{cause} {count / self.games:.1%}" for cause, count in self.causes.most_common())
+        return (f"{name}: {self.games} games, score {self.mean:.2f} +/- {self.stdev:.2f} "
+                f"(min {self.percentile(0)}, p50 {self.percentile(50)}, p90 {self.percentile(90)}, "
+                f"max {self.percentile(100)}), {self.ticks / self.games:.0f} ticks/game; {causes}")
+
+
+def parse_override(text):
+    name, _, value = text.partition("=")
+    if name not in TUNABLE or not value:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE with NAME one of {', '.join(TUNABLE)}")
+    try:
+        return name, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} needs an integer value") from None
+
+
+def board_size(text):
+    cells = int(text)
+    if not MIN_CELLS <= cells <= MAX_CELL_NUMBER:
+        raise argparse.ArgumentTypeError(f"board size must be between {MIN_CELLS} and {MAX_CELL_NUMBER} cells")
+    return cells
+
+
+def check_rules(rules):
+    """Why the rule constants cannot be played with, or None if they can."""
+    if rules["FRUIT_MIN_SPAWN"] > rules["FRUIT_MAX_SPAWN"]:
+        return (f"FRUIT_MIN_SPAWN ({rules['FRUIT_MIN_SPAWN']}) must not be above "
+                f"FRUIT_MAX_SPAWN ({rules['FRUIT_MAX_SPAWN']})")
+    if rules["FPS_BASE"] < 1:
+        return f"FPS_BASE must be at least 1, not {rules['FPS_BASE']}"
+    # A negative increment would slow the snake down to 0 fps
+    for name in ("SPEED_INCREMENT", "SPEED_BOOST_DURATION", "EATING_DURATION"):
+        if rules[name] < 0:
+            return f"{name} must not be negative, not {rules[name]}"
+    return None
+
+
+def tasks(policies, seed, games, cell_number, max_ticks, chunk_size):
+    for start in range(seed, seed + games, chunk_size):
+        end = min(start + chunk_size, seed + games)
+        for policy in policies:
+            yield policy, start, end, cell_number, max_ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000, help="games per policy")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--policy", action="append", choices=sorted(POLICIES),
+                        help="policy to play (repeat for a tournament; default autopilot)")
+    parser.add_argument("--cells", type=board_size, default=CELL_NUMBER,
+                        help=f"board size in cells, {MIN_CELLS} to {MAX_CELL_NUMBER}")
+    parser.add_argument("--max-ticks", type=int, default=200000, help="end a game as a timeout after this many ticks")
+    parser.add_argument("--set", dest="overrides", action="append", type=parse_override, default=[],
+                        metavar="NAME=VALUE", help="override a rule constant in snake_engine")
+    parser.add_argument("--workers", "-j", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games per task")
+    parser.add_argument("--output", help="also write one CSV row per game to this file")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error(f"--games must be at least 1, not {args.games}")
+    if args.workers < 1:
+        parser.error(f"--workers must be at least 1, not {args.workers}")
+    if args.chunk_size < 1:
+        parser.error(f"--chunk-size must be at least 1, not {args.chunk_size}")
+    policies = args.policy or ["autopilot"]
+    if "autopilot" in policies and args.cells % 2:
+        parser.error(f"the autopilot policy needs an even board size, not --cells {args.cells}")
+    overrides = dict(args.overrides)
+    problem = check_rules({name: overrides.get(name, getattr(snake_engine, name)) for name in TUNABLE})
+    if problem:
+        parser.error(f"--set: {problem}")
+
+    summaries = {policy: Summary() for policy in policies}
+    total = args.games * len(policies)
+    output = open(args.output, "w", newline="") if args.output else None
+    writer = csv.writer(output) if output else None
+    if writer:
+        writer.writerow(("policy", "seed", "score", "length", "ticks", "cause"))
+
+    start = time.perf_counter()
+    done = 0
+    try:
+        with multiprocessing.Pool(args.workers, initializer=apply_overrides, initargs=(overrides,)) as pool:
+            chunks = tasks(policies, args.seed, args.games, args.cells, args.max_ticks, args.chunk_size)
+            for rows in pool.imap_unordered(play_chunk, chunks):
+                for policy, _, score, _, ticks, cause in rows:
+                    summaries[policy].add(score, ticks, cause)
+                if writer:
+                    writer.writerows(rows)
+                done += len(rows)
+                elapsed = time.perf_counter() - start
+                print(f"\r{done}/{total} games, {done / elapsed:.0f} games/s", end="", file=sys.stderr, flush=True)
+            # Let the workers exit on their own: leaving the with block terminates them with SIGTERM,
+            # which a worker forked from a process that started pygame (SDL catches it) ignores
+            pool.close()
+            pool.join()
+    finally:
+        if output:
+            output.close()
+    print(file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    if overrides:
+        print("rules: " + ", ".join(f"{name}={value}" for name, value in overrides.items()))
+    for policy in policies:
+        print(summaries[policy].report(policy))
+    print(f"{total} games in {elapsed:.1f} s on {args.workers} workers ({total / elapsed:.0f} games/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
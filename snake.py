@@ -1,23 +1,29 @@
+import argparse
 import math
-import random
+import numpy as np
 import pygame
-from collections import deque
 import os
 import sys
+import time
+from functools import lru_cache
+
+from assets import Assets
+from autopilot import Autopilot
+from capture import FrameCapture
+from highscores import ScoreStore
+from particles import ParticlePool
+from profiler import FrameProfiler, InputLatency
+from protocol import ALIVE, BOOST, DEFAULT_PORT, EATING
+from replay import CODE_DIRECTIONS, MAX_SEED, REPLAY_EXTENSION, Replay
+from snake_engine import CELL_NUMBER, DIRECTIONS, MAX_CELL_NUMBER, SnakeGame, board_size
+from statefeed import StateFeed
+import snapshot
 
 # Constants
 SNAKE_BLOCK = 20
-CELL_NUMBER = 40
 WIDTH, HEIGHT = SNAKE_BLOCK * CELL_NUMBER, SNAKE_BLOCK * CELL_NUMBER
-FPS_BASE = 10
-SPEED_INCREMENT = 1
 PARTICLE_COUNT = 20
-FRUIT_MIN_SPAWN = 4
-FRUIT_MAX_SPAWN = 10
-SPEED_BOOST_DURATION = 5000
-EATING_DURATION = 700
-BLINK_MIN_INTERVAL = 700
-BLINK_MAX_INTERVAL = 2000
+BOOST_PULSE_STEPS = 32
 
 # Colors
 WHITE = (255, 255, 255)
@@ -28,266 +34,212 @@ YELLOW = (255, 255, 102)
 BLUE = (50, 153, 213)
 SHADOW_COLOR = (50, 50, 50)
 
-
-def resource_path(relative_path):
-    """Get the absolute path to the resource, works for dev and for PyInstaller"""
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-
-pygame.init()
-
-# Display settings
-WINDOW = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Snake Game")
+# Display settings, set up by init_display()
+WINDOW = None
 
 # Clock - game speed
 CLOCK = pygame.time.Clock()
-current_fps = FPS_BASE
+
+# Gameplay frame rate, replaced by the display's refresh rate in init_display()
+RENDER_FPS = 60
+MAX_TICKS_PER_FRAME = 5
+
+# Frame cap for screens that only change on input, and how long they sleep waiting for it (ms)
+IDLE_FPS = 30
+IDLE_TIMEOUT = 1000
 
 # Game music state global variable
 muted = False
 
-# Load resources
-FONT_STYLE = pygame.font.Font(resource_path("dist/resources/Snake Chan/Snake Chan.ttf"), 40)
-SCORE_FONT = pygame.font.Font(resource_path("dist/resources/Snake Chan/Snake Chan.ttf"), 35)
-MENU_FONT = pygame.font.Font(resource_path("dist/resources/Snake Chan/Snake Chan.ttf"), 40)
-
-# Backgrounds
-MENU_BACKGROUND = pygame.transform.scale(
-    pygame.image.load(resource_path("dist/resources/menu_background.jpg")), (WIDTH, HEIGHT))
-GAME_BACKGROUND = pygame.image.load(resource_path("dist/resources/background_snake.png"))
-ENDGAME_BACKGROUND = pygame.transform.scale(
-    pygame.image.load(resource_path("dist/resources/endgame_background.png")), (WIDTH, HEIGHT))
-
-# Fruit images
-APPLE_IMG = pygame.image.load(resource_path("dist/resources/apple.png"))
-APPLE_IMG_SCALED = pygame.transform.scale(APPLE_IMG, (SNAKE_BLOCK, SNAKE_BLOCK))
-WATERMELON_IMG = pygame.transform.scale(
-    pygame.image.load(resource_path("dist/resources/watermelon.png")), (SNAKE_BLOCK, SNAKE_BLOCK))
-
-# Snake sprite sheet
-SPRITE_SHEET = pygame.image.load(resource_path("dist/resources/sprite_sheet.png"))
-
-# Sounds
-eat_sound = pygame.mixer.Sound(resource_path("dist/resources/eat_sound.wav"))
-pygame.mixer.music.load(resource_path("dist/resources/background_music.mp3"))
-
-
-def get_sprite(sheet, x, y, width, height):
-    """Extract a sprite from a sprite sheet"""
-    image = pygame.Surface((width, height), pygame.SRCALPHA)
-    image.blit(sheet, (0, 0), (x, y, width, height))
-    return image
-
-
-# Load snake skin images
-TAIL_UP = pygame.transform.rotate(get_sprite(SPRITE_SHEET, 40, 0, 20, 20), 90)
-BODY_VERTICAL = get_sprite(SPRITE_SHEET, 20, 0, 20, 20)
-BODY_RIGHT_TOP = get_sprite(SPRITE_SHEET, 0, 0, 20, 20)
-HEAD_DOWN_TONGUE_HIDDEN = pygame.transform.rotate(get_sprite(SPRITE_SHEET, 0, 20, 20, 20), 90)
-HEAD_DOWN_TONGUE_MID = pygame.transform.rotate(get_sprite(SPRITE_SHEET, 20, 20, 20, 20), 90)
-HEAD_DOWN_TONGUE_OUT = pygame.transform.rotate(get_sprite(SPRITE_SHEET, 40, 20, 20, 20), 90)
-
-BODY_RIGHT_BOTTOM = pygame.transform.rotate(BODY_RIGHT_TOP, 270)
-BODY_LEFT_BOTTOM = pygame.transform.rotate(BODY_RIGHT_BOTTOM, 270)
-BODY_LEFT_TOP = pygame.transform.rotate(BODY_RIGHT_BOTTOM, 180)
-BODY_HORIZONTAL = pygame.transform.rotate(BODY_VERTICAL, 90)
-
-
-class Fruit:
-    def __init__(self, snake_block, width, height, fruit_type="apple"):
-        self.x = None
-        self.y = None
-        self.snake_block = snake_block
-        self.width = width
-        self.height = height
-        self.fruit_type = fruit_type
-
-        if fruit_type == "apple":
-            self.image = APPLE_IMG_SCALED
-            self.points = 1
-            self.speed_boost = 0
-        elif fruit_type == "watermelon":
-            self.image = WATERMELON_IMG
-            self.points = 2
-            self.speed_boost = 4
-
-        self.reset_position()
-
-    def is_position_valid(self, snake_list, other_fruits):
-        """Check if the fruit's position is valid (not overlapping with snake/other fruits)."""
-        if snake_list:
-            for block in snake_list:
-                if block[0] == self.x and block[1] == self.y:
-                    return False
-
-        if other_fruits:
-            for fruit in other_fruits:
-                if fruit != self and fruit.x == self.x and fruit.y == self.y:
-                    return False
+# Render only the cells that changed each frame (--dirty-rects)
+DIRTY_RECTS = False
 
-        return True
+# Board size in cells (--cells); boards larger than the window scroll with the snake
+BOARD_CELLS = CELL_NUMBER
 
-    def reset_position(self, snake_list=None, other_fruits=None):
-        """Reset the fruit's position to a random location on the grid, ensuring it doesn't overlap with the snake or other fruits."""
-        while True:
-            self.x = round(random.randrange(0, self.width - self.snake_block) / self.snake_block) * self.snake_block
-            self.y = round(random.randrange(0, self.height - self.snake_block) / self.snake_block) * self.snake_block
-            if self.is_position_valid(snake_list, other_fruits):
-                break
+# Seed for every new game (--seed; None picks a fresh one) and where to save replays (--record)
+SEED = None
+RECORD_DIR = None
 
-    def draw(self, window):
-        """Draw the fruit on the window."""
-        window.blit(self.image, (self.x, self.y))
+# Autopilot driving the snake in demo mode (--autopilot), and how long game over shows before the next demo game (ms)
+AUTOPILOT = None
+DEMO_RESTART_DELAY = 3000
 
-    def is_eaten(self, snake_head):
-        """Check if the snake's head has collided with the fruit."""
-        return snake_head[0] == self.x and snake_head[1] == self.y
+# Multiplayer server to play on (--connect), as (host, port)
+CONNECT = None
 
+# Frame phase profiler: None while profiling is off (F3 toggles it), and where to dump it on exit (--profile)
+PROFILER = None
+PROFILE_PATH = None
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.vx = random.uniform(-1, 1)  # Random horizontal velocity
-        self.vy = random.uniform(-1, 1)  # Random vertical velocity
-        self.lifespan = 35  # Number of frames the particle will live
+# Input latency histograms: None unless --latency is recording them
+INPUT_LATENCY = None
+LATENCY_PATH = None
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifespan -= 1
+# Snapshot file a game in progress is saved to on exit and resumed from on start (--suspend)
+SUSPEND_PATH = None
 
-    def draw(self):
-        if self.lifespan > 0:
-            pygame.draw.circle(WINDOW, self.color, (int(self.x), int(self.y)), 1)
+# Frame capture for QA recordings: None unless --capture is writing frames to CAPTURE_DIR
+CAPTURE = None
+CAPTURE_DIR = None
+
+# Shared memory state feed for overlay and dashboard processes: None unless --feed names one
+FEED = None
+FEED_NAME = None
+
+# High scores, imported once from the old highscore.txt if present
+PLAYER_NAME = os.environ.get("SNAKE_PLAYER", "player")
+SCORES = ScoreStore(legacy_path="highscore.txt")
+
+# Images, fonts and sounds, loaded on first use
+ASSETS = Assets((WIDTH, HEIGHT), SNAKE_BLOCK)
+
+# Arrow keys to snake directions
+KEY_DIRECTIONS = {
+    pygame.K_LEFT: "LEFT",
+    pygame.K_RIGHT: "RIGHT",
+    pygame.K_UP: "UP",
+    pygame.K_DOWN: "DOWN",
+}
+
+# Head rotation for each direction
+HEAD_ANGLES = {"RIGHT": 0, "LEFT": 180, "UP": 90, "DOWN": 270}
+
+
+def save_replay(game, directory):
+    """Write the finished game's replay into directory; returns the file path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{game.seed}-{game.score}{REPLAY_EXTENSION}")
+    Replay.from_game(game).save(path)
+    return path
+
+
+def init_display():
+    """Start pygame and open the game window"""
+    global WINDOW, RENDER_FPS
+    pygame.init()
+    WINDOW = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Snake Game")
+
+    # Render gameplay at the monitor's refresh rate when SDL reports one
+    refresh_rates = getattr(pygame.display, "get_desktop_refresh_rates", lambda: [])()
+    if refresh_rates and refresh_rates[0] > 0:
+        RENDER_FPS = refresh_rates[0]
+    return WINDOW
 
 
 def spawn_particles(x, y, color, particles, count=PARTICLE_COUNT):
     """Create particles at the specified position with given color"""
-    center_x = x + SNAKE_BLOCK // 2
-    center_y = y + SNAKE_BLOCK // 2
-    for _ in range(count):
-        particles.append(Particle(center_x, center_y, color))
+    particles.spawn(x + SNAKE_BLOCK // 2, y + SNAKE_BLOCK // 2, color, count)
 
 
 def load_high_score():
-    """Load high score from file, return 0 if file doesn't exist."""
-    try:
-        with open("highscore.txt", "r") as file:
-            return int(file.read())
-    except FileNotFoundError:
-        return 0
+    """Return the best score so far (served from memory after the first load)."""
+    return SCORES.high_score
 
 
 def save_high_score(score):
-    """Save the high score to a file."""
-    with open("highscore.txt", "w") as file:
-        file.write(str(score))
-
-
-def draw_snake(snake_block, snake_list, nose_state, direction, eating):
-    """Draw the snake with all its segments"""
-    for i, block in enumerate(snake_list):
-        segment_image = None
-
-        # Determine segment type (head, tail, or body)
-        if i == len(snake_list) - 1:  # Head
-            # Select head image based on eating animation
-            if eating:
-                current_time = pygame.time.get_ticks()
-                if current_time % 400 < 100:
-                    segment_image = HEAD_DOWN_TONGUE_HIDDEN
-                elif current_time % 400 < 200:
-                    segment_image = HEAD_DOWN_TONGUE_MID
-                else:
-                    segment_image = HEAD_DOWN_TONGUE_OUT
-            else:
-                segment_image = HEAD_DOWN_TONGUE_HIDDEN
-
-            # Rotate head based on direction
-            if direction == "RIGHT":
-                segment_image = pygame.transform.rotate(segment_image, 0)
-            elif direction == "LEFT":
-                segment_image = pygame.transform.rotate(segment_image, 180)
-            elif direction == "UP":
-                segment_image = pygame.transform.rotate(segment_image, 90)
-            elif direction == "DOWN":
-                segment_image = pygame.transform.rotate(segment_image, 270)
-
-        elif i == 0:  # Tail
-            next_block = snake_list[i + 1]
-            dx = next_block[0] - block[0]
-            dy = next_block[1] - block[1]
-
-            if dx == snake_block:
-                segment_image = pygame.transform.rotate(TAIL_UP, 180)
-            elif dx == -snake_block:
-                segment_image = TAIL_UP
-            elif dy == snake_block:
-                segment_image = pygame.transform.rotate(TAIL_UP, 90)
-            elif dy == -snake_block:
-                segment_image = pygame.transform.rotate(TAIL_UP, 270)
-
-        else:  # Body segments
-            prev_block = snake_list[i - 1]
-            next_block = snake_list[i + 1]
-
-            prev_dx = block[0] - prev_block[0]
-            prev_dy = block[1] - prev_block[1]
-            next_dx = next_block[0] - block[0]
-            next_dy = next_block[1] - block[1]
-
-            if prev_dx == next_dx and prev_dy == next_dy:  # Straight segment
-                segment_image = BODY_VERTICAL if prev_dx == 0 else BODY_HORIZONTAL
-            else:  # Turning segment
-                if (prev_dx == snake_block and next_dy == -snake_block) or (
-                        prev_dy == snake_block and next_dx == -snake_block):
-                    segment_image = BODY_RIGHT_BOTTOM
-                elif (prev_dx == -snake_block and next_dy == snake_block) or (
-                        prev_dy == -snake_block and next_dx == snake_block):
-                    segment_image = BODY_LEFT_TOP
-                elif (prev_dx == -snake_block and next_dy == -snake_block) or (
-                        prev_dy == snake_block and next_dx == snake_block):
-                    segment_image = BODY_LEFT_BOTTOM
-                elif (prev_dx == snake_block and next_dy == snake_block) or (
-                        prev_dy == -snake_block and next_dx == -snake_block):
-                    segment_image = BODY_RIGHT_TOP
-
-        # Draw segment
-        if segment_image:
-            WINDOW.blit(segment_image, (block[0], block[1]))
-
-        # Draw eyes/nose for head
-        if i == len(snake_list) - 1:
-            head_x, head_y = block[0], block[1]
-            nose_radius = 1
-            nose_offset = 8
-
-            # Calculate nose positions based on direction
-            if direction == "RIGHT":
-                nose1_pos = (head_x + snake_block - nose_offset, head_y + nose_offset)
-                nose2_pos = (head_x + snake_block - nose_offset, head_y + snake_block - nose_offset)
-            elif direction == "LEFT":
-                nose1_pos = (head_x + nose_offset, head_y + nose_offset)
-                nose2_pos = (head_x + nose_offset, head_y + snake_block - nose_offset)
-            elif direction == "DOWN":
-                nose1_pos = (head_x + nose_offset, head_y + snake_block - nose_offset)
-                nose2_pos = (head_x + snake_block - nose_offset, head_y + snake_block - nose_offset)
-            elif direction == "UP":
-                nose1_pos = (head_x + nose_offset, head_y + nose_offset)
-                nose2_pos = (head_x + snake_block - nose_offset, head_y + nose_offset)
-
-            # Draw nose with appropriate size based on nose_state
-            radius = nose_radius if nose_state else nose_radius // 1.5
-            pygame.draw.circle(WINDOW, BLACK, nose1_pos, radius)
-            pygame.draw.circle(WINDOW, BLACK, nose2_pos, radius)
+    """Record a finished game; the score file is written in the background."""
+    SCORES.submit(score, PLAYER_NAME)
+
+
+@lru_cache(maxsize=4)
+def build_snake_atlas(snake_block):
+    """Build every snake tile variant once, keyed the way draw_snake classifies segments.
+
+    Returns (heads, tails, bodies):
+    heads  -- (direction, tongue state 0/1/2) -> head image
+    tails  -- delta from the tail to the next segment -> tail image
+    bodies -- (delta into the segment, delta out of it) -> body image
+    """
+    right, left, down, up = (snake_block, 0), (-snake_block, 0), (0, snake_block), (0, -snake_block)
+
+    tongues = (ASSETS.head_down_tongue_hidden, ASSETS.head_down_tongue_mid, ASSETS.head_down_tongue_out)
+    heads = {(direction, tongue): pygame.transform.rotate(image, angle)
+             for direction, angle in HEAD_ANGLES.items()
+             for tongue, image in enumerate(tongues)}
+
+    tails = {
+        right: pygame.transform.rotate(ASSETS.tail_up, 180),
+        left: ASSETS.tail_up,
+        down: pygame.transform.rotate(ASSETS.tail_up, 90),
+        up: pygame.transform.rotate(ASSETS.tail_up, 270),
+    }
+
+    bodies = {
+        # Straight segments
+        (right, right): ASSETS.body_horizontal, (left, left): ASSETS.body_horizontal,
+        (up, up): ASSETS.body_vertical, (down, down): ASSETS.body_vertical, ((0, 0), (0, 0)): ASSETS.body_vertical,
+        # Turning segments
+        (right, up): ASSETS.body_right_bottom, (down, left): ASSETS.body_right_bottom,
+        (left, down): ASSETS.body_left_top, (up, right): ASSETS.body_left_top,
+        (left, up): ASSETS.body_left_bottom, (down, right): ASSETS.body_left_bottom,
+        (right, down): ASSETS.body_right_top, (up, left): ASSETS.body_right_top,
+    }
+    return heads, tails, bodies
+
+
+def draw_snake(snake_block, snake_list, nose_state, direction, eating, positions=None):
+    """Draw the snake with all its segments in a single batched blit
+
+    Tiles are picked from snake_list; positions, when given, are the pixel
+    positions to draw each segment at (e.g. interpolated between ticks).
+    """
+    heads, tails, bodies = build_snake_atlas(snake_block)
+    if positions is None:
+        positions = snake_list
+    head_x, head_y = positions[-1]
+
+    # Deltas between consecutive segments, tail first
+    deltas = [(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(snake_list, snake_list[1:])]
+
+    # Classify tail and body segments in bulk
+    blit_sequence = []
+    if deltas:
+        tail = tails.get(deltas[0])
+        if tail:
+            blit_sequence.append((tail, positions[0]))
+        blit_sequence.extend((image, block) for image, block in zip(
+            map(bodies.get, zip(deltas, deltas[1:])), positions[1:-1]) if image)
+
+    head = heads.get((direction, tongue_state(eating)))
+    if head:
+        blit_sequence.append((head, (head_x, head_y)))
+
+    WINDOW.blits(blit_sequence, False)
+    draw_nose(snake_block, head_x, head_y, nose_state, direction)
+
+
+def tongue_state(eating):
+    """Head tongue frame (0 hidden, 1 mid, 2 out) for the eating animation"""
+    if not eating:
+        return 0
+    return min(pygame.time.get_ticks() % 400 // 100, 2)
+
+
+def draw_nose(snake_block, head_x, head_y, nose_state, direction):
+    """Draw the eyes/nose on the head"""
+    nose_radius = 1
+    nose_offset = 8
+
+    # Calculate nose positions based on direction
+    if direction == "RIGHT":
+        nose1_pos = (head_x + snake_block - nose_offset, head_y + nose_offset)
+        nose2_pos = (head_x + snake_block - nose_offset, head_y + snake_block - nose_offset)
+    elif direction == "LEFT":
+        nose1_pos = (head_x + nose_offset, head_y + nose_offset)
+        nose2_pos = (head_x + nose_offset, head_y + snake_block - nose_offset)
+    elif direction == "DOWN":
+        nose1_pos = (head_x + nose_offset, head_y + snake_block - nose_offset)
+        nose2_pos = (head_x + snake_block - nose_offset, head_y + snake_block - nose_offset)
+    elif direction == "UP":
+        nose1_pos = (head_x + nose_offset, head_y + nose_offset)
+        nose2_pos = (head_x + snake_block - nose_offset, head_y + nose_offset)
+
+    # Draw nose with appropriate size based on nose_state
+    radius = nose_radius if nose_state else nose_radius // 1.5
+    pygame.draw.circle(WINDOW, BLACK, nose1_pos, radius)
+    pygame.draw.circle(WINDOW, BLACK, nose2_pos, radius)
 
 
 def lerp_color(color1, color2, t):
@@ -295,81 +247,114 @@ def lerp_color(color1, color2, t):
     return tuple(int(a + (b - a) * t) for a, b in zip(color1, color2))
 
 
-def display_score(score, speed_boost_active=False):
-    """Display the current score and high score with visual effects"""
+def pulse_color(t):
+    """Pulsating boost color for t in [0, 1]: white -> red -> yellow"""
+    if t < 0.5:
+        # White to Red
+        return lerp_color((255, 255, 255), (255, 0, 0), t * 2)
+    # Red to Yellow
+    return lerp_color((255, 0, 0), (255, 255, 0), (t - 0.5) * 2)
+
+
+@lru_cache(maxsize=64)
+def render_outline(text, font, outline_color, outline_size, shadow_offset=0, shadow_color=SHADOW_COLOR):
+    """Render the outline (and optional drop shadow) of text once; the glyphs sit at (outline_size, outline_size)"""
+    width, height = font.size(text)
+    surface = pygame.Surface((width + 2 * outline_size + shadow_offset, height + 2 * outline_size + shadow_offset),
+                             pygame.SRCALPHA)
+    if shadow_offset:
+        surface.blit(font.render(text, True, shadow_color), (outline_size + shadow_offset, outline_size + shadow_offset))
+
+    outline_text = font.render(text, True, outline_color)
+    for dx in range(-outline_size, outline_size + 1):
+        for dy in range(-outline_size, outline_size + 1):
+            if dx != 0 or dy != 0:
+                surface.blit(outline_text, (outline_size + dx, outline_size + dy))
+    return surface
+
+
+@lru_cache(maxsize=128)
+def render_outlined(text, font, color, outline_color=BLACK, outline_size=1, shadow_offset=0):
+    """Render outlined text into one cached surface; blit it at (x - outline_size, y - outline_size)"""
+    surface = render_outline(text, font, outline_color, outline_size, shadow_offset).copy()
+    surface.blit(font.render(text, True, color), (outline_size, outline_size))
+    return surface
+
+
+@lru_cache(maxsize=8)
+def scaled_image(image, size):
+    """Scale an image once per target size"""
+    return pygame.transform.scale(image, size)
+
+
+@lru_cache(maxsize=BOOST_PULSE_STEPS)
+def boost_indicator(step):
+    """"SPEED BOOST!" with a 3px outline, tinted for one step of the pulse"""
+    return render_outlined("SPEED BOOST!", ASSETS.score_font, pulse_color(step / (BOOST_PULSE_STEPS - 1)), BLACK, 3)
+
+
+def hud_items(score, speed_boost_active=False):
+    """Cached (surface, position) pairs making up the score HUD"""
     high_score = load_high_score()
     text = f"Score: {score} High Score: {high_score}"
+    items = []
 
     if muted:
-        mute_text = "MUTED"
-        mute_surface = SCORE_FONT.render(mute_text, True, WHITE)
-        WINDOW.blit(mute_surface, (WIDTH - mute_surface.get_width() - 10, HEIGHT - mute_surface.get_height() - 10))
-        # Render shadow
-    shadow_text = SCORE_FONT.render(text, True, SHADOW_COLOR)
-    WINDOW.blit(shadow_text, (12, 12))  # Shadow offset of 2px
-
-    # Render outline
-    outline_offset = 1
-    for dx in [-outline_offset, 0, outline_offset]:
-        for dy in [-outline_offset, 0, outline_offset]:
-            if dx != 0 or dy != 0:
-                outline_text = SCORE_FONT.render(text, True, BLACK)
-                WINDOW.blit(outline_text, (10 + dx, 10 + dy))
+        mute_surface = render_outlined("MUTED", ASSETS.score_font, WHITE, outline_size=0)
+        items.append((mute_surface, (WIDTH - mute_surface.get_width() - 10, HEIGHT - mute_surface.get_height() - 10)))
 
-    # Render main text
-    main_text = SCORE_FONT.render(text, True, WHITE)
-    WINDOW.blit(main_text, (10, 10))
+    # Score line with a 2px shadow and a 1px outline
+    outline_size = 1
+    score_surface = render_outlined(text, ASSETS.score_font, WHITE, BLACK, outline_size, shadow_offset=2)
+    items.append((score_surface, (10 - outline_size, 10 - outline_size)))
 
-    # Draw apple icon
-    score_width = main_text.get_width()
-    score_height = main_text.get_height()
-    apple_icon_scaled = pygame.transform.scale(APPLE_IMG, (score_height, score_height))
-    WINDOW.blit(apple_icon_scaled, (10 + score_width + 10, 10))
+    # Apple icon
+    score_width, score_height = ASSETS.score_font.size(text)
+    items.append((scaled_image(ASSETS.apple, (score_height, score_height)), (10 + score_width + 10, 10)))
 
-    # Show speed boost indicator
+    # Speed boost indicator
     if speed_boost_active:
-        boost_text = "SPEED BOOST!"
         # Pulsate color: white -> red -> yellow -> white
         t = (math.sin(pygame.time.get_ticks() / 300) + 1) / 2  # t in [0,1]
-        if t < 0.5:
-            # White to Red
-            color = lerp_color((255, 255, 255), (255, 0, 0), t * 2)
-        else:
-            # Red to Yellow
-            color = lerp_color((255, 0, 0), (255, 255, 0), (t - 0.5) * 2)
+        boost_surface = boost_indicator(round(t * (BOOST_PULSE_STEPS - 1)))
+        items.append((boost_surface, (WIDTH - boost_surface.get_width() + 3 - 10, 40 - 3)))
+    return items
 
-        outline_size = 3
-        for dx in range(-outline_size, outline_size + 1):
-            for dy in range(-outline_size, outline_size + 1):
-                if dx != 0 or dy != 0:
-                    outline_surface = SCORE_FONT.render(boost_text, True, BLACK)
-                    WINDOW.blit(outline_surface, (WIDTH - SCORE_FONT.size(boost_text)[0] - 10 + dx, 40 + dy))
-        main_surface = SCORE_FONT.render(boost_text, True, color)
-        WINDOW.blit(main_surface, (WIDTH - SCORE_FONT.size(boost_text)[0] - 10, 40))
 
+def display_score(score, speed_boost_active=False, surface=None):
+    """Display the current score and high score with visual effects"""
+    (surface or WINDOW).blits(hud_items(score, speed_boost_active), False)
 
-def message(msg, color, y_offset=0, font=None):
-    """Display text message with wrapping and visual effects"""
-    if font is None:
-        font = FONT_STYLE
 
-    # Text wrapping
-    words = msg.split(' ')
+@lru_cache(maxsize=64)
+def wrap_text(msg, font, max_width):
+    """Split msg into lines no wider than max_width, breaking between words"""
     lines = []
     current_line = ''
-    for word in words:
+    for word in msg.split(' '):
         test_line = current_line + ' ' + word if current_line else word
-        if font.size(test_line)[0] > WIDTH - 40:
+        if font.size(test_line)[0] > max_width:
             lines.append(current_line)
             current_line = word
         else:
             current_line = test_line
     if current_line:
         lines.append(current_line)
+    return tuple(lines)
+
+
+def message(msg, color, y_offset=0, font=None, surface=None):
+    """Display text message with wrapping and visual effects"""
+    if font is None:
+        font = ASSETS.font_style
+    if surface is None:
+        surface = WINDOW
+    width, height = surface.get_size()
+    lines = wrap_text(msg, font, width - 40)
 
     # Calculate position
     total_height = len(lines) * font.get_height()
-    y_start = (HEIGHT - total_height) / 2 + y_offset
+    y_start = (height - total_height) / 2 + y_offset
     outline_size = 2
 
     # Draw each line with outline effect
@@ -377,248 +362,960 @@ def message(msg, color, y_offset=0, font=None):
         y_pos = y_start + i * font.get_height()
 
         # Draw outline
+        outline_surface = font.render(line, True, BLACK)
         for dx in range(-outline_size, outline_size + 1, 1):
             for dy in range(-outline_size, outline_size + 1, 1):
                 if dx != 0 or dy != 0:
-                    outline_surface = font.render(line, True, BLACK)
-                    text_rect = outline_surface.get_rect(center=(WIDTH / 2 + dx, y_pos + dy))
-                    WINDOW.blit(outline_surface, text_rect)
+                    text_rect = outline_surface.get_rect(center=(width / 2 + dx, y_pos + dy))
+                    surface.blit(outline_surface, text_rect)
 
         # Draw main text
         text_surface = font.render(line, True, color)
-        text_rect = text_surface.get_rect(center=(WIDTH / 2, y_pos))
-        WINDOW.blit(text_surface, text_rect)
-
-
-def main_menu():
-    """Display and handle the main menu"""
-    menu = True
-    while menu:
-        WINDOW.blit(MENU_BACKGROUND, (0, 0))
-        message("Welcome to the Snake Game!", WHITE, -270, MENU_FONT)
-        message("Press SPACE to play", WHITE, 30)
-        message("Press Q or ESCAPE to quit", WHITE, 100)
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    game_loop()
-                if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
-                    # quit()
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-                # quit()
+        text_rect = text_surface.get_rect(center=(width / 2, y_pos))
+        surface.blit(text_surface, text_rect)
+
+
+def interpolate_snake(previous, current, alpha, snake_block=SNAKE_BLOCK):
+    """Pixel positions of each segment, alpha of the way from the previous tick to the current one"""
+    offset = len(previous) - len(current)
+    positions = []
+    for index, (x, y) in enumerate(current):
+        prev_index = index + offset
+        prev_x, prev_y = previous[prev_index] if prev_index >= 0 else (x, y)
+        positions.append((round((prev_x + (x - prev_x) * alpha) * snake_block),
+                          round((prev_y + (y - prev_y) * alpha) * snake_block)))
+    return positions
+
+
+def draw_frame(game, particles, alpha=1.0, previous_snake=None):
+    """Redraw the whole game screen from the simulation state
+
+    With previous_snake, the snake is drawn alpha of the way between its
+    previous and current tick positions.
+    """
+    WINDOW.blit(ASSETS.game_background, (0, 0))
+
+    # Draw fruits
+    for fruit in game.fruits:
+        WINDOW.blit(ASSETS.fruit_images[fruit.fruit_type], (fruit.x * SNAKE_BLOCK, fruit.y * SNAKE_BLOCK))
+    if PROFILER:
+        PROFILER.mark("draw")
+
+    # Draw particles
+    particles.draw(WINDOW)
+    if PROFILER:
+        PROFILER.mark("particles")
+
+    # Draw snake and score
+    snake_list = [[x * SNAKE_BLOCK, y * SNAKE_BLOCK] for x, y in game.snake_list]
+    positions = None
+    if previous_snake and alpha < 1.0:
+        positions = interpolate_snake(previous_snake, game.snake_list, alpha)
+    draw_snake(SNAKE_BLOCK, snake_list, game.nose_state, game.direction, game.eating, positions)
+    if PROFILER:
+        PROFILER.mark("draw")
+    display_score(game.score, game.speed_boost_active)
+    if PROFILER:
+        PROFILER.mark("hud")
+
+
+class DirtyRectRenderer:
+    """Redraws only the board cells that changed since the last frame.
+
+    Each frame the cells under the snake's ends, the fruits, the particles
+    (old and new positions) and, when needed, the HUD are restored from the
+    background and repainted in the usual order. ``draw`` returns the rects
+    to pass to ``pygame.display.update``.
+    """
+
+    def __init__(self, snake_block=SNAKE_BLOCK):
+        self.snake_block = snake_block
+        self.heads, self.tails, self.bodies = build_snake_atlas(1)
+        self.tiles = {}
+        self.last_cells = set()
+        self.hud = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Force a full redraw on the next frame, e.g. after another screen was shown."""
+        self.full_redraw = True
+
+    def segment_tile(self, snake_list, index, direction, eating):
+        """Tile image for one segment, classified from its neighbours' cell deltas"""
+        last = len(snake_list) - 1
+        if index == last:
+            return self.heads.get((direction, tongue_state(eating)))
+        x, y = snake_list[index]
+        next_x, next_y = snake_list[index + 1]
+        if index == 0:
+            return self.tails.get((next_x - x, next_y - y))
+        prev_x, prev_y = snake_list[index - 1]
+        return self.bodies.get(((x - prev_x, y - prev_y), (next_x - x, next_y - y)))
+
+    def cells_under(self, rect):
+        """Board cells overlapped by a pixel rect"""
+        block = self.snake_block
+        cell_number = WIDTH // block
+        left, top = max(rect.left // block, 0), max(rect.top // block, 0)
+        right, bottom = min((rect.right - 1) // block, cell_number - 1), min((rect.bottom - 1) // block, cell_number - 1)
+        return {(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)}
+
+    def particle_cells(self, particles):
+        """Board cells touched by any particle's 2x2 dot"""
+        if not len(particles):
+            return set()
+        block = self.snake_block
+        cell_number = WIDTH // block
+        xs, ys = particles.pixel_positions()
+        cells = []
+        for px in (xs - 1, xs):
+            for py in (ys - 1, ys):
+                inside = (px >= 0) & (px < WIDTH) & (py >= 0) & (py < HEIGHT)
+                cells.append((py[inside] // block) * cell_number + px[inside] // block)
+        return {(cell % cell_number, cell // cell_number) for cell in np.unique(np.concatenate(cells)).tolist()}
+
+    def draw(self, game, particles):
+        block = self.snake_block
+        snake_list = game.snake_list
+
+        # Cells whose snake tile may have changed: both ends and the neck
+        changed = {0, len(snake_list) - 1}
+        if len(snake_list) > 1:
+            changed.add(len(snake_list) - 2)
+        for index in changed:
+            self.tiles[snake_list[index]] = self.segment_tile(snake_list, index, game.direction, game.eating)
+
+        fruit_cells = {(fruit.x, fruit.y): ASSETS.fruit_images[fruit.fruit_type] for fruit in game.fruits}
+        particle_cells = self.particle_cells(particles)
+
+        if self.full_redraw:
+            self.tiles = {cell: self.segment_tile(snake_list, index, game.direction, game.eating)
+                          for index, cell in enumerate(snake_list)}
+            dirty = {(x, y) for x in range(WIDTH // block) for y in range(HEIGHT // block)}
+        else:
+            dirty = {snake_list[index] for index in changed}
+            dirty |= self.last_cells
+            dirty |= fruit_cells.keys()
+            dirty |= particle_cells
+
+        # Forget tiles of cells the snake has left
+        for cell in self.last_cells:
+            if cell in self.tiles and not game.occupied[cell[1] * game.cell_number + cell[0]]:
+                del self.tiles[cell]
+
+        # The HUD sits on top of everything: repaint it when it changes or anything under it does
+        hud = hud_items(game.score, game.speed_boost_active)
+        hud_cells = set()
+        for surface, position in self.hud + hud:
+            hud_cells |= self.cells_under(surface.get_rect(topleft=position))
+        if self.full_redraw or hud != self.hud or not dirty.isdisjoint(hud_cells):
+            dirty |= hud_cells
+        else:
+            hud = []
+            hud_cells = set()
 
+        # Restore the background and fruits, then particles, snake and HUD on top
+        if self.full_redraw:
+            WINDOW.blit(ASSETS.game_background, (0, 0))
+        else:
+            WINDOW.blits([(ASSETS.game_background, (x * block, y * block), (x * block, y * block, block, block))
+                          for x, y in dirty], False)
+        WINDOW.blits([(fruit_cells[cell], (cell[0] * block, cell[1] * block))
+                      for cell in dirty if cell in fruit_cells], False)
+        if PROFILER:
+            PROFILER.mark("draw")
+        particles.draw(WINDOW)
+        if PROFILER:
+            PROFILER.mark("particles")
+        WINDOW.blits([(self.tiles[cell], (cell[0] * block, cell[1] * block))
+                      for cell in dirty if self.tiles.get(cell)], False)
+        head_x, head_y = snake_list[-1]
+        draw_nose(block, head_x * block, head_y * block, game.nose_state, game.direction)
+        WINDOW.blits(hud, False)
+        if hud:
+            self.hud = hud
+
+        # Cells to clean up next frame: the snake's ends and everything drawn over the board
+        self.last_cells = {snake_list[index] for index in changed} | particle_cells | set(fruit_cells)
+        if self.full_redraw:
+            self.full_redraw = False
+            return [WINDOW.get_rect()]
+        return [pygame.Rect(x * block, y * block, block, block) for x, y in dirty]
+
+
+class CameraRenderer:
+    """Draws the part of a board larger than the window, scrolling with the snake's head.
+
+    Render cost depends on the viewport, not on the board or the snake:
+    only background tiles in view are blitted, fruits and particles are
+    culled against the view, and the segments in view are read off the
+    board's occupancy grid. ``game.entered`` gives each one its place in
+    the body, so its neighbours (for its tile) and the cell it came from
+    (for interpolation) are grid lookups instead of a walk over the body.
+    """
+
+    def __init__(self, cell_number, snake_block=SNAKE_BLOCK, view_size=(WIDTH, HEIGHT)):
+        self.cell_number = cell_number
+        self.snake_block = snake_block
+        self.view_width, self.view_height = view_size
+        self.board_size = cell_number * snake_block
+        self.heads, self.tails, self.bodies = build_snake_atlas(1)
+        self.offset = (0, 0)
+
+    def follow(self, x, y):
+        """Centre the view on board pixel (x, y), clamped to the board; returns the offset."""
+        self.offset = (min(max(round(x) - self.view_width // 2, 0), self.board_size - self.view_width),
+                       min(max(round(y) - self.view_height // 2, 0), self.board_size - self.view_height))
+        return self.offset
+
+    def view_cells(self):
+        """Cell range (x0, y0, x1, y1) in view, with one cell to spare on each side."""
+        block, ox, oy = self.snake_block, *self.offset
+        return (max(ox // block - 1, 0), max(oy // block - 1, 0),
+                min((ox + self.view_width - 1) // block + 2, self.cell_number),
+                min((oy + self.view_height - 1) // block + 2, self.cell_number))
+
+    def visible_segments(self, game):
+        """Segments in view as lists: cell x, cell y, entered tick, delta in (dx, dy) and delta out (dx, dy)."""
+        n = game.cell_number
+        x0, y0, x1, y1 = self.view_cells()
+        occupied = np.frombuffer(game.occupied, dtype=np.uint8).reshape(n, n)
+        entered = np.frombuffer(game.entered, dtype=np.int64).reshape(n, n)
+
+        # Entered ticks around the view, one cell wider; -1 (never entered) off the board
+        window = np.full((y1 - y0 + 2, x1 - x0 + 2), -1, dtype=np.int64)
+        top, left, bottom, right = max(y0 - 1, 0), max(x0 - 1, 0), min(y1 + 1, n), min(x1 + 1, n)
+        window[top - y0 + 1:bottom - y0 + 1, left - x0 + 1:right - x0 + 1] = entered[top:bottom, left:right]
+
+        # Tail to head, so overlapping interpolated tiles stack the way draw_snake stacks them
+        ys, xs = np.nonzero(occupied[y0:y1, x0:x1])
+        ticks = window[ys + 1, xs + 1]
+        order = np.argsort(ticks)
+        ys, xs, ticks = ys[order], xs[order], ticks[order]
+        has_previous = ticks > 0
+        in_x, in_y, out_x, out_y = (np.zeros(len(ticks), dtype=np.int64) for _ in range(4))
+        for dx, dy in DIRECTIONS.values():
+            neighbour = window[ys + 1 + dy, xs + 1 + dx]
+            previous = has_previous & (neighbour == ticks - 1)
+            following = neighbour == ticks + 1
+            in_x -= dx * previous
+            in_y -= dy * previous
+            out_x += dx * following
+            out_y += dy * following
+        return ((xs + x0).tolist(), (ys + y0).tolist(), ticks.tolist(),
+                in_x.tolist(), in_y.tolist(), out_x.tolist(), out_y.tolist())
+
+    def draw_board(self, fruits):
+        """Draw the background tiles in view, then the fruits in view, given as (fruit_type, x, y)."""
+        block, ox, oy = self.snake_block, *self.offset
+        tile = ASSETS.game_background
+        tile_width, tile_height = tile.get_size()
+        WINDOW.blits([(tile, (tx * tile_width - ox, ty * tile_height - oy))
+                      for ty in range(oy // tile_height, (oy + self.view_height - 1) // tile_height + 1)
+                      for tx in range(ox // tile_width, (ox + self.view_width - 1) // tile_width + 1)], False)
+        x0, y0, x1, y1 = self.view_cells()
+        WINDOW.blits([(ASSETS.fruit_images[fruit_type], (x * block - ox, y * block - oy))
+                      for fruit_type, x, y in fruits if x0 <= x < x1 and y0 <= y < y1], False)
+
+    def draw(self, game, particles, alpha=1.0, grew=False):
+        """Draw the view, alpha of the way from the previous tick; grew means the tail stayed put."""
+        block = self.snake_block
+        back = 1.0 - alpha
+
+        # Follow the head's interpolated position; it moved by the velocity last tick
+        head_x, head_y = game.head
+        velocity_x, velocity_y = game.velocity
+        ox, oy = self.follow((head_x - back * velocity_x + 0.5) * block, (head_y - back * velocity_y + 0.5) * block)
+
+        self.draw_board((fruit.fruit_type, fruit.x, fruit.y) for fruit in game.fruits if fruit.x is not None)
+        if PROFILER:
+            PROFILER.mark("draw")
+
+        particles.draw(WINDOW, (ox, oy))
+        if PROFILER:
+            PROFILER.mark("particles")
+
+        # Segments in view, each slid back along the way it came
+        head_tick = game.ticks
+        tail_tick = game.ticks - len(game.snake_list) + 1
+        head_image = self.heads.get((game.direction, tongue_state(game.eating)))
+        tails, bodies = self.tails, self.bodies
+        blit_sequence = []
+        head_position = None
+        for x, y, tick, in_x, in_y, out_x, out_y in zip(*self.visible_segments(game)):
+            if tick == tail_tick and grew:
+                in_x = in_y = 0
+            position = (round((x - back * in_x) * block) - ox, round((y - back * in_y) * block) - oy)
+            if tick == head_tick:
+                image = head_image
+                head_position = position
+            elif tick == tail_tick:
+                image = tails.get((out_x, out_y))
+            else:
+                image = bodies.get(((in_x, in_y), (out_x, out_y)))
+            if image:
+                blit_sequence.append((image, position))
+        WINDOW.blits(blit_sequence, False)
+        if head_position:
+            draw_nose(block, *head_position, game.nose_state, game.direction)
+        if PROFILER:
+            PROFILER.mark("draw")
 
-def game_loop():
-    """Main game loop handling all game mechanics"""
-    global current_fps, muted
-    game_over = False
-    game_close = False
-    paused = False
+        display_score(game.score, game.speed_boost_active)
+        if PROFILER:
+            PROFILER.mark("hud")
 
-    # Load high score
-    high_score = load_high_score()
 
-    # Setup background music
-    pygame.mixer.music.play(-1)
-    pygame.mixer.music.set_volume(0.01)
-
-    # Initialize snake
-    x1, y1 = WIDTH / 2, HEIGHT / 2
-    x1_change, y1_change = 0, 0
-    snake_length = 1
-    snake_list = []
-    direction = "RIGHT"
-    direction_queue = deque()
-
-    # Fruit tracking
-    apples_eaten = 0
-    next_watermelon_spawn = random.randint(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN)
-    fruits = [Fruit(SNAKE_BLOCK, WIDTH, HEIGHT) for _ in range(2)]
-
-    # Animation and effects
-    particles = []
-    nose_state = True
-    last_breath_time = pygame.time.get_ticks()
-    blink_interval = random.randint(BLINK_MIN_INTERVAL, BLINK_MAX_INTERVAL)
-    eating = False
-    eating_start_time = 0
-
-    # Speed boost tracking
-    speed_boost_active = False
-    speed_boost_start_time = 0
-    original_fps = current_fps
-
-    while not game_over:
-        # Game Over screen
-        while game_close:
-            current_score = snake_length - 1
-            if current_score > high_score:
-                save_high_score(current_score)
-                high_score = current_score
-
-            WINDOW.blit(ENDGAME_BACKGROUND, (0, 0))
-            message("You Lost! Press Q or ESCAPE to Quit", RED, -30)
-            message("Press SPACE to Play Again", WHITE, 70)
-            display_score(current_score)
-            pygame.mixer.music.stop()
-            pygame.display.update()
+class Scene:
+    """One screen of the game. The SceneManager feeds it events, updates and draws it."""
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    game_over = True
-                    game_close = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
-                        game_over = True
-                        game_close = False
-                    if event.key == pygame.K_SPACE:
-                        current_fps = FPS_BASE
-                        game_loop()
-
-        # Handle input events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                game_over = True
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT and direction != "RIGHT":
-                    direction_queue.append("LEFT")
-                elif event.key == pygame.K_RIGHT and direction != "LEFT":
-                    direction_queue.append("RIGHT")
-                elif event.key == pygame.K_UP and direction != "DOWN":
-                    direction_queue.append("UP")
-                elif event.key == pygame.K_DOWN and direction != "UP":
-                    direction_queue.append("DOWN")
-                elif event.key == pygame.K_p:
-                    paused = not paused
-                    pygame.mixer.music.pause() if paused else pygame.mixer.music.unpause()
-                elif event.key == pygame.K_m:
-                    muted = not muted
-                    if muted:
-                        pygame.mixer.music.set_volume(0)
-                    else:
-                        pygame.mixer.music.set_volume(0.02)
-
-        if paused:
-            continue
-
-        # Process direction queue
-        if direction_queue:
-            new_direction = direction_queue.popleft()
-            if new_direction == "LEFT" and direction != "RIGHT":
-                x1_change, y1_change = -SNAKE_BLOCK, 0
-                direction = "LEFT"
-            elif new_direction == "RIGHT" and direction != "LEFT":
-                x1_change, y1_change = SNAKE_BLOCK, 0
-                direction = "RIGHT"
-            elif new_direction == "UP" and direction != "DOWN":
-                y1_change, x1_change = -SNAKE_BLOCK, 0
-                direction = "UP"
-            elif new_direction == "DOWN" and direction != "UP":
-                y1_change, x1_change = SNAKE_BLOCK, 0
-                direction = "DOWN"
-
-        # Check boundary collision
-        if x1 >= WIDTH or x1 < 0 or y1 >= HEIGHT or y1 < 0:
-            game_close = True
-
-        # Update snake position
-        x1 += x1_change
-        y1 += y1_change
-        WINDOW.blit(GAME_BACKGROUND, (0, 0))
-
-        # Draw fruits
-        for fruit in fruits:
-            fruit.draw(WINDOW)
-
-        # Update snake list
-        snake_head = [x1, y1]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
-
-        # Check self-collision
-        for block in snake_list[:-1]:
-            if block == snake_head:
-                game_close = True
-
-        # Update animations and timers
-        current_time = pygame.time.get_ticks()
-
-        # Check speed boost expiration
-        if speed_boost_active and current_time - speed_boost_start_time > SPEED_BOOST_DURATION:
-            speed_boost_active = False
-            current_fps = original_fps
-
-        # Update blinking animation
-        if current_time - last_breath_time > blink_interval:
-            nose_state = not nose_state
-            last_breath_time = current_time
-            blink_interval = random.randint(BLINK_MIN_INTERVAL, BLINK_MAX_INTERVAL)
-
-        # Check fruit eating collision
-        for i, fruit in enumerate(fruits[:]):
-            if fruit.is_eaten(snake_head):
-                snake_length += fruit.points
-                eating = True
-                eating_start_time = current_time
-                if not muted:
-                    eat_sound.play()
-
-                # Handle fruit effects
-                if fruit.fruit_type == "watermelon":
-                    speed_boost_active = True
-                    original_fps = current_fps
-                    current_fps += fruit.speed_boost
-                    speed_boost_start_time = current_time
-                    fruits.remove(fruit)
-                    spawn_particles(fruit.x, fruit.y, BLUE, particles)
-                else:  # Apple
-                    apples_eaten += 1
-                    fruit.reset_position(snake_list, fruits)
-                    spawn_particles(fruit.x, fruit.y, RED, particles)
-
-                    # Check if should spawn watermelon
-                    if apples_eaten >= next_watermelon_spawn and not any(f.fruit_type == "watermelon" for f in fruits):
-                        new_watermelon = Fruit(SNAKE_BLOCK, WIDTH, HEIGHT, "watermelon")
-                        fruits.append(new_watermelon)
-                        next_watermelon_spawn = apples_eaten + random.randint(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN)
-                        spawn_particles(new_watermelon.x, new_watermelon.y, BLUE, particles)
-
-                # Increase game speed slightly
-                current_fps += SPEED_INCREMENT
+    # Frame cap while the scene is on screen
+    fps = IDLE_FPS
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.needs_redraw = True
+
+    def enter(self):
+        """Called every time the scene becomes the current one."""
+        self.needs_redraw = True
+
+    def invalidate(self):
+        """Make the next draw repaint the whole screen, e.g. after something was drawn over it."""
+        self.needs_redraw = True
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, dt):
+        """Advance the scene by dt milliseconds of wall time."""
+
+    def draw(self):
+        """Draw the scene; return the rects to present, or None for the whole window."""
+
+    def frame_rate(self):
+        """Frames per second to cap this scene at."""
+        return self.fps
+
+    def is_animating(self):
+        """Whether the scene changes without input; idle scenes sleep until the next event."""
+        return False
+
+
+class StaticScene(Scene):
+    """A screen that only changes on input: drawn once, then left alone.
+
+    ``compose`` describes the screen as a background, text lines and an
+    optional score. The screen is composited once into a cached surface,
+    wrapped and outlined text included, and rebuilt only when that
+    description or the window size changes, so a redraw is a single blit.
+    """
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.surface = None
+        self.surface_key = None
+
+    def draw(self):
+        if not self.needs_redraw:
+            return []
+        self.needs_redraw = False
+        background, lines, score = self.compose()
+        # The HUD's cached surfaces stand for everything it shows: score, high score, muted
+        hud = None if score is None else tuple(hud_items(score))
+        key = (WINDOW.get_size(), background, lines, hud)
+        if key != self.surface_key:
+            self.surface = pygame.Surface(WINDOW.get_size()).convert()
+            self.surface.blit(background, (0, 0))
+            for msg, color, y_offset, font in lines:
+                message(msg, color, y_offset, font, self.surface)
+            if hud:
+                self.surface.blits(hud, False)
+            self.surface_key = key
+        WINDOW.blit(self.surface, (0, 0))
+
+    def compose(self):
+        """Return (background, ((text, color, y offset, font), ...), score or None)."""
+        raise NotImplementedError
+
+
+class MenuScene(StaticScene):
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                self.manager.new_game()
+            if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+                self.manager.quit()
+
+    def compose(self):
+        return ASSETS.menu_background, (
+            ("Welcome to the Snake Game!", WHITE, -270, ASSETS.menu_font),
+            ("Press SPACE to play", WHITE, 30, ASSETS.font_style),
+            ("Press Q or ESCAPE to quit", WHITE, 100, ASSETS.font_style),
+        ), None
+
+
+class PlayScene(Scene):
+    """Feeds input to the simulation and renders its state. One game, particle pool and renderer are reused.
+
+    The simulation runs on a fixed timestep: wall time accumulates and the
+    game steps once per ``1000 / fps`` ms, so game speed only sets the tick
+    interval. Frames are drawn at the display refresh rate with the snake
+    interpolated between its last two ticks.
+    """
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.game = SnakeGame(BOARD_CELLS, record=True)
+        self.particles = ParticlePool()
+        self.camera = CameraRenderer(BOARD_CELLS) if BOARD_CELLS > CELL_NUMBER else None
+        self.renderer = DirtyRectRenderer() if DIRTY_RECTS and not self.camera else None
+        self.accumulator = 0.0
+        self.previous_snake = None
+        self.grew = False
+        self.ticks = 0
+        self.resuming = True
+
+    def reset(self, seed=None):
+        """Start a fresh game in place."""
+        self.game.reset(SEED if seed is None else seed)
+        # Particles get their own stream, derived from the game seed
+        self.particles.rng = np.random.default_rng(self.game.seed)
+        self.particles.clear()
+        if self.renderer:
+            self.renderer.invalidate()
+        if AUTOPILOT:
+            AUTOPILOT.reset()
+        if INPUT_LATENCY:
+            INPUT_LATENCY.discard()
+        if FEED:
+            FEED.publish(self.game)
+
+        # Setup background music
+        ASSETS.load_music()
+        pygame.mixer.music.play(-1)
+        pygame.mixer.music.set_volume(0.01)
+
+    def resume(self, game):
+        """Continue a game restored from a snapshot."""
+        global AUTOPILOT
+        if AUTOPILOT and AUTOPILOT.cell_number != game.cell_number:
+            # The autopilot's tables are per board size; a snapshot may come from another board
+            if game.cell_number % 2:
+                raise ValueError(f"the autopilot needs an even board size, not {game.cell_number}")
+            AUTOPILOT = Autopilot(game.cell_number)
+        self.game = game
+        self.particles.rng = np.random.default_rng(game.seed)
+        self.particles.clear()
+        self.previous_snake = None
+        self.camera = CameraRenderer(game.cell_number) if game.cell_number > CELL_NUMBER else None
+        self.renderer = DirtyRectRenderer() if DIRTY_RECTS and not self.camera else None
+        if AUTOPILOT:
+            AUTOPILOT.reset()
+        if INPUT_LATENCY:
+            INPUT_LATENCY.discard()
+        if FEED:
+            FEED.publish(game)
+        ASSETS.load_music()
+        pygame.mixer.music.play(-1)
+        pygame.mixer.music.set_volume(0.01)
+
+    def enter(self):
+        super().enter()
+        # Time spent in other scenes is not game time
+        self.resuming = True
+        if self.renderer:
+            self.renderer.invalidate()
+
+    def invalidate(self):
+        super().invalidate()
+        if self.renderer:
+            self.renderer.invalidate()
+
+    def handle_event(self, event):
+        global muted
+        if event.type == pygame.KEYDOWN:
+            if event.key in KEY_DIRECTIONS and not AUTOPILOT:
+                if self.game.queue_direction(KEY_DIRECTIONS[event.key]) and INPUT_LATENCY:
+                    INPUT_LATENCY.queued(getattr(event, "received", None) or time.perf_counter())
+            elif event.key == pygame.K_p:
+                if self.manager.current is self:
+                    pygame.mixer.music.pause()
+                    self.manager.switch("paused")
+                else:
+                    pygame.mixer.music.unpause()
+                    self.manager.switch("playing")
+            elif event.key == pygame.K_m:
+                muted = not muted
+                if muted:
+                    pygame.mixer.music.set_volume(0)
+                else:
+                    pygame.mixer.music.set_volume(0.02)
+
+    def update(self, dt):
+        if self.resuming:
+            self.resuming = False
+            self.accumulator = 0.0
+        self.accumulator += dt
+
+        # Run every tick that is due, but never fall further behind than MAX_TICKS_PER_FRAME
+        self.ticks = 0
+        tick_interval = 1000 / self.game.fps
+        while self.accumulator >= tick_interval and self.manager.current is self:
+            if self.ticks == MAX_TICKS_PER_FRAME:
+                self.accumulator = 0.0
+                break
+            # The camera interpolates from the grid; copying a huge body every tick would not scale
+            length = len(self.game.snake_list)
+            if not self.camera:
+                self.previous_snake = list(self.game.snake_list)
+            if AUTOPILOT:
+                AUTOPILOT.drive(self.game)
+            queued, fps = len(self.game.direction_queue), self.game.fps
+            self.tick()
+            if INPUT_LATENCY:
+                INPUT_LATENCY.ticked(queued - len(self.game.direction_queue), fps, time.perf_counter())
+            self.grew = len(self.game.snake_list) > length
+            self.accumulator -= tick_interval
+            tick_interval = 1000 / self.game.fps
+            self.ticks += 1
+
+    def tick(self):
+        """Advance the simulation by one tick and react to what happened."""
+        self.particles.update()
+        if PROFILER:
+            PROFILER.mark("particles")
+        events = self.game.step()
+        if FEED:
+            FEED.publish(self.game)
+        for event in events:
+            if event[0] == "death":
+                save_high_score(self.game.score)
+                if RECORD_DIR and self.game.input_log is not None:
+                    try:
+                        save_replay(self.game, RECORD_DIR)
+                    except OSError as error:
+                        # Keep playing, as the score store does when it cannot write
+                        print(f"Replay could not be saved to {RECORD_DIR} ({error})", file=sys.stderr)
+                self.manager.switch("game_over")
+            elif event[0] == "eat":
+                _, fruit_type, x, y = event
                 if not muted:
+                    ASSETS.eat_sound.play()
                     pygame.mixer.music.set_volume(min(1.0, max(0.1, pygame.mixer.music.get_volume() + 0.03)))
-                break
+                if fruit_type == "watermelon":
+                    spawn_particles(x * SNAKE_BLOCK, y * SNAKE_BLOCK, BLUE, self.particles)
+            elif event[0] == "spawn":
+                _, fruit_type, x, y = event
+                spawn_particles(x * SNAKE_BLOCK, y * SNAKE_BLOCK, RED if fruit_type == "apple" else BLUE,
+                                self.particles)
+        if PROFILER:
+            PROFILER.mark("logic")
 
-        # Update eating animation
-        if eating and current_time - eating_start_time > EATING_DURATION:
-            eating = False
+    def draw(self):
+        if self.renderer:
+            # Cell-based dirty rects follow the simulation: redraw on ticks only
+            if not self.ticks and not self.needs_redraw:
+                return []
+            self.needs_redraw = False
+            if self.ticks > 1:
+                self.renderer.invalidate()
+            return self.renderer.draw(self.game, self.particles)
+        self.needs_redraw = False
+        alpha = min(self.accumulator * self.game.fps / 1000, 1.0)
+        if self.camera:
+            self.camera.draw(self.game, self.particles, alpha, self.grew)
+        else:
+            draw_frame(self.game, self.particles, alpha, self.previous_snake)
+
+    def frame_rate(self):
+        return RENDER_FPS
 
-        # Update and draw particles
-        for particle in particles[:]:
-            particle.update()
-            particle.draw()
-            if particle.lifespan <= 0:
-                particles.remove(particle)
+    def is_animating(self):
+        return True
 
-        # Draw snake and score
-        draw_snake(SNAKE_BLOCK, snake_list, nose_state, direction, eating)
-        display_score(snake_length - 1, speed_boost_active)
 
-        pygame.display.update()
-        CLOCK.tick(current_fps)
+class PausedScene(Scene):
+    """The frozen game: input still reaches the play scene, nothing moves or redraws."""
 
+    def handle_event(self, event):
+        self.manager.scenes["playing"].handle_event(event)
+
+    def invalidate(self):
+        self.manager.scenes["playing"].invalidate()
+
+    def draw(self):
+        playing = self.manager.scenes["playing"]
+        return playing.draw() if playing.needs_redraw else []
+
+
+class GameOverScene(StaticScene):
+    def enter(self):
+        super().enter()
+        pygame.mixer.music.stop()
+        self.shown_for = 0
+
+    def update(self, dt):
+        # In demo mode the next game starts by itself
+        self.shown_for += dt
+        if AUTOPILOT and self.shown_for >= DEMO_RESTART_DELAY:
+            self.manager.new_game()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+                self.manager.quit()
+            if event.key == pygame.K_SPACE:
+                self.manager.new_game()
+
+    def compose(self):
+        return ASSETS.endgame_background, (
+            ("You Lost! Press Q or ESCAPE to Quit", RED, -30, ASSETS.font_style),
+            ("Press SPACE to Play Again", WHITE, 70, ASSETS.font_style),
+        ), self.manager.scenes["playing"].game.score
+
+
+class NetPlayScene(Scene):
+    """A multiplayer game: turns go to the server, the board is drawn from its snapshots.
+
+    The server owns the game, so nothing is simulated here. Each frame
+    applies the messages that have arrived to the client's BoardMirror and
+    draws it through a CameraRenderer that follows our snake.
+    """
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.client = None
+        self.camera = None
+
+    def connect(self, client):
+        self.client = client
+        self.camera = None
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key in KEY_DIRECTIONS:
+                self.client.send_turn(KEY_DIRECTIONS[event.key])
+            elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+                self.manager.quit()
+
+    def update(self, dt):
+        self.client.poll()
+        mirror = self.client.mirror
+        if mirror.ready and (self.camera is None or self.camera.cell_number != mirror.cell_number):
+            self.camera = CameraRenderer(mirror.cell_number)
+
+    def draw(self):
+        mirror = self.client.mirror
+        if self.client.closed or not mirror.ready:
+            WINDOW.blit(ASSETS.menu_background, (0, 0))
+            if self.client.closed:
+                message(f"Disconnected: {self.client.error}", RED, -30)
+                message("Press Q or ESCAPE to quit", WHITE, 70)
+            else:
+                message("Connecting...", WHITE)
+            return
+
+        block = SNAKE_BLOCK
+        own = mirror.body(mirror.slot)
+        if own:
+            head_x, head_y = own[-1]
+            self.camera.follow((head_x + 0.5) * block, (head_y + 0.5) * block)
+        ox, oy = self.camera.offset
+        self.camera.draw_board(mirror.fruit_list())
+        for slot, (flags, _) in mirror.players.items():
+            body = own if slot == mirror.slot else mirror.body(slot)
+            if body:
+                draw_snake(block, [(x * block - ox, y * block - oy) for x, y in body], True,
+                           CODE_DIRECTIONS[flags & 3], bool(flags & EATING))
+        if PROFILER:
+            PROFILER.mark("draw")
+
+        flags, length = mirror.players.get(mirror.slot, (0, 1))
+        display_score(length - 1 if flags & ALIVE else 0, bool(flags & BOOST))
+        if not own:
+            message("Respawning...", WHITE)
+        if PROFILER:
+            PROFILER.mark("hud")
+
+    def frame_rate(self):
+        return RENDER_FPS
+
+    def is_animating(self):
+        return True
+
+
+class FrameScheduler:
+    """Paces the main loop per scene.
+
+    Animating scenes run at their own frame cap. Idle scenes block in
+    ``pygame.event.wait`` until input arrives (or ``idle_timeout`` ms pass),
+    so menus, pause and game over use next to no CPU.
+
+    Every event is stamped with ``received`` (``time.perf_counter`` seconds)
+    as it comes off SDL's queue. Animating scenes wait out the rest of the
+    frame blocked on that queue rather than asleep, so input that arrives
+    mid-frame is stamped on arrival, not when the next frame polls for it.
+    """
+
+    def __init__(self, clock=CLOCK, idle_timeout=IDLE_TIMEOUT):
+        self.clock = clock
+        self.idle_timeout = idle_timeout
+        self.frame_time = 0
+        self.frame_due = 0.0
+
+    def next_events(self, scene):
+        """Wait until the scene's next frame is due and return the events to handle in it."""
+        if scene.is_animating():
+            events = stamp_events(pygame.event.get())
+            while (remaining := self.frame_due - time.perf_counter()) >= 0.001:
+                event = pygame.event.wait(int(remaining * 1000))
+                if event.type != pygame.NOEVENT:
+                    events += stamp_events([event])
+            # Frames fall on a fixed grid; after an overrun the grid restarts from now
+            self.frame_due = max(self.frame_due, time.perf_counter()) + 1 / scene.frame_rate()
+            self.frame_time = self.clock.tick()
+            return events
+
+        self.frame_time = self.clock.tick(scene.frame_rate())
+        event = pygame.event.wait(self.idle_timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return stamp_events([event] + pygame.event.get())
+
+
+def stamp_events(events):
+    """Mark events with the time they were taken off the queue."""
+    now = time.perf_counter()
+    for event in events:
+        event.received = now
+    return events
+
+
+class SceneManager:
+    """Runs the menu / playing / paused / game-over scenes with explicit transitions.
+
+    Scenes are created once and reused, so restarting a game resets state in
+    place instead of nesting another game loop.
+    """
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or FrameScheduler()
+        self.scenes = {
+            "menu": MenuScene(self),
+            "playing": PlayScene(self),
+            "paused": PausedScene(self),
+            "game_over": GameOverScene(self),
+            "online": NetPlayScene(self),
+        }
+        self.current = self.scenes["menu"]
+        self.running = True
+
+    def switch(self, name):
+        self.current = self.scenes[name]
+        self.current.enter()
+
+    def new_game(self, seed=None):
+        self.scenes["playing"].reset(seed)
+        self.switch("playing")
+
+    def quit(self):
+        self.running = False
+
+    def run_frame(self, events, dt=0.0):
+        """Handle one frame's events, update the current scene by dt ms, then draw and present it."""
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.quit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.current.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.toggle_profiler()
+            else:
+                self.current.handle_event(event)
+        if not self.running:
+            return
+        if PROFILER:
+            PROFILER.mark("events")
+        self.current.update(dt)
+        if PROFILER:
+            PROFILER.mark("logic")
+        rects = self.current.draw()
+        if PROFILER:
+            PROFILER.mark("draw")
+            if PROFILER.visible:
+                overlay = PROFILER.draw(WINDOW, ASSETS.profile_font, 1000 / RENDER_FPS)
+                if rects is not None:
+                    rects = rects + [overlay]
+                PROFILER.mark("overlay")
+        if rects is None:
+            pygame.display.update()
+        elif rects:
+            pygame.display.update(rects)
+        if INPUT_LATENCY and rects != []:
+            INPUT_LATENCY.presented(time.perf_counter())
+        if PROFILER:
+            PROFILER.mark("present")
+        if CAPTURE and rects != []:
+            CAPTURE.capture(WINDOW, self.shown_tick())
+            if PROFILER:
+                PROFILER.mark("capture")
+
+    def shown_tick(self):
+        """Tick of the game on screen: the server's when playing online."""
+        online = self.scenes["online"]
+        if self.current is online and online.client:
+            return online.client.mirror.ticks
+        return self.scenes["playing"].game.ticks
+
+    def toggle_profiler(self):
+        """Show or hide the frame profiler overlay; profiling stops with it unless --profile is recording."""
+        global PROFILER
+        if PROFILER is None:
+            PROFILER = FrameProfiler()
+        PROFILER.visible = not PROFILER.visible
+        if not PROFILER.visible:
+            self.current.invalidate()
+            if not PROFILE_PATH:
+                PROFILER = None
+
+    def run(self):
+        events = pygame.event.get()
+        while self.running:
+            self.run_frame(events, self.scheduler.frame_time)
+            events = self.scheduler.next_events(self.current)
+            if PROFILER:
+                PROFILER.mark("wait")
+                PROFILER.end_frame()
+
+
+def main():
+    global PROFILER, INPUT_LATENCY, CAPTURE, FEED
+    init_display()
+    if PROFILE_PATH:
+        PROFILER = FrameProfiler()
+    if LATENCY_PATH:
+        INPUT_LATENCY = InputLatency()
+    if CAPTURE_DIR:
+        CAPTURE = FrameCapture(CAPTURE_DIR, WINDOW.get_size())
+    manager = SceneManager()
+    if CONNECT:
+        from multiplayer import NetClient  # Only online play pays for asyncio
+        try:
+            manager.scenes["online"].connect(NetClient(*CONNECT))
+        except OSError as error:
+            pygame.quit()
+            sys.exit(f"Could not connect to {CONNECT[0]}:{CONNECT[1]}: {error}")
+        manager.switch("online")
+    elif SUSPEND_PATH and os.path.exists(SUSPEND_PATH):
+        # Pick the suspended game up where it was left, paused
+        try:
+            manager.scenes["playing"].resume(snapshot.load(SUSPEND_PATH))
+        except (OSError, ValueError) as error:
+            print(f"Could not resume {SUSPEND_PATH}: {error}", file=sys.stderr)
+        else:
+            pygame.mixer.music.pause()
+            manager.switch("paused")
+    if FEED_NAME:
+        game = manager.scenes["playing"].game
+        try:
+            FEED = StateFeed(game.cell_number, FEED_NAME)
+        except OSError as error:
+            pygame.quit()
+            sys.exit(f"Could not create state feed {FEED_NAME}: {error}")
+        FEED.publish(game)
+    if AUTOPILOT and manager.current is manager.scenes["menu"]:
+        manager.new_game()
+    manager.run()
+    if SUSPEND_PATH and not CONNECT:
+        suspend(manager, SUSPEND_PATH)
+    if PROFILER and PROFILE_PATH:
+        PROFILER.write_csv(PROFILE_PATH)
+    if INPUT_LATENCY:
+        INPUT_LATENCY.write_csv(LATENCY_PATH)
+        print("\n".join(INPUT_LATENCY.report()))
+    if CAPTURE:
+        CAPTURE.close()
+        print("\n".join(CAPTURE.report()))
+    if FEED:
+        FEED.close()
     pygame.quit()
     sys.exit()
-    # quit()
 
 
-# Start the game
-main_menu()
+def suspend(manager, path):
+    """Save the game to path if one is in progress, otherwise remove a stale snapshot."""
+    game = manager.scenes["playing"].game
+    if manager.current in (manager.scenes["playing"], manager.scenes["paused"]) and game.alive:
+        snapshot.save(game, path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def game_seed(text):
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {MAX_SEED}")
+    return seed
+
+
+def server_address(text):
+    host, _, port = text.rpartition(":")
+    if not host:
+        return text, DEFAULT_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST or HOST:PORT, not {text!r}") from None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and present only the parts of the board that changed")
+    parser.add_argument("--cells", type=board_size, default=CELL_NUMBER,
+                        help=f"board size in cells, {CELL_NUMBER} to {MAX_CELL_NUMBER}; "
+                             "larger boards scroll with the snake")
+    parser.add_argument("--seed", type=game_seed, help="play every game from this seed")
+    parser.add_argument("--record", metavar="DIR", help="save a replay of every game into DIR")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="demo mode: the snake plays itself and a new game starts after each game over")
+    parser.add_argument("--connect", metavar="HOST[:PORT]", type=server_address,
+                        help=f"play on a multiplayer server (multiplayer.py, port {DEFAULT_PORT} by default)")
+    parser.add_argument("--profile", metavar="CSV",
+                        help="time every frame phase from the start and write the timings to CSV on exit "
+                             "(F3 shows them in game)")
+    parser.add_argument("--latency", metavar="CSV",
+                        help="measure input-to-tick and input-to-present latency per speed level; "
+                             "prints a summary and writes the histograms to CSV on exit")
+    parser.add_argument("--capture", metavar="DIR",
+                        help="record every presented frame into DIR as PNGs, with a frame index (frames.csv); "
+                             "frames are dropped, not waited for, when encoding falls behind")
+    parser.add_argument("--feed", metavar="NAME",
+                        help="publish every tick to shared memory NAME for overlays and dashboards "
+                             "(see statefeed.py)")
+    parser.add_argument("--suspend", metavar="FILE",
+                        help="save a game in progress to FILE on exit and resume it from there on the next start")
+    args = parser.parse_args(argv)
+    if args.autopilot and args.cells % 2:
+        parser.error(f"--autopilot needs an even board size, not --cells {args.cells}")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    DIRTY_RECTS = args.dirty_rects
+    BOARD_CELLS = args.cells
+    SEED = args.seed
+    RECORD_DIR = args.record
+    PROFILE_PATH = args.profile
+    LATENCY_PATH = args.latency
+    SUSPEND_PATH = args.suspend
+    CAPTURE_DIR = args.capture
+    FEED_NAME = args.feed
+    CONNECT = args.connect
+    if args.autopilot:
+        AUTOPILOT = Autopilot(BOARD_CELLS)
+
+    # Start the game
+    main()
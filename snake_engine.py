@@ -0,0 +1,348 @@
+import argparse
+import random
+from array import array
+from collections import deque
+
+# Game rule constants
+CELL_NUMBER = 40
+# Largest board accepted from the command line or a file. Memory grows with the board's area: at
+# 2000 cells a side the game process peaks around 130 MB, and that is the largest board the
+# benchmark suite covers
+MAX_CELL_NUMBER = 2000
+FPS_BASE = 10
+SPEED_INCREMENT = 1
+FRUIT_MIN_SPAWN = 4
+FRUIT_MAX_SPAWN = 10
+SPEED_BOOST_DURATION = 5000
+EATING_DURATION = 700
+BLINK_MIN_INTERVAL = 700
+BLINK_MAX_INTERVAL = 2000
+MAX_QUEUED_TURNS = 3
+
+# Directions as (dx, dy) cell offsets
+DIRECTIONS = {
+    "LEFT": (-1, 0),
+    "RIGHT": (1, 0),
+    "UP": (0, -1),
+    "DOWN": (0, 1),
+}
+OPPOSITE = {"LEFT": "RIGHT", "RIGHT": "LEFT", "UP": "DOWN", "DOWN": "UP"}
+
+FRUIT_TYPES = {
+    # fruit_type: (points, speed_boost)
+    "apple": (1, 0),
+    "watermelon": (2, 4),
+}
+
+
+def board_size(text):
+    """argparse type for --cells: a board size the game and its renderers can handle."""
+    cells = int(text)
+    if not CELL_NUMBER <= cells <= MAX_CELL_NUMBER:
+        raise argparse.ArgumentTypeError(f"board size must be between {CELL_NUMBER} and {MAX_CELL_NUMBER} cells")
+    return cells
+
+
+class FreeCells:
+    """Set of free cell indices with O(1) add, discard and uniform random sampling.
+
+    Cells live in a dense array; ``position`` maps each cell to its slot in
+    that array (-1 when the cell is not free), so removal is a swap-and-pop.
+    Both are typed arrays, 4 bytes a cell, so huge boards stay compact.
+    """
+
+    def __init__(self, size):
+        self.cells = array("i", range(size))
+        self.position = array("i", range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.position[cell] >= 0
+
+    def add(self, cell):
+        if self.position[cell] < 0:
+            self.position[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        slot = self.position[cell]
+        if slot >= 0:
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[slot] = last
+                self.position[last] = slot
+            self.position[cell] = -1
+
+    def sample(self, rng):
+        """Return a random free cell, or None when the board is full."""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class Fruit:
+    def __init__(self, cell_number, free_cells, fruit_type="apple", rng=random):
+        self.x = None
+        self.y = None
+        self.cell_number = cell_number
+        self.free_cells = free_cells
+        self.fruit_type = fruit_type
+        self.points, self.speed_boost = FRUIT_TYPES[fruit_type]
+        self.rng = rng
+
+        self.reset_position()
+
+    def reset_position(self):
+        """Move the fruit to a random free cell and claim it. Returns False when no cell is free."""
+        cell = self.free_cells.sample(self.rng)
+        if cell is None:
+            self.x = self.y = None
+            return False
+        self.free_cells.discard(cell)
+        self.y, self.x = divmod(cell, self.cell_number)
+        return True
+
+    def is_eaten(self, snake_head):
+        """Check if the snake's head has collided with the fruit."""
+        return snake_head[0] == self.x and snake_head[1] == self.y
+
+
+class SnakeGame:
+    """Headless snake simulation: all game rules, no pygame.
+
+    Positions are in cells. Time is simulated: every ``step`` advances the
+    game clock by one tick at the current speed (``1000 / fps`` ms), which is
+    what ``CLOCK.tick(current_fps)`` gives the interactive game.
+
+    The body is a deque of ``(x, y)`` cells, tail first. ``occupied`` is a
+    row-major bitmap of the body and ``free_cells`` holds every cell covered by
+    neither the body nor a fruit, so collisions and fruit spawns cost O(1) at
+    any snake length. ``entered`` holds the tick each cell was last entered
+    by the head: the body cells carry consecutive ticks from the tail
+    (``ticks - len(snake_list) + 1``) to the head (``ticks``), so any cell's
+    place in the body and its neighbouring segments can be found without
+    walking the body.
+    """
+
+    def __init__(self, cell_number=CELL_NUMBER, seed=None, record=False):
+        self.cell_number = cell_number
+        self.record = record
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game from a seed (a fresh random one if None).
+
+        The same seed and the same inputs at the same ticks always replay
+        the same game: all randomness comes from the game's own stream.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ticks = 0
+        # Accepted turns as (tick, direction) when recording
+        self.input_log = [] if self.record else None
+        self.time_ms = 0.0
+        self.alive = True
+        self.cause_of_death = None
+        self.fps = FPS_BASE
+
+        # Snake
+        center = self.cell_number // 2
+        self.snake_list = deque([(center, center)])
+        self.occupied = bytearray(self.cell_number * self.cell_number)
+        self.entered = array("q", [-1]) * (self.cell_number * self.cell_number)  # -1: never entered
+        self.free_cells = FreeCells(self.cell_number * self.cell_number)
+        self._occupy(center * self.cell_number + center)
+        self.entered[center * self.cell_number + center] = 0
+        self.snake_length = 1
+        self.direction = "RIGHT"
+        self.velocity = (0, 0)
+        self.direction_queue = deque()
+
+        # Fruit tracking
+        self.apples_eaten = 0
+        self.next_watermelon_spawn = self.rng.randint(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN)
+        self.fruits = [Fruit(self.cell_number, self.free_cells, rng=self.rng) for _ in range(2)]
+        self.pending_apples = 0
+
+        # Animation state
+        self.nose_state = True
+        self.last_breath_time = 0.0
+        self.blink_interval = self.rng.randint(BLINK_MIN_INTERVAL, BLINK_MAX_INTERVAL)
+        self.eating = False
+        self.eating_start_time = 0.0
+
+        # Speed boost tracking
+        self.speed_boost_active = False
+        self.speed_boost_start_time = 0.0
+        self.original_fps = self.fps
+
+        # Events produced by the last step: ("eat"|"spawn", fruit_type, x, y) or ("death", cause)
+        self.events = []
+        return self.state
+
+    @property
+    def score(self):
+        return self.snake_length - 1
+
+    @property
+    def head(self):
+        return self.snake_list[-1]
+
+    @property
+    def state(self):
+        """Snapshot of everything a renderer or bot needs to know."""
+        return {
+            "snake": list(self.snake_list),
+            "direction": self.direction,
+            "fruits": [(fruit.fruit_type, fruit.x, fruit.y) for fruit in self.fruits],
+            "score": self.score,
+            "alive": self.alive,
+            "fps": self.fps,
+            "speed_boost_active": self.speed_boost_active,
+            "eating": self.eating,
+            "nose_state": self.nose_state,
+            "time_ms": self.time_ms,
+        }
+
+    def queue_direction(self, new_direction):
+        """Queue a turn; returns whether it was accepted.
+
+        Turns are checked against the last queued direction (the current one
+        when the queue is empty): repeats and reversals of it are dropped, as
+        is anything beyond MAX_QUEUED_TURNS. A quick double turn applies on
+        consecutive ticks, and mashing keys cannot pile up stale turns.
+        """
+        last = self.direction_queue[-1] if self.direction_queue else self.direction
+        moving = self.direction_queue or self.velocity != (0, 0)
+        if (new_direction not in DIRECTIONS or new_direction == OPPOSITE[last] or (new_direction == last and moving)
+                or len(self.direction_queue) >= MAX_QUEUED_TURNS):
+            return False
+        self.direction_queue.append(new_direction)
+        if self.input_log is not None:
+            self.input_log.append((self.ticks, new_direction))
+        return True
+
+    def step(self, action=None):
+        """Advance the game by one tick. ``action`` is an optional direction to queue first.
+
+        Returns the list of events produced during the tick.
+        """
+        self.events = []
+        if not self.alive:
+            return self.events
+        if action is not None:
+            self.queue_direction(action)
+        self.ticks += 1
+
+        # Process direction queue
+        if self.direction_queue:
+            new_direction = self.direction_queue.popleft()
+            if new_direction != OPPOSITE[self.direction]:
+                self.direction = new_direction
+                self.velocity = DIRECTIONS[new_direction]
+
+        # Move the head, dying on the board edge
+        head_x = self.snake_list[-1][0] + self.velocity[0]
+        head_y = self.snake_list[-1][1] + self.velocity[1]
+        if not (0 <= head_x < self.cell_number and 0 <= head_y < self.cell_number):
+            self._die("wall")
+            return self.events
+
+        # Update snake list, freeing the tail before checking self-collision
+        snake_head = (head_x, head_y)
+        if len(self.snake_list) >= self.snake_length:
+            tail_x, tail_y = self.snake_list.popleft()
+            tail = tail_y * self.cell_number + tail_x
+            self.occupied[tail] = 0
+            self.free_cells.add(tail)
+        self.snake_list.append(snake_head)
+        cell = head_y * self.cell_number + head_x
+        if self.occupied[cell]:
+            self._die("self")
+            return self.events
+        self._occupy(cell)
+        self.entered[cell] = self.ticks
+
+        current_time = self.time_ms
+
+        # Check speed boost expiration
+        if self.speed_boost_active and current_time - self.speed_boost_start_time > SPEED_BOOST_DURATION:
+            self.speed_boost_active = False
+            self.fps = self.original_fps
+
+        # Update blinking animation
+        if current_time - self.last_breath_time > self.blink_interval:
+            self.nose_state = not self.nose_state
+            self.last_breath_time = current_time
+            self.blink_interval = self.rng.randint(BLINK_MIN_INTERVAL, BLINK_MAX_INTERVAL)
+
+        # Check fruit eating collision
+        for fruit in self.fruits:
+            if fruit.is_eaten(snake_head):
+                self._eat(fruit, current_time)
+                break
+
+        # Update eating animation
+        if self.eating and current_time - self.eating_start_time > EATING_DURATION:
+            self.eating = False
+
+        if self.pending_apples and self.free_cells:
+            apple = Fruit(self.cell_number, self.free_cells, rng=self.rng)
+            self.fruits.append(apple)
+            self.pending_apples -= 1
+            self.events.append(("spawn", apple.fruit_type, apple.x, apple.y))
+
+        # The snake covers the whole board: nothing left to play for
+        if len(self.snake_list) == len(self.occupied):
+            self._die("board_full")
+            return self.events
+
+        self.time_ms += 1000 / self.fps
+        return self.events
+
+    def _eat(self, fruit, current_time):
+        self.snake_length += fruit.points
+        self.eating = True
+        self.eating_start_time = current_time
+        self.events.append(("eat", fruit.fruit_type, fruit.x, fruit.y))
+
+        # Handle fruit effects
+        if fruit.fruit_type == "watermelon":
+            self.speed_boost_active = True
+            self.original_fps = self.fps
+            self.fps += fruit.speed_boost
+            self.speed_boost_start_time = current_time
+            self.fruits.remove(fruit)
+        else:  # Apple
+            self.apples_eaten += 1
+            if fruit.reset_position():
+                self.events.append(("spawn", fruit.fruit_type, fruit.x, fruit.y))
+            else:
+                # No free cell left: respawn once the tail frees one up
+                self.fruits.remove(fruit)
+                self.pending_apples += 1
+
+            # Check if should spawn watermelon
+            if (self.apples_eaten >= self.next_watermelon_spawn
+                    and not any(f.fruit_type == "watermelon" for f in self.fruits)):
+                new_watermelon = Fruit(self.cell_number, self.free_cells, "watermelon", rng=self.rng)
+                if new_watermelon.x is not None:
+                    self.fruits.append(new_watermelon)
+                    self.next_watermelon_spawn = self.apples_eaten + self.rng.randint(FRUIT_MIN_SPAWN, FRUIT_MAX_SPAWN)
+                    self.events.append(("spawn", new_watermelon.fruit_type, new_watermelon.x, new_watermelon.y))
+
+        # Increase game speed slightly
+        self.fps += SPEED_INCREMENT
+
+    def _occupy(self, cell):
+        self.occupied[cell] = 1
+        self.free_cells.discard(cell)
+
+    def _die(self, cause):
+        self.alive = False
+        self.cause_of_death = cause
+        self.events.append(("death", cause))
@@ -0,0 +1,281 @@
+"""Live game state in shared memory, for overlays and dashboards running beside the game.
+
+The game publishes every tick into a ``multiprocessing.shared_memory``
+segment; any number of local processes attach by name and read it
+through numpy views, without copies and without the game ever waiting
+for them. The segment holds:
+
+- the occupancy grid, one byte a cell, kept in sync two cells a tick
+  (the tail that left, the head that arrived)
+- a ring of fixed-size per-tick records: tick, clock, score, length,
+  head, alive and boost flags, fruits
+
+A seqlock-style version counter guards both: the writer makes it odd
+before a tick's update and even after, and a reader whose version
+changed while it read retries. Aggregators that need every tick read
+the ring by sequence number and are told how many ticks they missed.
+
+    python snake.py --feed snake-feed
+    python statefeed.py watch snake-feed
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from snake_engine import FRUIT_TYPES
+
+# Segment layout (little endian):
+#   header  b"SNKF", layout version (B), 3 pad bytes, cell number (I), ring slots (I), max fruits (I),
+#           version counter (Q, odd while a tick is being written), sequence of the latest record (Q, 0: none)
+#   grid    cell number * cell number bytes, 1 where the body is, row-major, from GRID_OFFSET
+#   ring    slots records, the record of sequence n in slot n % slots
+MAGIC = b"SNKF"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sB3xIII")
+COUNTERS = struct.Struct("<QQ")
+COUNTERS_OFFSET = HEADER.size
+GRID_OFFSET = 64
+FEED_SLOTS = 256
+MAX_FRUITS = 4
+NO_CELL = 0xFFFF  # Fruit coordinate of an empty fruit slot
+
+# Record flags
+ALIVE, BOOST = 1, 2
+FRUIT_CODES = {fruit_type: code for code, fruit_type in enumerate(FRUIT_TYPES)}
+CODE_FRUITS = dict(enumerate(FRUIT_TYPES))
+
+RECORD = struct.Struct("<QQdIIHHBB" + "BHH" * MAX_FRUITS)
+# The same record as a numpy dtype, for zero-copy views of the ring
+RECORD_DTYPE = np.dtype([
+    ("seq", "<u8"), ("tick", "<u8"), ("time_ms", "<f8"), ("score", "<u4"), ("length", "<u4"),
+    ("head_x", "<u2"), ("head_y", "<u2"), ("flags", "u1"), ("fruit_count", "u1"),
+    ("fruits", [("type", "u1"), ("x", "<u2"), ("y", "<u2")], (MAX_FRUITS,)),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+class FeedError(ValueError):
+    """Raised when a shared memory segment is not a state feed."""
+
+
+def ring_offset(cell_number):
+    return GRID_OFFSET + (cell_number * cell_number + 63) // 64 * 64
+
+
+class StateFeed:
+    """Writer side: owns the segment and publishes a game into it once per tick.
+
+    ``publish`` costs the same at any board size while ticks arrive one
+    at a time; a new game, a resumed one or skipped ticks resync the
+    whole grid once.
+    """
+
+    def __init__(self, cell_number, name=None, slots=FEED_SLOTS):
+        self.cell_number = cell_number
+        self.slots = slots
+        self.ring = ring_offset(cell_number)
+        self.shm = shared_memory.SharedMemory(name, create=True, size=self.ring + slots * RECORD.size)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT_VERSION, cell_number, slots, MAX_FRUITS)
+        self.grid = self.buf[GRID_OFFSET:GRID_OFFSET + cell_number * cell_number]
+        self.version = 0
+        self.seq = 0
+        COUNTERS.pack_into(self.buf, COUNTERS_OFFSET, self.version, self.seq)
+        self.game = None
+        self.tick = None
+        self.tail = None  # Tail cell as last published
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, game):
+        """Write the game's state after a tick (or a reset) for readers."""
+        size = self.cell_number
+        head_x, head_y = game.snake_list[-1]
+        tail_x, tail_y = game.snake_list[0]
+        fruits = game.fruits[:MAX_FRUITS]
+        fields = []
+        for fruit in fruits:
+            fields += (FRUIT_CODES[fruit.fruit_type], NO_CELL if fruit.x is None else fruit.x,
+                       NO_CELL if fruit.y is None else fruit.y)
+        fields += (0, NO_CELL, NO_CELL) * (MAX_FRUITS - len(fruits))
+        flags = (ALIVE if game.alive else 0) | (BOOST if game.speed_boost_active else 0)
+        self.seq += 1
+
+        self.version += 1  # Odd: readers retry until the tick is written
+        COUNTERS.pack_into(self.buf, COUNTERS_OFFSET, self.version, self.seq - 1)
+        if game is self.game and game.ticks == self.tick + 1:
+            # One tick moves the body by a cell at each end; everything else is unchanged
+            self.grid[self.tail] = game.occupied[self.tail]
+            head = head_y * size + head_x
+            self.grid[head] = game.occupied[head]
+        else:
+            self.grid[:] = game.occupied
+        RECORD.pack_into(self.buf, self.ring + (self.seq % self.slots) * RECORD.size, self.seq, game.ticks,
+                         game.time_ms, game.score, len(game.snake_list), head_x, head_y, flags, len(fruits), *fields)
+        self.version += 1
+        COUNTERS.pack_into(self.buf, COUNTERS_OFFSET, self.version, self.seq)
+
+        self.game = game
+        self.tick = game.ticks
+        self.tail = tail_y * size + tail_x
+
+    def close(self):
+        """Detach and remove the segment; attached readers keep their mapping until they close."""
+        self.grid.release()
+        self.buf = self.grid = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(name):
+    """Open an existing segment without this process's resource tracker removing it at exit."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Older Pythons register every attached segment with the resource tracker, which unlinks it when
+    # the tracker's processes exit. Processes started from the game share its tracker and must leave
+    # the registration alone; a reader started on its own gets a tracker of its own.
+    own_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is None
+    shm = shared_memory.SharedMemory(name)
+    if own_tracker and os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class FeedReader:
+    """Reader side: read-only numpy views of a feed published by another process.
+
+    ``grid`` (cells x cells, indexed [y, x]) and ``records`` are views of
+    the shared memory itself. Reading them races the writer, so wrap
+    reads in ``begin`` and ``consistent`` and retry until consistent:
+
+        while True:
+            version = reader.begin()
+            record = reader.latest()
+            covered = reader.grid.sum()
+            if reader.consistent(version):
+                break
+
+    ``read`` does that and returns copies.
+    """
+
+    def __init__(self, name):
+        self.shm = attach(name)
+        try:
+            magic, layout, self.cell_number, self.slots, max_fruits = HEADER.unpack_from(self.shm.buf)
+        except struct.error as error:
+            self.shm.close()
+            raise FeedError(str(error)) from error
+        if magic != MAGIC or layout != LAYOUT_VERSION or max_fruits != MAX_FRUITS:
+            self.shm.close()
+            raise FeedError(f"{name} is not a snake state feed")
+        buffer = self.shm.buf
+        self.counters = np.ndarray(2, dtype="<u8", buffer=buffer, offset=COUNTERS_OFFSET)
+        self.grid = np.ndarray((self.cell_number, self.cell_number), dtype=np.uint8, buffer=buffer,
+                               offset=GRID_OFFSET)
+        self.records = np.ndarray(self.slots, dtype=RECORD_DTYPE, buffer=buffer,
+                                  offset=ring_offset(self.cell_number))
+        for view in (self.counters, self.grid, self.records):
+            view.flags.writeable = False
+
+    @property
+    def seq(self):
+        """Sequence number of the latest published record (0 before the first)."""
+        return int(self.counters[1])
+
+    def begin(self):
+        """Wait out a write in progress; returns the version to check with ``consistent``."""
+        while True:
+            version = int(self.counters[0])
+            if not version & 1:
+                return version
+            time.sleep(0)
+
+    def consistent(self, version):
+        """True if nothing was published since ``begin`` returned version."""
+        return int(self.counters[0]) == version
+
+    def latest(self):
+        """The latest record, as a view into the ring (None before the first publish)."""
+        seq = self.seq
+        return self.records[seq % self.slots] if seq else None
+
+    def read(self):
+        """A consistent copy of (latest record, grid)."""
+        while True:
+            version = self.begin()
+            record = self.latest()
+            record = None if record is None else record.copy()
+            grid = self.grid.copy()
+            if self.consistent(version):
+                return record, grid
+
+    def since(self, seq):
+        """Records published after seq, oldest first, and how many were overwritten before being read."""
+        while True:
+            version = self.begin()
+            latest = self.seq
+            first = max(seq + 1, latest - self.slots + 1)
+            records = self.records[np.arange(first, latest + 1) % self.slots].copy()
+            if self.consistent(version):
+                return records, first - seq - 1
+
+    def close(self):
+        self.counters = self.grid = self.records = None
+        self.shm.close()
+
+
+def record_fruits(record):
+    """The record's fruits as (fruit_type, x, y), x and y None for a fruit waiting for a cell."""
+    return [(CODE_FRUITS[int(fruit["type"])], None if fruit["x"] == NO_CELL else int(fruit["x"]),
+             None if fruit["y"] == NO_CELL else int(fruit["y"]))
+            for fruit in record["fruits"][:record["fruit_count"]]]
+
+
+def watch(name, interval):
+    """Print the feed's state every interval seconds until interrupted."""
+    reader = FeedReader(name)
+    seq = reader.seq
+    try:
+        while True:
+            time.sleep(interval)
+            records, missed = reader.since(seq)
+            record, grid = reader.read()
+            if record is None:
+                continue
+            if len(records):
+                seq = int(records["seq"][-1])
+            status = ("alive" if record["flags"] & ALIVE else "dead") + (", boost" if record["flags"] & BOOST else "")
+            print(f"tick {record['tick']}: score {record['score']}, length {record['length']} "
+                  f"({int(grid.sum())} cells), head ({record['head_x']}, {record['head_y']}), {status}; "
+                  f"{len(records)} ticks since last, {missed} missed; fruits {record_fruits(record)}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read a running game's shared memory state feed")
+    parser.add_argument("command", choices=["watch"])
+    parser.add_argument("name", help="feed name given to snake.py --feed")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between lines")
+    args = parser.parse_args(argv)
+    try:
+        watch(args.name, args.interval)
+    except (FileNotFoundError, FeedError) as error:
+        print(f"{args.name}: {error}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
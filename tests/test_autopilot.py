@@ -0,0 +1,30 @@
+import pytest
+
+import selfplay
+import snake
+import snapshot
+from autopilot import Autopilot
+from snake_engine import SnakeGame
+
+
+def test_autopilot_rejects_odd_board_size():
+    with pytest.raises(SystemExit):
+        snake.parse_args(["--autopilot", "--cells", "41"])
+    with pytest.raises(SystemExit):
+        selfplay.main(["--cells", "41", "--games", "1"])
+    assert snake.parse_args(["--cells", "41"]).cells == 41
+    assert snake.parse_args(["--autopilot", "--cells", "42"]).cells == 42
+
+
+def test_resume_builds_autopilot_for_the_snapshot_board(monkeypatch):
+    snake.init_display()
+    monkeypatch.setattr(snake, "AUTOPILOT", Autopilot(snake.CELL_NUMBER))
+    manager = snake.SceneManager()
+    game = snapshot.unpack(snapshot.pack(SnakeGame(snake.CELL_NUMBER + 10, seed=3)))
+    manager.scenes["playing"].resume(game)
+    assert snake.AUTOPILOT.cell_number == game.cell_number
+
+    odd = snapshot.unpack(snapshot.pack(SnakeGame(snake.CELL_NUMBER + 1, seed=3)))
+    with pytest.raises(ValueError):
+        manager.scenes["playing"].resume(odd)
+    assert manager.scenes["playing"].game is game
@@ -0,0 +1,119 @@
+import random
+from collections import Counter, deque
+
+import numpy as np
+
+import batch_env
+import snake_engine
+from autopilot import Autopilot
+from batch_env import ACTIONS, CAUSES, BatchSnakeEnv
+from snake_engine import DIRECTIONS, FRUIT_TYPES, FreeCells, Fruit, SnakeGame
+
+CELLS = 4
+BOARDS = 16
+STEPS = 400
+
+
+def body_cells(env, board):
+    """The board's body, tail first, as row-major cells."""
+    slots = (env.head_slot[board] - np.arange(env.length[board] - 1, -1, -1)) % env.cells
+    return env.body[board, slots].tolist()
+
+
+def fruit_cells(env, board):
+    """(fruit_type, cell) for every fruit on the board."""
+    fruits = [("apple", cell) for cell in env.apples[board].tolist() if cell >= 0]
+    if env.watermelon[board] >= 0:
+        fruits.append(("watermelon", int(env.watermelon[board])))
+    return fruits
+
+
+def mirror(env, board):
+    """A SnakeGame in the same state as one of the env's boards."""
+    size = env.cell_number
+    game = SnakeGame(size, seed=0)
+    cells = body_cells(env, board)
+    game.snake_list = deque((cell % size, cell // size) for cell in cells)
+    game.occupied = bytearray(env.occupied[board].astype(np.uint8))
+    game.free_cells = FreeCells(env.cells)
+    for cell in cells:
+        game.free_cells.discard(cell)
+    game.fruits = []
+    for fruit_type, cell in fruit_cells(env, board):
+        fruit = Fruit.__new__(Fruit)
+        fruit.cell_number, fruit.free_cells, fruit.rng, fruit.fruit_type = size, game.free_cells, game.rng, fruit_type
+        fruit.points, fruit.speed_boost = FRUIT_TYPES[fruit_type]
+        fruit.y, fruit.x = divmod(cell, size)
+        game.free_cells.discard(cell)
+        game.fruits.append(fruit)
+    game.snake_length = int(env.target_length[board])
+    game.direction = ACTIONS[env.direction[board]]
+    game.velocity = DIRECTIONS[game.direction] if env.moving[board] else (0, 0)
+    game.apples_eaten = int(env.apples_eaten[board])
+    game.next_watermelon_spawn = int(env.next_watermelon_spawn[board])
+    game.pending_apples = int(env.pending_apples[board])
+    game.fps = int(env.fps[board])
+    game.original_fps = int(env.original_fps[board])
+    game.speed_boost_active = bool(env.boost_active[board])
+    game.speed_boost_start_time = float(env.boost_start[board])
+    game.time_ms = float(env.time_ms[board])
+    game.ticks = int(env.ticks[board])
+    return game
+
+
+def test_step_matches_the_engine(monkeypatch):
+    """Every board is mirrored into a SnakeGame before each step and both take the same action.
+
+    Everything but the cells of freshly spawned fruit must agree. Half the
+    boards play the autopilot, which fills the board; the rest move at
+    random, which ends in walls and the snake's own body. The speed boost
+    is shortened so it also runs out within these short games.
+    """
+    for module in (batch_env, snake_engine):
+        monkeypatch.setattr(module, "SPEED_BOOST_DURATION", 300)
+    env = BatchSnakeEnv(BOARDS, CELLS, seed=7)
+    env.reset()
+    pilots = [Autopilot(CELLS) if board % 2 else None for board in range(BOARDS)]
+    rng = random.Random(7)
+    endings = Counter()
+    for _ in range(STEPS):
+        games = [mirror(env, board) for board in range(BOARDS)]
+        before = [set(fruit_cells(env, board)) for board in range(BOARDS)]
+        actions = [ACTIONS.index(pilot.next_direction(game)) if pilot else rng.randrange(-1, len(ACTIONS))
+                   for pilot, game in zip(pilots, games)]
+        _, rewards, dones = env.step(actions)
+
+        for board, (game, action) in enumerate(zip(games, actions)):
+            score = game.score
+            game.step(ACTIONS[action] if action >= 0 else None)
+            assert rewards[board] == game.score - score
+            assert dones[board] == (not game.alive)
+            if not game.alive:
+                assert CAUSES[env.causes[board]] == game.cause_of_death
+                assert env.final_scores[board] == game.score
+                endings[game.cause_of_death] += 1
+                if pilots[board]:
+                    pilots[board].reset()
+                continue
+
+            size = env.cell_number
+            assert body_cells(env, board) == [y * size + x for x, y in game.snake_list]
+            assert env.occupied[board].tolist() == [bool(cell) for cell in game.occupied]
+            assert env.target_length[board] == game.snake_length
+            assert ACTIONS[env.direction[board]] == game.direction
+            assert env.moving[board] == (game.velocity != (0, 0))
+            assert (env.fps[board], env.original_fps[board]) == (game.fps, game.original_fps)
+            assert env.boost_active[board] == game.speed_boost_active
+            assert env.boost_start[board] == game.speed_boost_start_time
+            assert env.time_ms[board] == game.time_ms
+            assert env.apples_eaten[board] == game.apples_eaten
+            assert env.pending_apples[board] == game.pending_apples
+
+            # Fresh spawns land on different cells; the fruit that stayed put and the counts must agree
+            engine_fruits = {(fruit.fruit_type, fruit.y * size + fruit.x) for fruit in game.fruits}
+            batch_fruits = set(fruit_cells(env, board))
+            assert engine_fruits & before[board] == batch_fruits & before[board]
+            assert (Counter(fruit_type for fruit_type, _ in engine_fruits)
+                    == Counter(fruit_type for fruit_type, _ in batch_fruits))
+
+    assert endings.keys() == {"wall", "self", "board_full"}
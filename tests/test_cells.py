@@ -0,0 +1,26 @@
+import pytest
+
+import autopilot
+import multiplayer
+import snake
+
+
+@pytest.mark.parametrize("text", [str(snake.CELL_NUMBER - 1), str(snake.MAX_CELL_NUMBER + 1), "65535"])
+def test_cells_outside_the_supported_range_are_rejected(text):
+    with pytest.raises(SystemExit):
+        snake.parse_args(["--cells", text])
+
+
+def test_cells_accepts_the_supported_range():
+    assert snake.parse_args(["--cells", str(snake.CELL_NUMBER)]).cells == snake.CELL_NUMBER
+    assert snake.parse_args(["--cells", str(snake.MAX_CELL_NUMBER)]).cells == snake.MAX_CELL_NUMBER
+
+
+def test_server_cells_are_capped():
+    with pytest.raises(SystemExit):
+        multiplayer.main(["--cells", str(multiplayer.MAX_CELL_NUMBER + 1)])
+
+
+def test_autopilot_cells_are_capped():
+    with pytest.raises(SystemExit):
+        autopilot.main(["--cells", str(autopilot.MAX_CELL_NUMBER + 2)])
@@ -0,0 +1,71 @@
+from collections import deque
+
+from autopilot import Autopilot
+from snake_engine import FreeCells, Fruit, SnakeGame
+
+
+def arrange(game, body, length, fruits):
+    """Put the game's snake on ``body`` (tail first) and its fruit on ``fruits`` [(fruit_type, x, y)]."""
+    size = game.cell_number
+    game.snake_list = deque(body)
+    game.snake_length = length
+    game.occupied = bytearray(size * size)
+    game.free_cells = FreeCells(size * size)
+    for tick, (x, y) in enumerate(body, start=game.ticks - len(body) + 1):
+        game._occupy(y * size + x)
+        game.entered[y * size + x] = tick
+    game.fruits = []
+    for fruit_type, x, y in fruits:
+        fruit = Fruit(size, FreeCells(0), fruit_type, rng=game.rng)
+        fruit.free_cells, fruit.x, fruit.y = game.free_cells, x, y
+        game.free_cells.discard(y * size + x)
+        game.fruits.append(fruit)
+
+
+def test_autopilot_fills_a_tiny_board():
+    game = SnakeGame(4, seed=1)
+    pilot = Autopilot(4)
+    for _ in range(10_000):
+        game.step(pilot.next_direction(game))
+        if not game.alive:
+            break
+    assert game.cause_of_death == "board_full"
+    assert len(game.snake_list) == 16
+    assert len(game.free_cells) == 0
+
+
+def test_spawning_on_a_full_board_gives_up():
+    free_cells = FreeCells(4)
+    for cell in range(4):
+        free_cells.discard(cell)
+    assert free_cells.sample(SnakeGame(2, seed=0).rng) is None
+    fruit = Fruit(2, free_cells)
+    assert (fruit.x, fruit.y) == (None, None)
+    assert not fruit.reset_position()
+
+
+def test_apples_eaten_with_no_free_cell_are_parked():
+    game = SnakeGame(2, seed=0)
+    # A growing snake along the top row, an apple on each free cell
+    arrange(game, [(0, 0), (1, 0)], 3, [("apple", 1, 1), ("apple", 0, 1)])
+    game.step("DOWN")
+    assert game.alive
+    assert game.pending_apples == 1
+    assert [(fruit.x, fruit.y) for fruit in game.fruits] == [(0, 1)]
+
+    game.step("LEFT")
+    assert game.cause_of_death == "board_full"
+    assert game.pending_apples == 2
+    assert game.fruits == []
+
+
+def test_pending_apple_respawns_where_the_tail_left():
+    game = SnakeGame(2, seed=0)
+    # Snake and watermelon cover the board; a parked apple waits for room
+    arrange(game, [(0, 1), (0, 0), (1, 0)], 3, [("watermelon", 1, 1)])
+    game.pending_apples = 1
+    events = game.step("DOWN")
+    assert game.alive
+    assert game.pending_apples == 0
+    assert [(fruit.fruit_type, fruit.x, fruit.y) for fruit in game.fruits] == [("apple", 0, 1)]
+    assert ("spawn", "apple", 0, 1) in events
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from highscores import MAX_ENTRY_VALUE, ScoreStore, decode, encode
+
+
+def test_long_non_ascii_name_is_cut_on_a_character_boundary():
+    name = "é" * 200  # 400 bytes: byte 255 falls inside a character
+    boards = decode(encode({name: [(7, 1)]}))
+    (stored,) = boards
+    assert len(stored.encode("utf-8")) <= 255
+    assert name.startswith(stored)
+    assert boards[stored] == [(7, 1)]
+
+
+def test_long_non_ascii_name_survives_a_reload(tmp_path):
+    path = str(tmp_path / "highscores.dat")
+    store = ScoreStore(path)
+    store.submit(5, player="é" * 200)
+    store.submit(3, player="other")
+    assert store.flush()
+    reloaded = ScoreStore(path)
+    assert reloaded.high_score == 5
+    assert len(reloaded.boards) == 2
+
+
+def test_unreadable_file_is_kept_not_overwritten(tmp_path, capsys):
+    path = tmp_path / "highscores.dat"
+    path.write_bytes(b"SNKH\x01\x01\x00garbage")
+    store = ScoreStore(str(path))
+    store.submit(4, player="new")
+    assert store.flush()
+    corrupt = [name for name in os.listdir(tmp_path) if name.endswith(".corrupt")]
+    assert len(corrupt) == 1
+    assert (tmp_path / corrupt[0]).read_bytes() == b"SNKH\x01\x01\x00garbage"
+    assert ScoreStore(str(path)).high_score == 4
+    assert "unreadable" in capsys.readouterr().err
+
+
+def test_unstorable_score_is_rejected(tmp_path):
+    store = ScoreStore(str(tmp_path / "highscores.dat"))
+    with pytest.raises(ValueError):
+        store.submit(MAX_ENTRY_VALUE + 1)
+    with pytest.raises(ValueError):
+        store.submit(5, timestamp=-1)
+    assert store.leaderboard() == []
+
+
+def test_failed_write_is_reported_and_retried(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "highscores.dat")
+    store = ScoreStore(path)
+    real_replace = os.replace
+
+    def disk_full(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", disk_full)
+    store.submit(5, timestamp=1)
+    assert not store.flush()
+    assert "could not be saved" in capsys.readouterr().err
+    assert os.listdir(tmp_path) == []  # No file, and no temporary file left behind
+
+    monkeypatch.setattr(os, "replace", real_replace)
+    store.submit(6, timestamp=1)
+    assert store.flush()
+    assert ScoreStore(path).leaderboard() == [(6, 1, "player"), (5, 1, "player")]
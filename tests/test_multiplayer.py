@@ -0,0 +1,132 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import pytest
+
+import multiplayer
+from multiplayer import EMPTY, RESPAWN_DELAY, SNAKE, Arena, ArenaServer, BoardMirror
+from snake_engine import DIRECTIONS
+
+
+def test_late_ticks_still_yield_to_the_event_loop(monkeypatch):
+    ticks = []
+
+    def slow_tick(arena):
+        time.sleep(0.02)  # Longer than a 60 ticks/s interval
+        ticks.append(arena)
+        if len(ticks) > 50:
+            raise RuntimeError("the event loop was starved")
+
+    monkeypatch.setattr(Arena, "tick", slow_tick)
+    server = ArenaServer(Arena(seed=1), tick_rate=60)
+
+    async def run():
+        ticker = asyncio.create_task(server.run_ticks())
+        await asyncio.sleep(0.05)
+        assert not ticker.done()
+        ticker.cancel()
+        return len(ticks)
+
+    assert asyncio.run(run()) < 50
+
+
+def test_tick_rate_must_be_positive():
+    with pytest.raises(SystemExit):
+        multiplayer.main(["--tick-rate", "0"])
+
+
+def test_single_player_start_does_not_import_asyncio():
+    code = "import sys, snake; print('asyncio' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.split()[-1] == "False"
+
+
+def assert_mirrors(arena, mirror):
+    alive = [snake for snake in arena.snakes.values() if snake.alive]
+    assert mirror.cells == arena.cells
+    assert {slot: list(body) for slot, body in mirror.bodies.items()} == {
+        snake.slot: list(snake.body) for snake in alive}
+    assert mirror.players == {snake.slot: (snake.flags, snake.length) for snake in alive}
+    assert mirror.fruits == {cell: arena.cells[cell] for cell in arena.fruits}
+
+
+def joined_mirror(arena, slot):
+    mirror = BoardMirror()
+    mirror.apply(arena.welcome(slot))
+    return mirror
+
+
+def test_mirror_follows_the_arena_through_joins_and_leaves():
+    rng = random.Random(5)
+    arena = Arena(10, seed=5)
+    watcher = arena.join()
+    arena.tick()
+    arena.take_delta()
+    mirror = joined_mirror(arena, watcher)
+    players = [watcher]
+    for tick in range(20000):
+        if len(players) < 6 and rng.random() < 0.01:
+            players.append(arena.join())
+        if len(players) > 1 and rng.random() < 0.005:
+            arena.leave(players.pop(rng.randrange(1, len(players))))
+        for slot in players:
+            if rng.random() < 0.1:
+                arena.queue_direction(slot, rng.choice(("LEFT", "RIGHT", "UP", "DOWN")))
+        arena.tick()
+        payload = arena.take_delta()
+        if payload:
+            mirror.apply(payload)
+        assert_mirrors(arena, mirror)
+        if tick % 1000 == 0:
+            # A player joining now must see the same board as one that followed every delta
+            assert_mirrors(arena, joined_mirror(arena, watcher))
+    assert arena.deaths > 50
+
+
+def place(arena, slot, x, y, direction):
+    """Move a freshly spawned snake to (x, y) and start it moving in direction."""
+    snake = arena.snakes[slot]
+    (cell,) = snake.body
+    arena.occupied[cell] = 0
+    arena.free_cells.add(cell)
+    arena._set(cell, EMPTY)
+    cell = y * arena.cell_number + x
+    if cell in arena.fruits:
+        del arena.fruits[cell]
+    else:
+        arena.free_cells.discard(cell)
+    snake.body[0] = cell
+    arena.occupied[cell] = 1
+    arena._set(cell, SNAKE + slot)
+    snake.direction, snake.velocity = direction, DIRECTIONS[direction]
+    snake.next_move = arena.time_ms
+
+
+def test_head_on_collision_kills_both_and_they_respawn():
+    arena = Arena(10, seed=2)
+    left, right = arena.join(), arena.join()
+    arena.tick()
+    place(arena, left, 2, 5, "RIGHT")
+    place(arena, right, 6, 5, "LEFT")
+    arena.take_delta()
+    mirror = joined_mirror(arena, left)
+
+    deaths = []
+    for _ in range(round(RESPAWN_DELAY / arena.tick_interval) + 30):
+        arena.tick()
+        payload = arena.take_delta()
+        if payload:
+            mirror.apply(payload)
+        assert_mirrors(arena, mirror)
+        if not deaths and arena.deaths:
+            deaths.append(arena.deaths)
+            assert not arena.snakes[left].alive and not arena.snakes[right].alive
+            assert mirror.bodies == {}
+    assert deaths == [2]
+    assert arena.snakes[left].alive and arena.snakes[right].alive
+    assert set(mirror.bodies) == {left, right}
@@ -0,0 +1,95 @@
+import argparse
+
+import pytest
+
+import replay
+import selfplay
+import snake
+from benchmarks.soak_restarts import play_once
+from highscores import ScoreStore
+from replay import MAX_IDLE_TICKS, MAX_SEED, Replay, ReplayError
+from snake_engine import CELL_NUMBER, SnakeGame
+
+
+def recorded_game(seed, policy="greedy"):
+    game = SnakeGame(seed=seed, record=True)
+    driver = selfplay.POLICIES[policy](game.cell_number)
+    driver.reset(seed)
+    while game.alive:
+        game.queue_direction(driver.next_direction(game))
+        game.step()
+    return game
+
+
+@pytest.mark.parametrize("seed", [0, MAX_SEED])
+def test_seed_range_edges_pack(seed):
+    game = SnakeGame(seed=seed, record=True)
+    game.step("UP")
+    replay = Replay.from_bytes(Replay.from_game(game).to_bytes())
+    assert replay.seed == seed
+
+
+@pytest.mark.parametrize("text", ["0", str(MAX_SEED)])
+def test_seed_argument_accepts_range(text):
+    assert snake.parse_args(["--seed", text]).seed == int(text)
+
+
+@pytest.mark.parametrize("text", ["-1", str(MAX_SEED + 1)])
+def test_seed_argument_rejects_out_of_range(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        snake.game_seed(text)
+    with pytest.raises(SystemExit):
+        snake.parse_args(["--seed", text])
+
+
+@pytest.mark.parametrize("policy", ["greedy", "random"])
+def test_recorded_games_verify(policy):
+    for seed in range(3):
+        game = recorded_game(seed, policy)
+        ok, replayed = replay.verify(Replay.from_bytes(Replay.from_game(game).to_bytes()))
+        assert ok and replayed.score == game.score
+
+
+@pytest.mark.parametrize("forged", [
+    Replay(1, [], cell_number=0),
+    Replay(1, [], cell_number=CELL_NUMBER - 1),
+    Replay(1, [], cell_number=65535),
+    Replay(1, [], ticks=2 ** 32 - 1),
+    Replay(1, [], ticks=MAX_IDLE_TICKS + 1),
+    Replay(1, [(MAX_IDLE_TICKS + 1, "UP")], ticks=MAX_IDLE_TICKS + 2),
+    # One turn, then more ticks than it takes to reach the wall
+    Replay(1, [(0, "UP")], ticks=2 + CELL_NUMBER),
+    # A second turn long after the first must have hit the wall
+    Replay(1, [(0, "UP"), (100, "LEFT")], ticks=101),
+])
+def test_forged_headers_are_rejected(forged):
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(forged.to_bytes())
+
+
+def test_long_idle_is_reported_as_a_verifier_limit():
+    with pytest.raises(ReplayError, match="idle ticks the verifier will simulate"):
+        Replay.from_bytes(Replay(1, [], ticks=MAX_IDLE_TICKS + 1).to_bytes())
+
+
+def test_verify_reports_every_file(tmp_path, capsys):
+    good = tmp_path / "good.snkr"
+    Replay.from_game(recorded_game(1)).save(good)
+    bad = tmp_path / "bad.snkr"
+    Replay(1, [], cell_number=0).save(bad)
+    assert replay.main(["verify", str(bad), str(good)]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert "unreadable" in lines[0]
+    assert lines[1].endswith(" ms") and "-> ok" in lines[1]
+
+
+def test_unwritable_record_dir_does_not_end_the_game(tmp_path, monkeypatch, capsys):
+    not_a_dir = tmp_path / "replays"
+    not_a_dir.write_text("")
+    monkeypatch.setattr(snake, "RECORD_DIR", str(not_a_dir))
+    monkeypatch.setattr(snake, "SCORES", ScoreStore(path=str(tmp_path / "highscores.dat")))
+    snake.init_display()
+    manager = snake.SceneManager()
+    play_once(manager)
+    assert manager.current is manager.scenes["game_over"]
+    assert "Replay could not be saved" in capsys.readouterr().err
@@ -0,0 +1,35 @@
+import gc
+import tracemalloc
+
+import numpy.ma  # noqa: F401  np.unique imports it on the first frame with particles; load it up front
+
+from benchmarks.soak_restarts import play_once
+
+import snake
+from highscores import ScoreStore
+
+
+def test_restarts_keep_memory_flat(tmp_path, monkeypatch):
+    """Python-level allocations stay flat across restarts.
+
+    A short run for the test suite; benchmarks/soak_restarts.py is the full
+    10,000-restart soak and checks the resident set instead.
+    """
+    monkeypatch.setattr(snake, "DIRTY_RECTS", True)
+    monkeypatch.setattr(snake, "SCORES", ScoreStore(path=str(tmp_path / "highscores.dat")))
+    snake.init_display()
+    manager = snake.SceneManager()
+    for _ in range(20):
+        play_once(manager)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(100):
+            play_once(manager)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    snake.SCORES.flush()
+    assert growth <= 256 * 2 ** 10
@@ -0,0 +1,36 @@
+import pytest
+
+import selfplay
+
+
+def test_empty_summary_reports_zero_games():
+    assert selfplay.Summary().report("greedy") == "greedy: 0 games"
+
+
+@pytest.mark.parametrize("games", ["0", "-3"])
+def test_games_must_be_positive(games):
+    with pytest.raises(SystemExit):
+        selfplay.main(["--games", games])
+
+
+@pytest.mark.parametrize("args", [["--workers", "0"], ["--chunk-size", "0"], ["--cells", "1"],
+                                  ["--cells", str(selfplay.MAX_CELL_NUMBER + 2)]])
+def test_out_of_range_options_are_rejected(args):
+    with pytest.raises(SystemExit):
+        selfplay.main(["--games", "1", *args])
+
+
+@pytest.mark.parametrize("overrides", [["FRUIT_MIN_SPAWN=12"], ["FRUIT_MIN_SPAWN=6", "FRUIT_MAX_SPAWN=5"],
+                                       ["FPS_BASE=0"], ["SPEED_BOOST_DURATION=-1"], ["EATING_DURATION=-1"]])
+def test_unplayable_rules_are_rejected(overrides):
+    args = ["--games", "1"]
+    for override in overrides:
+        args += ["--set", override]
+    with pytest.raises(SystemExit):
+        selfplay.main(args)
+
+
+def test_small_boards_play(capsys):
+    assert selfplay.main(["--games", "4", "--cells", "4", "--workers", "1", "--policy", "autopilot",
+                          "--set", "FRUIT_MIN_SPAWN=2", "--set", "FRUIT_MAX_SPAWN=2"]) == 0
+    assert "autopilot: 4 games" in capsys.readouterr().out
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import snapshot
+from assets import CACHE_MAGIC
+from replay import MAX_SEED
+from snake_engine import SnakeGame
+
+
+@pytest.mark.parametrize("seed", [0, MAX_SEED])
+def test_seed_range_edges_pack(seed):
+    game = SnakeGame(seed=seed, record=True)
+    game.step("UP")
+    assert snapshot.unpack(snapshot.pack(game)).seed == seed
+
+
+def test_save_replaces_file_atomically(tmp_path):
+    path = tmp_path / "game.snks"
+    game = SnakeGame(seed=1)
+    snapshot.save(game, path)
+    game.step("UP")
+    snapshot.save(game, path)
+    assert snapshot.load(path).ticks == 1
+    assert os.listdir(tmp_path) == ["game.snks"]
+
+
+def test_failed_save_keeps_previous_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "game.snks"
+    game = SnakeGame(seed=1)
+    snapshot.save(game, path)
+
+    def crash(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", crash)
+    game.step("UP")
+    with pytest.raises(OSError):
+        snapshot.save(game, path)
+    assert snapshot.load(path).ticks == 0
+    assert os.listdir(tmp_path) == ["game.snks"]
+
+
+def test_asset_cache_file_is_not_a_snapshot():
+    data = bytearray(snapshot.pack(SnakeGame(seed=1)))
+    data[:4] = CACHE_MAGIC
+    with pytest.raises(snapshot.SnapshotError, match="not a snake snapshot"):
+        snapshot.unpack(bytes(data))
+
+
+def test_restored_game_keeps_playing_like_the_original():
+    game = SnakeGame(seed=3)
+    for direction in ("UP", "LEFT", "DOWN"):
+        game.step(direction)
+    restored = snapshot.unpack(snapshot.pack(game))
+    for _ in range(30):
+        game.step()
+        restored.step()
+    assert snapshot.pack(restored) == snapshot.pack(game)